@@ -0,0 +1,244 @@
+"""
+Batch mode: run the pipeline on a backlog of recordings.
+
+    python batch.py recordings/ --workers 2
+    python batch.py files.txt --output-dir processed_audio      # one path per line
+    python batch.py processed_audio/batch_manifest.json         # resume a batch
+
+Every input gets its own output directory (as in main.py). Per-file status is
+kept in a JSON manifest (default <output-dir>/batch_manifest.json) that is
+rewritten after every change, so an interrupted batch picks up where it
+stopped: finished files are skipped and files that were running are queued
+again. A failing file is recorded as failed and the rest of the batch goes on,
+even if it crashes its worker process; --retry-failed queues failed files again.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from datetime import datetime, timezone
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+
+OUTPUT_DIR = "processed_audio"
+MANIFEST_NAME = "batch_manifest.json"
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".flac", ".m4a", ".ogg", ".aac", ".wma")
+
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+
+# ---------- Inputs & manifest ----------
+def find_inputs(path, recursive=False):
+    """Audio files of a directory, or the paths listed (one per line) in a text file."""
+    if os.path.isdir(path):
+        found = []
+        for root, dirs, files in os.walk(path):
+            found.extend(os.path.join(root, f) for f in files if f.lower().endswith(AUDIO_EXTENSIONS))
+            if not recursive:
+                break
+        return sorted(os.path.abspath(p) for p in found)
+
+    base = os.path.dirname(os.path.abspath(path))
+    with open(path, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f]
+    return [os.path.abspath(os.path.join(base, line)) for line in lines if line and not line.startswith("#")]
+
+
+def load_manifest(path):
+    if not os.path.exists(path):
+        return {"created_at": _now(), "files": {}}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, path):
+    """Atomic write, so a crash never leaves a half-written manifest."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    manifest["updated_at"] = _now()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def plan_batch(manifest, inputs, retry_failed=False):
+    """Add new inputs as pending and decide what to run; returns the paths to process."""
+    files = manifest["files"]
+    for path in inputs:
+        files.setdefault(path, {"status": "pending", "attempts": 0})
+
+    todo = []
+    for path, entry in files.items():
+        if entry["status"] == "running":  # interrupted last time
+            entry["status"] = "pending"
+        if entry["status"] == "failed" and retry_failed:
+            entry["status"] = "pending"
+        if entry["status"] == "pending":
+            todo.append(path)
+    return todo
+
+
+# ---------- Worker ----------
+def _process_one(input_path, output_dir):
+    """Runs in a worker process; never raises, returns (ok, run_dir, error)."""
+    if not os.path.exists(input_path) or os.path.getsize(input_path) == 0:
+        return False, None, "File not found or empty."
+    try:
+        from main import process_file
+
+        ok, run_dir = process_file(input_path, output_dir)
+        return ok, run_dir, None if ok else "Pipeline failed (see run_report.json)."
+    except Exception as e:
+        return False, None, f"{type(e).__name__}: {e}"
+
+
+# ---------- Batch ----------
+def _start(pool, path, output_dir, files, running, started):
+    running[pool.submit(_process_one, path, output_dir)] = path
+    entry = files[path]
+    entry.update({"status": "running", "started_at": _now(), "error": None})
+    entry["attempts"] = entry.get("attempts", 0) + 1
+    started[path] = time.perf_counter()
+
+
+def _finish(entry, ok, run_dir, error, started):
+    entry.update({
+        "status": "done" if ok else "failed",
+        "run_dir": run_dir,
+        "error": error,
+        "finished_at": _now(),
+        "wall_seconds": round(time.perf_counter() - started, 2),
+    })
+
+
+def run_batch(inputs, output_dir=OUTPUT_DIR, workers=1, manifest_path=None, retry_failed=False):
+    """
+    Process inputs with `workers` worker processes, recording progress in the
+    manifest. At most `workers` files are submitted at a time, so a file is
+    marked running (and timed) only once it really starts. If a worker process
+    dies, only the file it was running is marked failed; the pool is replaced
+    and the rest of the batch goes on. Returns the manifest.
+    """
+    manifest_path = manifest_path or os.path.join(output_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    manifest["output_dir"] = os.path.abspath(output_dir)
+    files = manifest["files"]
+    todo = plan_batch(manifest, inputs, retry_failed)
+    save_manifest(manifest, manifest_path)
+
+    done = sum(1 for e in files.values() if e["status"] == "done")
+    print(f"📦 {len(files)} files in batch: {done} done, {len(todo)} to process with {workers} worker(s).")
+    if not todo:
+        return manifest
+
+    os.makedirs(output_dir, exist_ok=True)
+    queue = deque(todo)
+    # files that were in flight together when a worker died: the culprit is
+    # unknown, so they run again one at a time and only the one that crashes
+    # alone is marked failed
+    suspects = deque()
+    running = {}  # future -> path; at most `workers`, so each one is really running
+    started = {}
+    pool = None
+    try:
+        while queue or suspects or running:
+            if pool is None:
+                # spawn: every worker starts clean and loads its own models (see milestone_2.model_registry)
+                pool = ProcessPoolExecutor(max_workers=max(workers, 1), mp_context=multiprocessing.get_context("spawn"))
+            if suspects:
+                if not running:
+                    _start(pool, suspects.popleft(), output_dir, files, running, started)
+            else:
+                while queue and len(running) < max(workers, 1):
+                    _start(pool, queue.popleft(), output_dir, files, running, started)
+            save_manifest(manifest, manifest_path)
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            if any(isinstance(f.exception(), BrokenProcessPool) for f in finished):
+                # the pool is unusable once a worker dies: wait for every file in flight
+                finished, _ = wait(running)
+            crashed = []
+            for future in finished:
+                path = running.pop(future)
+                try:
+                    ok, run_dir, error = future.result()
+                except BrokenProcessPool:
+                    crashed.append(path)
+                    continue
+                _finish(files[path], ok, run_dir, error, started[path])
+                save_manifest(manifest, manifest_path)
+                print(f"{'✅' if ok else '❌'} {os.path.basename(path)}: {run_dir if ok else error}")
+            if not crashed:
+                continue
+
+            pool.shutdown(wait=False, cancel_futures=True)
+            pool = None
+            if len(crashed) == 1:
+                _finish(files[crashed[0]], False, None, "Worker process crashed.", started[crashed[0]])
+                print(f"❌ {os.path.basename(crashed[0])}: Worker process crashed.")
+            else:
+                print(f"⚠️ A worker crashed with {len(crashed)} files in flight; running them again one at a time.")
+                for path in crashed:
+                    entry = files[path]
+                    entry["status"] = "pending"
+                    entry["attempts"] -= 1  # not this file's fault (yet)
+                suspects.extend(crashed)
+            save_manifest(manifest, manifest_path)
+    except KeyboardInterrupt:
+        print("\n🛑 Interrupted — unfinished files will be resumed on the next run.")
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        for entry in files.values():
+            if entry["status"] == "running":
+                entry["status"] = "pending"
+        save_manifest(manifest, manifest_path)
+        raise
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    counts = {}
+    for entry in files.values():
+        counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+    print(f"\n📋 Batch finished: {counts} — manifest: {manifest_path}")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="directory of recordings, text file of paths, or a batch manifest (.json)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("BATCH_WORKERS", "1")))
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--manifest", help=f"manifest path (default <output-dir>/{MANIFEST_NAME})")
+    parser.add_argument("--recursive", action="store_true", help="also scan subdirectories")
+    parser.add_argument("--retry-failed", action="store_true", help="process failed files again")
+    args = parser.parse_args()
+
+    if args.input.endswith(".json"):
+        # resume: the manifest lists the inputs and where the outputs go
+        manifest_path = args.manifest or args.input
+        output_dir = load_manifest(args.input).get("output_dir", args.output_dir)
+        inputs = []
+    else:
+        output_dir = args.output_dir
+        manifest_path = args.manifest
+        inputs = find_inputs(args.input, args.recursive)
+        if not inputs:
+            print("❌ No audio files found.")
+            sys.exit(1)
+
+    try:
+        manifest = run_batch(inputs, output_dir, args.workers, manifest_path, args.retry_failed)
+    except KeyboardInterrupt:
+        sys.exit(130)
+    if any(e["status"] != "done" for e in manifest["files"].values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Benchmark: local CPU diarization vs the remote pyannote.ai path (stubbed).
+
+For each meeting length the synthetic fixture of benchmarks/pipeline_suite.py
+is diarized twice:
+
+  remote  upload + job + backoff polling through AsyncDiarizationClient against
+          milestone_4/stub_pyannote.py. The stub's job time is configurable
+          (--stub-job-seconds plus --stub-seconds-per-minute of audio) to stand
+          in for the service's queueing and processing; the upload and polling
+          are real.
+  local   milestone_4/local_diarization.py in a fresh process.
+
+Before the runs, the local engine is checked on the repository's
+one-speaker sample (milestone_1/sp01-train-sn10_OxrSReyA.wav), raw and after
+clean_audio: it must find exactly one speaker in both, otherwise the
+benchmark exits with status 1.
+
+Reported per run: wall time, real-time factor, peak RSS, number of speakers
+found and speaker accuracy — the share of reference speech time labelled
+with the right speaker after the best one-to-one mapping of labels. The
+reference turns are the ones the fixture was generated from (and which the
+stub returns, so the remote row is 1.0 by construction).
+
+Run from the repository root:
+    python -m benchmarks.diarization_backends --lengths 1 10 60
+"""
+import os
+import sys
+import json
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import soundfile as sf
+from benchmarks.pipeline_suite import cleaned_fixture_path, N_SPEAKERS
+from milestone_4.stub_pyannote import synthetic_turns, start_stub_server
+
+ACCURACY_STEP = 0.1  # seconds per scoring frame
+SINGLE_SPEAKER_SAMPLE = os.path.join("milestone_1", "sp01-train-sn10_OxrSReyA.wav")  # 8 kHz, noisy
+
+
+def speaker_accuracy(reference, hypothesis, duration, step=ACCURACY_STEP):
+    """Share of reference speech frames whose hypothesis label maps to the right speaker."""
+    from scipy.optimize import linear_sum_assignment
+
+    grid = np.arange(0.0, duration, step)
+
+    def frame_labels(turns):
+        labels, names = np.full(len(grid), -1), {}
+        for turn in turns:
+            k = names.setdefault(turn["speaker"], len(names))
+            labels[(grid >= turn["start"]) & (grid < turn["end"])] = k
+        return labels, len(names)
+
+    ref, n_ref = frame_labels(reference)
+    hyp, n_hyp = frame_labels(hypothesis)
+    if not n_ref or not n_hyp:
+        return 0.0
+    overlap = np.zeros((n_ref, n_hyp))
+    speech = ref >= 0
+    np.add.at(overlap, (ref[speech & (hyp >= 0)], hyp[speech & (hyp >= 0)]), 1)
+    rows, cols = linear_sum_assignment(-overlap)
+    return float(overlap[rows, cols].sum() / max(speech.sum(), 1))
+
+
+def single_speaker_check(sample_path=SINGLE_SPEAKER_SAMPLE):
+    """Speakers the local engine finds in a one-speaker recording: {"raw": n, "cleaned": n}."""
+    from milestone_1.audio_cleaner import clean_audio
+    from milestone_4.local_diarization import diarize_local
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cleaned = os.path.join(tmp, "cleaned.wav")
+        clean_audio(sample_path, cleaned)
+        return {
+            name: len({t["speaker"] for t in diarize_local(path)})
+            for name, path in (("raw", sample_path), ("cleaned", cleaned))
+        }
+
+
+def _local_run(audio_path, num_speakers):
+    from milestone_4.local_diarization import diarize_local
+    from pipeline.metrics import PipelineMetrics
+
+    metrics = PipelineMetrics(audio_path)
+    with metrics.measure("diarize") as record:
+        turns = diarize_local(audio_path, n_speakers=num_speakers)
+    return record, turns
+
+
+def _remote_run(audio_path, base_url):
+    from milestone_4.async_diarization import diarize_file
+    from pipeline.metrics import PipelineMetrics
+
+    metrics = PipelineMetrics(audio_path)
+    with metrics.measure("diarize") as record:
+        turns = diarize_file(audio_path, "stub", base_url=base_url)
+    return record, turns or []
+
+
+def _row(backend, minutes, duration, record, turns, reference):
+    return {
+        "backend": backend,
+        "minutes": minutes,
+        "wall_seconds": record["wall_seconds"],
+        "real_time_factor": round(record["wall_seconds"] / duration, 4),
+        "peak_rss_mb": record["peak_rss_mb"],
+        "speakers": len({t["speaker"] for t in turns}),
+        "turns": len(turns),
+        "accuracy": round(speaker_accuracy(reference, turns, duration), 4),
+    }
+
+
+def run(lengths, num_speakers, stub_job_seconds, stub_seconds_per_minute):
+    rows = []
+    base_url, _, stop_stub = start_stub_server(
+        job_seconds=stub_job_seconds, seconds_per_audio_minute=stub_seconds_per_minute, n_speakers=N_SPEAKERS
+    )
+    try:
+        for minutes in lengths:
+            audio_path = cleaned_fixture_path(minutes)
+            duration = sf.info(audio_path).duration
+            reference = synthetic_turns(minutes * 60.0, N_SPEAKERS)
+
+            print(f"\n⏳ {minutes} min — remote (stub)...")
+            record, turns = _remote_run(audio_path, base_url)
+            rows.append(_row("remote", minutes, duration, record, turns, reference))
+
+            print(f"⏳ {minutes} min — local...")
+            # spawn: a fresh process, so peak RSS is the local engine's alone
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+                record, turns = pool.submit(_local_run, audio_path, num_speakers).result()
+            rows.append(_row("local", minutes, duration, record, turns, reference))
+    finally:
+        stop_stub()
+
+    print(f"\n{'backend':>8} | min | wall s |   RTF  | peak RSS MB | speakers | accuracy")
+    for r in rows:
+        print(
+            f"{r['backend']:>8} | {r['minutes']:3} | {r['wall_seconds']:6.2f} | {r['real_time_factor']:6.3f} | "
+            f"{r['peak_rss_mb']:11.0f} | {r['speakers']:8} | {r['accuracy']:.3f}"
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1, 10], help="meeting lengths in minutes")
+    parser.add_argument("--num-speakers", type=int, default=None, help="tell the local engine the speaker count")
+    parser.add_argument("--stub-job-seconds", type=float, default=5.0, help="fixed remote job time")
+    parser.add_argument("--stub-seconds-per-minute", type=float, default=1.0,
+                        help="extra remote job time per minute of audio")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    found = single_speaker_check()
+    if any(n != 1 for n in found.values()):
+        print(f"❌ One-speaker sample: local engine found {found} speakers (expected 1 each)")
+        sys.exit(1)
+    print("✅ One-speaker sample: one speaker found, raw and cleaned")
+
+    rows = run(args.lengths, args.num_speakers, args.stub_job_seconds, args.stub_seconds_per_minute)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(rows, f, indent=4)
+        print(f"\n📊 Results saved to: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: speaker assignment scaling in merge_transcriptions.
+
+Compares the sorted-interval engine (milestone_4.merge.assign_speakers) with the
+original per-segment pandas loop on synthetic meetings from 1k to 100k
+segments, and checks that both give the same speakers.
+
+Run from the repository root:
+    python -m benchmarks.merge_scaling --sizes 1000 10000 100000 --reference-limit 10000
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from milestone_4.merge import assign_speakers
+
+
+def reference_assign_speakers(transcript_segments, diarize_df, fill_nearest=True):
+    """The original O(N×M) loop from merge_transcriptions (works on a copy)."""
+    diarize_df = diarize_df.copy()
+    speakers = []
+    for seg in transcript_segments:
+        diarize_df['intersection'] = np.minimum(diarize_df['end'], seg['end']) - np.maximum(diarize_df['start'], seg['start'])
+        diarize_df['union'] = np.maximum(diarize_df['end'], seg['end']) - np.minimum(diarize_df['start'], seg['start'])
+        if not fill_nearest:
+            dia_tmp = diarize_df[diarize_df['intersection'] > 0]
+        else:
+            dia_tmp = diarize_df
+        if len(dia_tmp) > 0:
+            speaker = dia_tmp.groupby("speaker")["intersection"].sum().sort_values(ascending=False).index[0]
+        else:
+            speaker = "Unknown"
+        speakers.append(speaker)
+    return speakers
+
+
+def synthetic_meeting(n_segments, n_speakers=4, seed=0):
+    """Transcript segments plus diarization turns (about one turn per segment)."""
+    rng = np.random.default_rng(seed)
+
+    seg_len = rng.uniform(1.0, 8.0, n_segments)
+    gaps = rng.uniform(0.0, 1.5, n_segments)
+    seg_start = np.cumsum(gaps + np.concatenate(([0.0], seg_len[:-1])))
+    seg_end = seg_start + seg_len
+    segments = [
+        {"id": f"seg_{i:03d}", "start": round(float(s), 2), "end": round(float(e), 2), "text": "hello"}
+        for i, (s, e) in enumerate(zip(seg_start, seg_end))
+    ]
+
+    total = float(seg_end[-1])
+    n_turns = max(n_segments, 1)
+    bounds = np.sort(rng.uniform(0.0, total, n_turns - 1))
+    turn_start = np.concatenate(([0.0], bounds))
+    turn_end = np.concatenate((bounds, [total]))
+    # small gaps between turns so some segments have no overlap at all
+    turn_end = np.maximum(turn_start, turn_end - rng.uniform(0.0, 0.5, n_turns))
+    diarize_df = pd.DataFrame({
+        "start": turn_start.round(3),
+        "end": turn_end.round(3),
+        "speaker": [f"SPEAKER_{k:02d}" for k in rng.integers(0, n_speakers, n_turns)],
+    })
+    return segments, diarize_df
+
+
+def run(sizes, reference_limit, fill_nearest):
+    print("segments |   engine s | reference s | speedup | match")
+    for n in sizes:
+        segments, diarize_df = synthetic_meeting(n)
+
+        start = time.perf_counter()
+        fast = assign_speakers(segments, diarize_df, fill_nearest=fill_nearest)
+        fast_s = time.perf_counter() - start
+
+        if n <= reference_limit:
+            start = time.perf_counter()
+            slow = reference_assign_speakers(segments, diarize_df, fill_nearest=fill_nearest)
+            slow_s = time.perf_counter() - start
+            match = sum(a == b for a, b in zip(fast, slow)) / n
+            print(f"{n:8d} | {fast_s:10.4f} | {slow_s:11.3f} | {slow_s / fast_s:6.0f}x | {match:.2%}")
+        else:
+            print(f"{n:8d} | {fast_s:10.4f} | {'skipped':>11} | {'-':>7} | -")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--reference-limit", type=int, default=10000,
+                        help="largest size to also run the original pandas loop on")
+    parser.add_argument("--no-fill-nearest", action="store_true")
+    args = parser.parse_args()
+    run(args.sizes, args.reference_limit, not args.no_fill_nearest)
+
+
+if __name__ == "__main__":
+    main()
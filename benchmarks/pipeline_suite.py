@@ -0,0 +1,314 @@
+"""
+Benchmark suite: every pipeline stage, in isolation and end-to-end.
+
+Generates deterministic synthetic meetings (1, 10, 60 and 180 minutes by
+default) and runs clean_audio, modelCall, merge_transcriptions and
+summarize_large_text on their own, plus the full main.py pipeline with
+diarization served by the local stub (milestone_4/stub_pyannote.py). Each run
+happens in a fresh process and records wall time, CPU time, peak RSS and
+throughput (audio seconds processed per wall second).
+
+The audio is synthetic voiced/unvoiced babble following the stub's speaker
+turns, so it exercises decoding, resampling and denoising realistically but
+Whisper transcribes little real text. Merging and summarization therefore run
+on synthetic transcripts of the same meeting length instead.
+
+Results are written to --output. With --baseline, any stage whose wall time
+or peak memory grows by more than --threshold (default 20%) over the baseline
+is reported and the script exits with status 1; --update-baseline writes the
+current results as the new baseline.
+
+Run from the repository root:
+    python -m benchmarks.pipeline_suite --lengths 1 10 --baseline benchmarks/baseline.json
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import soundfile as sf
+from milestone_4.stub_pyannote import synthetic_turns, start_stub_server
+
+STAGES = ("clean", "transcribe", "merge", "summarize", "end_to_end")
+FIXTURE_DIR = os.getenv("BENCH_FIXTURE_DIR", ".bench_fixtures")
+FIXTURE_SAMPLE_RATE = 44100  # like a typical recording, so clean_audio has to resample
+N_SPEAKERS = 3
+WORDS_PER_MINUTE = 150
+SECONDS_PER_SEGMENT = 4.0
+
+# regressions smaller than these are treated as noise
+MIN_DELTA_SECONDS = 0.25
+MIN_DELTA_MB = 20.0
+
+
+# ==== Fixtures ====
+def synthetic_meeting_audio(path, minutes, sample_rate=FIXTURE_SAMPLE_RATE, seed=0, block_seconds=30):
+    """
+    Write a deterministic mono meeting recording of `minutes` minutes.
+
+    Each speaker turn (the same turns the stub diarizer returns) is a harmonic
+    voice at the speaker's pitch, amplitude-modulated at syllable rate, over a
+    low noise floor. Written block by block, so long fixtures use little memory.
+    """
+    duration = minutes * 60.0
+    turns = synthetic_turns(duration, N_SPEAKERS, seed)
+    starts = np.array([t["start"] for t in turns])
+    ends = np.array([t["end"] for t in turns])
+    speakers = np.array([int(t["speaker"].split("_")[1]) for t in turns])
+    pitches = np.array([110.0, 180.0, 235.0, 145.0])[:N_SPEAKERS]
+
+    total = int(duration * sample_rate)
+    block = int(block_seconds * sample_rate)
+    with sf.SoundFile(path, "w", samplerate=sample_rate, channels=1, subtype="PCM_16") as f:
+        for b, offset in enumerate(range(0, total, block)):
+            t = (offset + np.arange(min(block, total - offset))) / sample_rate
+            turn = np.clip(np.searchsorted(starts, t, side="right") - 1, 0, len(turns) - 1)
+            active = t < ends[turn]
+            f0 = pitches[speakers[turn]]
+
+            voice = sum(np.sin(2 * np.pi * h * f0 * t) / h for h in range(1, 5))
+            syllables = (0.5 * (1 + np.sin(2 * np.pi * 4.0 * t + speakers[turn]))) ** 2
+            rng = np.random.default_rng([seed, b])
+            noise = rng.normal(0.0, 0.01, len(t))
+            f.write((0.15 * voice * syllables * active + noise).astype(np.float32))
+    return path
+
+
+def fixture_path(minutes, seed=0):
+    """Path of the fixture for this length, generated on first use."""
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    path = os.path.join(FIXTURE_DIR, f"meeting_{minutes}min_s{seed}.wav")
+    if not os.path.exists(path):
+        print(f"🎛️ Generating {minutes}-minute fixture...")
+        tmp_path = f"{path}.tmp.wav"
+        synthetic_meeting_audio(tmp_path, minutes, seed=seed)
+        os.replace(tmp_path, path)
+    return path
+
+
+def cleaned_fixture_path(minutes, seed=0):
+    """Cleaned version of the fixture (input of the transcription stage)."""
+    path = os.path.join(FIXTURE_DIR, f"meeting_{minutes}min_s{seed}_clean.wav")
+    if not os.path.exists(path):
+        from milestone_1.audio_cleaner import clean_audio
+
+        clean_audio(fixture_path(minutes, seed), path, streaming=True)
+    return path
+
+
+# ==== Stage runners (each in a fresh process) ====
+def _measured(metrics, stage, func, *args, **kwargs):
+    with metrics.measure(stage) as record:
+        func(*args, **kwargs)
+        record["ok"] = True
+    return record
+
+
+def _run_clean(minutes, workdir):
+    from milestone_1.audio_cleaner import clean_audio
+    from pipeline.metrics import PipelineMetrics
+
+    source = fixture_path(minutes)
+    return _measured(PipelineMetrics(), "clean", clean_audio, source,
+                     os.path.join(workdir, "cleaned.wav"), streaming=True)
+
+
+def _run_transcribe(minutes, workdir, model_options):
+    from milestone_2.model_registry import get_whisper_model
+    from milestone_2.usingfilemodel import modelCall
+    from pipeline.metrics import PipelineMetrics
+
+    cleaned = cleaned_fixture_path(minutes)
+    # load outside the measurement: the stage is the transcription itself
+    get_whisper_model(model_options["model_size"], model_options["device"],
+                      model_options["compute_type"], model_options["cpu_threads"])
+    return _measured(PipelineMetrics(), "transcribe", modelCall, cleaned, **model_options)
+
+
+def _run_merge(minutes, workdir):
+    from benchmarks.merge_scaling import synthetic_meeting
+    from milestone_4.merge import merge_transcriptions
+    from pipeline.metrics import PipelineMetrics
+
+    segments, diarize_df = synthetic_meeting(int(minutes * 60 / SECONDS_PER_SEGMENT), N_SPEAKERS)
+    return _measured(PipelineMetrics(), "merge", merge_transcriptions,
+                     os.path.join(workdir, "diarized.txt"), segments, diarize_df)
+
+
+def _run_summarize(minutes, workdir, summary_options):
+    from benchmarks.summarizer_batching import synthetic_transcript
+    from milestone_4.summarizer import get_summarizer, summarize_large_text
+    from pipeline.metrics import PipelineMetrics
+
+    path = os.path.join(workdir, "diarized.txt")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(synthetic_transcript(minutes * WORDS_PER_MINUTE))
+    get_summarizer(precision=summary_options.get("precision", "float32"))
+    return _measured(PipelineMetrics(), "summarize", summarize_large_text, path,
+                     use_cache=False, **summary_options)
+
+
+def _run_end_to_end(minutes, workdir):
+    # PIPELINE_CACHE_DIR / PYANNOTE_API_URL are set by the parent before spawning
+    from main import plan_artifacts, build_pipeline
+    from pipeline.scheduler import run_dag
+    from pipeline.metrics import PipelineMetrics
+    from pipeline.artifact_cache import release_artifacts
+
+    source = fixture_path(minutes)
+    keys, dirs, paths = plan_artifacts(source)
+    metrics = PipelineMetrics(source)
+    with metrics.measure("end_to_end") as record:
+        try:
+            ok, _ = run_dag(build_pipeline(source, keys, paths, metrics))
+        finally:
+            release_artifacts(dirs.values())
+        record["ok"] = ok
+    record["steps"] = [s for s in metrics.steps if s["step"] != "end_to_end"]
+    if not ok:
+        raise RuntimeError("end-to-end pipeline failed")
+    return record
+
+
+def _in_fresh_process(func, *args):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(func, *args).result()
+
+
+# ==== Suite ====
+def run_suite(lengths, stages, model_options, summary_options):
+    results = {}
+    base_url, _, stop_stub = start_stub_server(job_seconds=1.0, n_speakers=N_SPEAKERS)
+    saved_env = {k: os.environ.get(k) for k in ("PYANNOTE_API_URL", "PYANNOTE_API_KEY", "PIPELINE_CACHE_DIR")}
+    try:
+        for minutes in lengths:
+            fixture_path(minutes)
+            for stage in stages:
+                workdir = tempfile.mkdtemp(prefix=f"bench_{stage}_")
+                try:
+                    print(f"\n⏱️ {stage} — {minutes} min")
+                    if stage == "clean":
+                        record = _in_fresh_process(_run_clean, minutes, workdir)
+                    elif stage == "transcribe":
+                        record = _in_fresh_process(_run_transcribe, minutes, workdir, model_options)
+                    elif stage == "merge":
+                        record = _in_fresh_process(_run_merge, minutes, workdir)
+                    elif stage == "summarize":
+                        record = _in_fresh_process(_run_summarize, minutes, workdir, summary_options)
+                    else:
+                        os.environ.update({
+                            "PYANNOTE_API_URL": base_url,
+                            "PYANNOTE_API_KEY": "stub",
+                            "PIPELINE_CACHE_DIR": os.path.join(workdir, "cache"),  # always cold
+                        })
+                        record = _in_fresh_process(_run_end_to_end, minutes, workdir)
+                finally:
+                    shutil.rmtree(workdir, ignore_errors=True)
+
+                audio_seconds = minutes * 60.0
+                record.update({
+                    "stage": stage,
+                    "minutes": minutes,
+                    "audio_seconds": audio_seconds,
+                    "throughput_x_realtime": round(audio_seconds / max(record["wall_seconds"], 1e-9), 2),
+                })
+                results[f"{stage}@{minutes}min"] = record
+    finally:
+        stop_stub()
+        for k, v in saved_env.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Return a list of human-readable regressions of results against baseline."""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for field, min_delta, unit in (
+            ("wall_seconds", MIN_DELTA_SECONDS, "s"),
+            ("peak_rss_mb", MIN_DELTA_MB, "MB"),
+        ):
+            old, new = base.get(field), current.get(field)
+            if old is None or new is None:
+                continue
+            if new > old * (1 + threshold) and new - old > min_delta:
+                regressions.append(
+                    f"{name}: {field} {old:.2f}{unit} → {new:.2f}{unit} (+{(new / old - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def print_table(results):
+    print("\nstage@length            |  wall s |   CPU s | peak RSS MB | x realtime")
+    for name, r in results.items():
+        print(
+            f"{name:<23} | {r['wall_seconds']:7.2f} | {r['cpu_seconds']:7.2f} | "
+            f"{r['peak_rss_mb']:11.0f} | {r['throughput_x_realtime']:10.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1, 10, 60, 180], help="meeting lengths in minutes")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES))
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="JSON baseline to compare against")
+    parser.add_argument("--threshold", type=float, default=float(os.getenv("BENCH_REGRESSION_THRESHOLD", "0.2")),
+                        help="allowed relative growth of wall time / peak memory (0.2 = 20%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="write the results to --baseline")
+    parser.add_argument("--model-size", default="small.en")
+    parser.add_argument("--compute-type", default="float32")
+    parser.add_argument("--cpu-threads", type=int, default=0)
+    args = parser.parse_args()
+
+    from main import SUMMARY_PARAMS
+
+    model_options = {
+        "model_size": args.model_size,
+        "device": "cpu",
+        "compute_type": args.compute_type,
+        "cpu_threads": args.cpu_threads,
+    }
+    results = run_suite(args.lengths, args.stages, model_options, dict(SUMMARY_PARAMS))
+    print_table(results)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4)
+    print(f"\n📊 Results saved to: {args.output}")
+
+    if not args.baseline:
+        return
+    if args.update_baseline or not os.path.exists(args.baseline):
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=4)
+        print(f"📌 Baseline updated: {args.baseline}")
+        return
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) over {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"   {line}")
+        sys.exit(1)
+    print(f"\n✅ No regressions over {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark: speed, memory and accuracy of reduced-precision inference.
+
+Whisper is run once per compute type (int8, int8_float32, float32) and BART
+once per precision (float32, dynamic_int8). Every mode runs in a fresh
+process so its memory numbers aren't polluted by the previous one. Reported
+per mode: load time, real-time factor (wall / audio seconds), peak RSS and
+WER from the same jiwer metrics as milestone_2/report.py. Whisper WER is
+against --reference if given, otherwise against the float32 transcript; BART
+"WER" is the drift of each summary from the float32 summary.
+
+Run from the repository root:
+    python -m benchmarks.precision_modes audio.wav --reference reference.txt
+"""
+import json
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import soundfile as sf
+from milestone_2.model_registry import COMPUTE_TYPES, DEFAULT_MODEL_SIZE
+from milestone_4.summarizer import DEFAULT_MODEL_NAME, PRECISIONS
+
+
+def _whisper_mode(audio_path, model_size, compute_type, cpu_threads):
+    from milestone_2.model_registry import get_whisper_model
+    from milestone_2.usingfilemodel import modelCall
+    from pipeline.metrics import PipelineMetrics
+
+    metrics = PipelineMetrics(audio_path)
+    with metrics.measure("load"):
+        get_whisper_model(model_size, "cpu", compute_type, cpu_threads)
+    with metrics.measure("transcribe"):
+        result = modelCall(audio_path, model_size, "cpu", compute_type, cpu_threads)
+    return {"steps": metrics.steps, "text": result["text"]}
+
+
+def _bart_mode(text, model_name, precision, max_chunk_words, chunk_limit):
+    from milestone_4.summarizer import get_summarizer, split_into_chunks, summarize_chunks
+    from pipeline.metrics import PipelineMetrics
+
+    metrics = PipelineMetrics()
+    all_chunks = split_into_chunks(text, max_chunk_words, overlap_words=80)
+    chunks = all_chunks[:chunk_limit]
+    with metrics.measure("load"):
+        summarizer, _ = get_summarizer(model_name, -1, precision=precision)
+    with metrics.measure("summarize"):
+        summaries = summarize_chunks(summarizer, chunks)
+    return {
+        "steps": metrics.steps,
+        "text": "\n\n".join(summaries),
+        "chunks": len(chunks),
+        "audio_fraction": len(chunks) / max(len(all_chunks), 1),  # share of the meeting summarized
+    }
+
+
+def _in_fresh_process(func, *args):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as pool:
+        return pool.submit(func, *args).result()
+
+
+def _row(mode, run, duration, wer):
+    load, work = run["steps"]
+    duration *= run.get("audio_fraction", 1.0)
+    return {
+        "mode": mode,
+        "load_seconds": load["wall_seconds"],
+        "wall_seconds": work["wall_seconds"],
+        "real_time_factor": round(work["wall_seconds"] / duration, 4),
+        "peak_rss_mb": max(load["peak_rss_mb"], work["peak_rss_mb"]),
+        "wer": round(wer, 4),
+    }
+
+
+def _print_table(title, rows, wer_label):
+    print(f"\n{title}")
+    print(f"{'mode':>14} | load s | wall s |   RTF  | peak RSS MB | {wer_label}")
+    for r in rows:
+        print(
+            f"{r['mode']:>14} | {r['load_seconds']:6.2f} | {r['wall_seconds']:6.2f} | "
+            f"{r['real_time_factor']:6.3f} | {r['peak_rss_mb']:11.0f} | {r['wer']:.3f}"
+        )
+
+
+def run(audio_path, reference_path, model_size, compute_types, cpu_threads,
+        summarizer_model, precisions, max_chunk_words, chunk_limit):
+    from milestone_2.report import compute_metrics
+
+    duration = sf.info(audio_path).duration
+    print(f"🎧 {audio_path}: {duration:.1f}s of audio")
+
+    # ---------- Whisper ----------
+    transcripts, whisper_runs = {}, {}
+    for compute_type in compute_types:
+        print(f"\n⏳ Whisper {model_size} / {compute_type}...")
+        whisper_runs[compute_type] = _in_fresh_process(
+            _whisper_mode, audio_path, model_size, compute_type, cpu_threads
+        )
+        transcripts[compute_type] = whisper_runs[compute_type]["text"]
+
+    if reference_path:
+        with open(reference_path, "r", encoding="utf-8") as f:
+            reference = f.read().strip()
+        wer_label = "WER vs reference"
+    else:
+        reference = transcripts.get("float32") or next(iter(transcripts.values()))
+        wer_label = "WER vs float32"
+    whisper_rows = [
+        _row(ct, run, duration, compute_metrics(reference, run["text"])[0].wer)
+        for ct, run in whisper_runs.items()
+    ]
+    _print_table(f"🗣️ Whisper {model_size}", whisper_rows, wer_label)
+
+    # ---------- BART (on the most accurate transcript) ----------
+    text = transcripts.get("float32") or next(iter(transcripts.values()))
+    bart_runs = {}
+    for precision in precisions:
+        print(f"\n⏳ BART {precision}...")
+        bart_runs[precision] = _in_fresh_process(
+            _bart_mode, text, summarizer_model, precision, max_chunk_words, chunk_limit
+        )
+    baseline = (bart_runs.get("float32") or next(iter(bart_runs.values())))["text"]
+    bart_rows = [
+        _row(p, run, duration, compute_metrics(baseline, run["text"])[0].wer)
+        for p, run in bart_runs.items()
+    ]
+    _print_table(f"🧠 {summarizer_model} ({next(iter(bart_runs.values()))['chunks']} chunks)",
+                 bart_rows, "WER vs float32")
+
+    return {"audio_seconds": duration, "whisper": whisper_rows, "summarizer": bart_rows}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio")
+    parser.add_argument("--reference", help="reference transcript for WER (default: float32 output)")
+    parser.add_argument("--model-size", default=DEFAULT_MODEL_SIZE)
+    parser.add_argument("--compute-types", nargs="+", default=list(COMPUTE_TYPES))
+    parser.add_argument("--cpu-threads", type=int, default=0)
+    parser.add_argument("--summarizer-model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--precisions", nargs="+", default=list(PRECISIONS))
+    parser.add_argument("--max-chunk-words", type=int, default=500)
+    parser.add_argument("--chunk-limit", type=int, default=8, help="summarize at most this many chunks")
+    parser.add_argument("--json", help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(
+        args.audio,
+        args.reference,
+        args.model_size,
+        args.compute_types,
+        args.cpu_threads,
+        args.summarizer_model,
+        args.precisions,
+        args.max_chunk_words,
+        args.chunk_limit,
+    )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=4)
+        print(f"\n📊 Results saved to: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
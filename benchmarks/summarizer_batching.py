@@ -0,0 +1,91 @@
+"""
+Benchmark: sequential vs batched chunk summarization.
+
+Builds a long synthetic speaker-attributed transcript, splits it with the same
+chunking as summarize_large_text, and reports chunks/sec for the sequential
+loop and for each batch size.
+
+Run from the repository root:
+    python -m benchmarks.summarizer_batching --words 20000 --batch-sizes 2 4 8
+"""
+import argparse
+import random
+import time
+from milestone_4.summarizer import (
+    DEFAULT_MODEL_NAME,
+    get_summarizer,
+    split_into_chunks,
+    summarize_chunks,
+)
+
+SPEAKERS = ["SPEAKER_00", "SPEAKER_01", "SPEAKER_02"]
+SUBJECTS = ["The team", "Our client", "The budget", "The new release", "Marketing", "The backend"]
+VERBS = ["needs to review", "will finalize", "is blocked on", "agreed to update", "should prioritize"]
+OBJECTS = ["the roadmap", "the onboarding flow", "next quarter's targets", "the database migration",
+           "the hiring plan", "the customer feedback"]
+
+
+def synthetic_transcript(n_words, seed=0):
+    """Deterministic meeting-like transcript of roughly n_words words."""
+    rng = random.Random(seed)
+    lines, words = [], 0
+    while words < n_words:
+        n_sents = rng.randint(1, 4)
+        sents = [
+            f"{rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)} by {rng.choice(['Monday', 'Friday', 'next week'])}."
+            for _ in range(n_sents)
+        ]
+        line = f"[{rng.choice(SPEAKERS)}] : " + " ".join(sents)
+        lines.append(line)
+        words += len(line.split())
+    return "\n".join(lines)
+
+
+def run(words, batch_sizes, max_chunk_words, overlap_words, min_words, max_words, model_name, device):
+    text = synthetic_transcript(words)
+    chunks = split_into_chunks(text, max_chunk_words, overlap_words)
+    summarizer, load_seconds = get_summarizer(model_name, device)
+    print(f"\n📄 {len(text.split())} words → {len(chunks)} chunks (model load {load_seconds:.2f}s)")
+
+    results = []
+    for batch_size in [1] + [b for b in batch_sizes if b > 1]:
+        start = time.perf_counter()
+        summaries = summarize_chunks(summarizer, chunks, min_words, max_words, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        assert len(summaries) == len(chunks)
+        results.append((batch_size, elapsed, len(chunks) / elapsed))
+
+    baseline = results[0][2]
+    print("\nbatch_size | seconds | chunks/sec | speedup")
+    for batch_size, elapsed, rate in results:
+        label = "seq" if batch_size == 1 else str(batch_size)
+        print(f"{label:>10} | {elapsed:7.2f} | {rate:10.3f} | {rate / baseline:6.2f}x")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=20000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--max-chunk-words", type=int, default=500)
+    parser.add_argument("--overlap-words", type=int, default=80)
+    parser.add_argument("--min-summary-words", type=int, default=100)
+    parser.add_argument("--max-summary-words", type=int, default=150)
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME)
+    parser.add_argument("--device", type=int, default=-1)
+    args = parser.parse_args()
+
+    run(
+        args.words,
+        args.batch_sizes,
+        args.max_chunk_words,
+        args.overlap_words,
+        args.min_summary_words,
+        args.max_summary_words,
+        args.model,
+        args.device,
+    )
+
+
+if __name__ == "__main__":
+    main()
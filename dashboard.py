@@ -1,85 +1,222 @@
 import os
-import io
-import time
-import tempfile
 import streamlit as st
-from pydub import AudioSegment
-from main import (
-    step_clean_audio,
-    step_transcription,
-    step_diarization,
-    step_merge_transcripts,
-    step_summarization,
-)
-
-
-# === Function to process the full pipeline and return results ===
-def process_pipeline(input_audio_bytes, status_placeholder):
-    try:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            input_path = os.path.join(tmpdir, "input.wav")
-            cleaned_audio = os.path.join(tmpdir, "cleaned.wav")
-            transcript_txt = os.path.join(tmpdir, "transcript.txt")
-            transcript_json = os.path.join(tmpdir, "transcription.json")
-            diarization_json = os.path.join(tmpdir, "diarization.json")
-            diarized_txt = os.path.join(tmpdir, "diarized_transcript.txt")
-            summary_txt = os.path.join(tmpdir, "summary.txt")
-
-            audio = AudioSegment.from_file(input_audio_bytes, format="wav")
-            audio.export(input_path, format="wav")
-
-            # Step 1
-            st.session_state.status = "🔊 Cleaning audio..."
-            status_placeholder.info(f"**Status:** {st.session_state.status}")
-            with st.spinner("Cleaning audio... ⏳"):
-                if not step_clean_audio(input_path, cleaned_audio):
-                    return "Audio cleaning failed!", "", ""
-
-            # Step 2
-            st.session_state.status = "📝 Transcribing..."
-            status_placeholder.info(f"**Status:** {st.session_state.status}")
-            with st.spinner("Transcribing... 📝"):
-                if not step_transcription(cleaned_audio, transcript_txt, transcript_json):
-                    return "Transcription failed!", "", ""
-                with open(transcript_txt, "r", encoding="utf-8") as f:
-                    transcription = f.read()
-                st.session_state.transcription = transcription
-
-            # Step 3
-            st.session_state.status = "👥 Performing diarization..."
-            status_placeholder.info(f"**Status:** {st.session_state.status}")
-            with st.spinner("Performing diarization... 👥"):
-                if not step_diarization(cleaned_audio, diarization_json):
-                    return "Diarization failed!", "", ""
-
-            # Step 4
-            st.session_state.status = "🔗 Merging results..."
-            status_placeholder.info(f"**Status:** {st.session_state.status}")
-            with st.spinner("Merging results... 🔗"):
-                if not step_merge_transcripts(transcript_json, diarization_json, diarized_txt):
-                    return "Merging failed!", "", ""
-                with open(diarized_txt, "r", encoding="utf-8") as f:
-                    diarized = f.read()
-                st.session_state.diarized = diarized
-
-            # Step 5
-            st.session_state.status = "🧠 Summarizing..."
-            status_placeholder.info(f"**Status:** {st.session_state.status}")
-            with st.spinner("Summarizing... 🧠"):
-                if not step_summarization(diarized_txt, summary_txt):
-                    return "Summarization failed!", "", ""
-                with open(summary_txt, "r", encoding="utf-8") as f:
-                    summary = f.read()
-                st.session_state.summary = summary
+from milestone_2.model_registry import get_whisper_model
+from milestone_2.transcript_stream import read_transcript_jsonl
+from pipeline.artifact_cache import evict_cache, release_artifacts
+from pipeline.scheduler import run_dag
+from pipeline.metrics import PipelineMetrics
+from pipeline.jobs import get_job_manager
+from pipeline.ingest import ingest_upload, upload_dir
+from pipeline.segment_store import open_segment_store
+from milestone_4.merge import speaker_pieces
+from main import plan_artifacts, build_pipeline, TRANSCRIBE_PARAMS, MERGE_PARAMS
+
+
+PAGE_SIZES = [25, 50, 100, 200]
+PREVIEW_SEGMENTS = 3  # latest segments shown while transcription is running
+
+# step -> (session output, artifact path name) read when the step finishes
+RESULT_FILES = {
+    "Transcription": ("transcription", "transcript_txt"),
+    "Merging": ("diarized", "diarized_txt"),
+    "Summarization": ("summary", "summary_txt"),
+}
+
+STEP_STATUS = {
+    "Audio Cleaning": "🔊 Cleaning audio...",
+    "Transcription": "📝 Transcribing...",
+    "Diarization": "👥 Performing diarization...",
+    "Merging": "🔗 Merging results...",
+    "Summarization": "🧠 Summarizing...",
+}
+
+
+def read_text(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def load_segments(paths, with_speakers=False):
+    """
+    Transcript segments (start, end, text[, speaker]) for the transcript viewer.
+    With speakers, segments that have word timings are split where the speaker changes.
+    """
+    segments = open_segment_store(paths["transcript_store"], paths["transcript_json"]).to_segments()
+    if with_speakers:
+        diarize_df = open_segment_store(paths["diarization_store"], paths["diarization_json"]).to_dataframe()
+        if len(diarize_df):
+            return speaker_pieces(segments, diarize_df, **MERGE_PARAMS)
+        return [{**seg, "speaker": "Unknown"} for seg in segments]
+    return segments
 
-            st.session_state.status = "✅ Completed"
-            status_placeholder.success(f"**Status:** {st.session_state.status}")
 
-            return transcription, diarized, summary
+def format_timestamp(seconds):
+    seconds = int(seconds or 0)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
 
-    except Exception as e:
-        return f"❌ Error: {e}", "", ""
 
+def render_transcript(segments, key, placeholder):
+    """
+    Paginated transcript viewer: only the selected page of segments is
+    rendered (as one markdown block), with timestamps and speaker labels, and
+    an optional text filter. Finished results show instantly at any length.
+    """
+    if not segments:
+        st.write(placeholder)
+        return
+
+    c1, c2 = st.columns([3, 1])
+    with c1:
+        query = st.text_input("🔎 Filter", key=f"{key}_query", placeholder="Search text or speaker")
+    with c2:
+        page_size = st.selectbox("Segments per page", PAGE_SIZES, index=1, key=f"{key}_page_size")
+
+    if query:
+        q = query.lower()
+        segments = [
+            seg for seg in segments
+            if q in seg.get("text", "").lower() or q in seg.get("speaker", "").lower()
+        ]
+    n_pages = max((len(segments) - 1) // page_size + 1, 1)
+    page = st.number_input(f"Page (of {n_pages})", 1, n_pages, 1, key=f"{key}_page") if n_pages > 1 else 1
+
+    lines = []
+    for seg in segments[(page - 1) * page_size:page * page_size]:
+        speaker = f" **{seg['speaker']}**:" if "speaker" in seg else ""
+        text = seg.get("text", "").strip().replace("*", "\\*").replace("_", "\\_")
+        lines.append(f"`{format_timestamp(seg.get('start'))}`{speaker} {text}")
+
+    with st.container(border=True, height=400):
+        st.markdown("  \n".join(lines) if lines else "_No matching segments._")
+    st.caption(f"{len(segments)} segments")
+
+
+def ingest(uploaded):
+    """
+    Store an upload (or recording) in the upload cache once per file and
+    return its IngestedAudio. Reruns of the same upload reuse the stored file
+    and its header-derived duration without hashing or decoding it again.
+    """
+    ingested = st.session_state.setdefault("ingested", {})
+    upload_id = getattr(uploaded, "file_id", None) or uploaded.name
+    if upload_id not in ingested or not os.path.exists(ingested[upload_id].path):
+        ingested[upload_id] = ingest_upload(uploaded.getvalue(), uploaded.name)
+    return ingested[upload_id]
+
+
+# === Pipeline job: runs on the shared background pool, not in the script thread ===
+def run_pipeline_job(job, input_path):
+    # Artifacts live in the shared cache, keyed by audio hash + step params,
+    # so re-processing the same recording is instant
+    keys, dirs, paths = plan_artifacts(input_path)
+    try:
+        # transcription appends here as it goes; the progress fragment reads it
+        job.set_output("transcript_jsonl", paths["transcript_jsonl"])
+
+        # Loaded once per server process and shared by every session
+        job.update(message="⏳ Loading speech model...")
+        get_whisper_model(
+            TRANSCRIBE_PARAMS["model_size"],
+            TRANSCRIBE_PARAMS["device"],
+            TRANSCRIBE_PARAMS["compute_type"],
+            TRANSCRIBE_PARAMS["cpu_threads"],
+        )
+
+        # Transcription and diarization run at the same time
+        active = []
+
+        def on_start(name):
+            active.append(name)
+            job.update(message=" | ".join(STEP_STATUS[n] for n in active))
+
+        def on_finish(name, ok, seconds):
+            active.remove(name)
+            job.update(message=" | ".join(STEP_STATUS[n] for n in active))
+            if ok and name in RESULT_FILES:
+                output, path_name = RESULT_FILES[name]
+                job.set_output(output, read_text(paths[path_name]))
+            if ok and name == "Transcription":
+                job.set_output("segments", load_segments(paths))
+            elif ok and name == "Merging":
+                job.set_output("diarized_segments", load_segments(paths, with_speakers=True))
+
+        metrics = PipelineMetrics(input_path)
+        ok, results = run_dag(
+            build_pipeline(input_path, keys, paths, metrics),
+            on_start=on_start,
+            on_finish=on_finish,
+        )
+        metrics.finish(ok)
+        job.set_output("run_report", metrics.report())
+        if not ok:
+            failed = [name for name, step_ok in results.items() if not step_ok]
+            job.update(error=f"{failed[0] if failed else 'Pipeline'} failed!")
+            return False
+
+        # keep this run's artifacts and the stored uploads of every queued or
+        # running job (jobs are keyed by their upload's SHA-256)
+        uploads = [upload_dir(key) for key in get_job_manager().active_keys()]
+        evict_cache(keep=[*dirs.values(), os.path.dirname(input_path), *uploads])
+        job.update(message="✅ Completed")
+        return True
+    finally:
+        # other jobs on the same recording wait for these entries until now
+        release_artifacts(dirs.values())
+
+
+def reset_results():
+    """Put every job result back to its placeholder, so a new job never shows the last one's output."""
+    st.session_state.transcription = "Transcription will appear here..."
+    st.session_state.diarized = "Diarized transcription will appear here..."
+    st.session_state.summary = "Summary will appear here..."
+    st.session_state.segments = []
+    st.session_state.diarized_segments = []
+    for key in ("run_report", "job_result", "celebrate"):
+        st.session_state.pop(key, None)
+
+
+@st.fragment(run_every=2)
+def job_progress():
+    """Poll the session's background job and pull its results into the page."""
+    job_id = st.session_state.get("job_id")
+    if not job_id:
+        return
+    job = get_job_manager().get(job_id)
+    if job is None:
+        st.session_state.job_id = None
+        st.warning("⚠️ The processing job expired. Please process the audio again.")
+        return
+
+    for output in ("transcription", "diarized", "summary", "segments", "diarized_segments", "run_report"):
+        if output in job["outputs"]:
+            st.session_state[output] = job["outputs"][output]
+
+    if job["status"] == "queued":
+        st.session_state.status = f"🕒 Waiting for a free worker (position {job['queue_position']} in queue)..."
+        st.info(f"**Status:** {st.session_state.status}")
+    elif job["status"] == "running":
+        st.session_state.status = job["message"] or "Running..."
+        st.info(f"**Status:** {st.session_state.status}")
+        if "segments" not in job["outputs"]:
+            partial = read_transcript_jsonl(job["outputs"].get("transcript_jsonl", ""))
+            if partial:
+                st.caption(
+                    f"📝 {len(partial)} segments transcribed so far "
+                    f"(up to {format_timestamp(partial[-1]['end'])})"
+                )
+                st.markdown("  \n".join(
+                    f"`{format_timestamp(seg['start'])}` {seg['text']}" for seg in partial[-PREVIEW_SEGMENTS:]
+                ))
+    else:
+        st.session_state.job_id = None
+        if job["status"] == "done":
+            st.session_state.status = "✅ Completed"
+            st.session_state.job_result = ("success", "🎉 Processing completed successfully!")
+            st.session_state.celebrate = True
+        else:
+            st.session_state.status = "❌ Failed"
+            st.session_state.job_result = ("error", f"❌ Error: {job['error']}")
+        st.rerun()  # full rerun so the output tabs show the results
 
 
 # ------------------- PAGE CONFIG -------------------
@@ -126,16 +263,7 @@ with col2:
 if "status" not in st.session_state:
     st.session_state.status = "Idle"
 if "transcription" not in st.session_state:
-    st.session_state.transcription = "Transcription will appear here..." 
-if "diarized" not in st.session_state:
-    st.session_state.diarized = "Diarized transcription will appear here..."
-if "summary" not in st.session_state:
-    st.session_state.summary = "Summary will appear here..."
-    
-def stream_data(text):
-    for word in text.split(" "):
-        yield word + " "
-        time.sleep(0.02)
+    reset_results()
 
 # ------------------- LAYOUT -------------------
 left, right = st.columns([1, 2], gap="large")
@@ -152,26 +280,12 @@ with left:
 
     elif input_mode == "📁 Upload Audio File":
         input_audio = st.file_uploader("Upload an audio file (.wav, .mp3)", type=["wav", "mp3"])
-        
-        if input_audio is not None:
-            file_name = input_audio.name.lower()
 
-            # ✅ Check if file is MP3   
-            if file_name.endswith(".mp3"):
-
-                # Convert and save
-                audio = AudioSegment.from_mp3(input_audio)
-                wav_buffer = io.BytesIO()
-                audio.export(wav_buffer, format="wav")
-                wav_buffer.seek(0)
-
-                 # Replace input_audio with the converted WAV buffer
-                input_audio = wav_buffer
-                file_name = file_name.replace(".mp3", ".wav")
-
-            elif not file_name.endswith(".wav"):
+        if input_audio is not None:
+            if not input_audio.name.lower().endswith((".wav", ".mp3")):
                 st.warning("Unsupported file format!")
-            
+
+            # the browser plays MP3 and WAV as they are
             st.audio(input_audio)
 
 
@@ -180,9 +294,8 @@ with left:
         st.toast(f"Audio {input_mode[2:]} successfully!", icon="✅")
 
         try:
-            audio_segment = AudioSegment.from_file(input_audio, format="wav")
-            duration_seconds = len(audio_segment) / 1000  # convert ms → seconds
-            duration_minutes = duration_seconds / 60
+            ingested = ingest(input_audio)
+            duration_minutes = ingested.duration / 60
 
             if duration_minutes < 1:
                 st.error("❌ The audio file must be at least **1 minute long**. Please upload a longer recording.")
@@ -194,22 +307,32 @@ with left:
             st.stop()
 
             
-        if st.button("🚀 Process Audio"):
+        busy = bool(st.session_state.get("job_id"))
+        if st.button("🚀 Process Audio", disabled=busy):
             st.session_state.status = "Initializing..."
             st.toast("Starting full pipeline 🚀", icon="🧠")
 
-            status_placeholder = st.empty()
-
-            status_placeholder.write(f"**Status:** {st.session_state.status}")
+            # Queue the pipeline on the shared worker pool; reruns (tab clicks,
+            # widget changes) no longer interrupt or repeat it
+            st.session_state.job_id = get_job_manager().submit(
+                run_pipeline_job, ingested.path, key=ingested.sha256
+            )
+            reset_results()
 
-            # Run pipeline (no st.spinner)
-            transcription, diarized, summary = process_pipeline(input_audio, status_placeholder)
+    job_progress()
 
-            if transcription.startswith("❌") or transcription.endswith("failed!"):
-                st.error(transcription)
-            else:
-                st.success("🎉 Processing completed successfully!")
+    if "job_result" in st.session_state:
+        kind, text = st.session_state.job_result
+        if kind == "success":
+            st.success(text)
+            if st.session_state.pop("celebrate", False):
                 st.balloons()
+        else:
+            st.error(text)
+
+    if "run_report" in st.session_state:
+        with st.expander("📊 Performance report"):
+            st.json(st.session_state.run_report)
 
             
 
@@ -231,8 +354,7 @@ with right:
                 mime="text/plain"
             )
 
-        with st.container(border=True,height=250):
-            st.write_stream(stream_data(st.session_state.transcription))
+        render_transcript(st.session_state.segments, "transcription", st.session_state.transcription)
 
     with tab2:
         col1, col2 = st.columns([9, 1])
@@ -246,8 +368,7 @@ with right:
                 mime="text/plain"
             )
         
-        with st.container(border=True,height=250):
-            st.write_stream(stream_data(st.session_state.diarized))
+        render_transcript(st.session_state.diarized_segments, "diarized", st.session_state.diarized)
     
     
     with tab3:
@@ -263,7 +384,7 @@ with right:
             )
         
         with st.container(border=True,height=250):
-            st.write_stream(stream_data(st.session_state.summary))
+            st.markdown(st.session_state.summary)
 
 # ------------------- FOOTER -------------------
 st.markdown("""<hr><p style='text-align:center; color:#999;'>Built with ❤️ using Streamlit</p>""", unsafe_allow_html=True)
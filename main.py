@@ -1,16 +1,61 @@
 import os
 import sys
 import json
+import shutil
 import pandas as pd
-from milestone_1.audio_cleaner import clean_audio
+import soundfile as sf
+from milestone_1.audio_cleaner import clean_audio, SAMPLE_RATE, CHANNELS
 from milestone_2.usingfilemodel import modelCall
-from milestone_4.dairization import get_diarization_result
-from milestone_4.getJobId import get_job_id
+from milestone_2.transcript_stream import transcribe_to_jsonl
+from milestone_2.model_registry import DEFAULT_COMPUTE_TYPE
+from milestone_4.async_diarization import diarize_file
+from milestone_4.local_diarization import diarize_local
 from milestone_4.merge import merge_transcriptions
 from milestone_4.summarizer import summarize_large_text
+from pipeline.artifact_cache import (
+    hash_file,
+    step_key,
+    artifact_dir,
+    commit_artifact,
+    evict_cache,
+    release_artifacts,
+)
+from pipeline.scheduler import run_dag
+from pipeline.segment_store import write_segment_store, transcript_fields, json_to_store, open_segment_store
+from pipeline.metrics import PipelineMetrics
 
 
 # ---------- Setup ----------
+# Step parameters are part of each artifact's cache key: changing any of them
+# (or the input audio) produces a fresh set of artifacts.
+CLEAN_PARAMS = {"sample_rate": SAMPLE_RATE, "channels": CHANNELS}
+TRANSCRIBE_PARAMS = {
+    "model_size": "small.en",
+    "device": "cpu",
+    "compute_type": DEFAULT_COMPUTE_TYPE,  # WHISPER_COMPUTE_TYPE: int8 | int8_float32 | float32
+    "cpu_threads": 0,
+    "workers": int(os.getenv("TRANSCRIBE_WORKERS", "1")),  # > 1 enables sharded transcription
+    # word timings let the merge step split segments where the speaker changes
+    "word_timestamps": os.getenv("TRANSCRIBE_WORD_TIMESTAMPS", "0") == "1",
+}
+DIARIZE_PARAMS = {"backend": os.getenv("DIARIZE_BACKEND", "pyannote")}  # pyannote | local
+if DIARIZE_PARAMS["backend"] == "local":
+    DIARIZE_PARAMS["num_speakers"] = int(os.getenv("DIARIZE_NUM_SPEAKERS", "0")) or None  # None: estimate
+MERGE_PARAMS = {"fill_nearest": True}
+# files an interrupted step resumes from instead of starting over
+RESUMABLE_FILES = {"transcribe": ("transcription.jsonl",)}
+SUMMARY_PARAMS = {
+    "max_chunk_words": 500,
+    "overlap_words": 80,
+    "min_summary_words": 100,
+    "max_summary_words": 150,
+    "hierarchical": True,  # reduce chunk summaries to ~target_words words
+    "target_words": 300,
+    "fan_out": 4,
+    "map_workers": int(os.getenv("SUMMARY_MAP_WORKERS", "1")),
+    "precision": os.getenv("SUMMARY_PRECISION", "float32"),  # or "dynamic_int8"
+}
+
 # ---------- Utility Functions ----------
 
 
@@ -28,12 +73,60 @@ def load_json(path, default=None):
         return default if default is not None else {}
 
 
+def plan_artifacts(input_path, cache_dir=None):
+    """
+    Work out the cache key and artifact paths of every step for input_path.
+
+    Keys chain from the hash of the input audio through each step's parameters,
+    so different inputs never share artifacts and a repeat run of the same
+    audio finds every step already done.
+    Returns (keys, dirs, paths): step -> key, step -> entry dir, name -> file path.
+    The caller holds the lease of every entry until release_artifacts(dirs.values()).
+    """
+    audio_hash = hash_file(input_path)
+    keys = {"clean": step_key("clean", audio_hash, CLEAN_PARAMS)}
+    # the worker count changes how fast the transcript is made, not what it says:
+    # only whether it is sharded is part of the key
+    transcribe_key = {k: v for k, v in TRANSCRIBE_PARAMS.items() if k != "workers"}
+    transcribe_key["sharded"] = TRANSCRIBE_PARAMS["workers"] > 1
+    keys["transcribe"] = step_key("transcribe", keys["clean"], transcribe_key)
+    keys["diarize"] = step_key("diarize", keys["clean"], DIARIZE_PARAMS)
+    keys["merge"] = step_key("merge", [keys["transcribe"], keys["diarize"]], MERGE_PARAMS)
+    keys["summarize"] = step_key("summarize", keys["merge"], SUMMARY_PARAMS)
+
+    dirs = {
+        step: artifact_dir(step, key, cache_dir, keep=RESUMABLE_FILES.get(step, ()))
+        for step, key in keys.items()
+    }
+    paths = {
+        "cleaned_audio": os.path.join(dirs["clean"], "cleaned.wav"),
+        "transcript_txt": os.path.join(dirs["transcribe"], "transcript.txt"),
+        "transcript_json": os.path.join(dirs["transcribe"], "transcription.json"),
+        "transcript_jsonl": os.path.join(dirs["transcribe"], "transcription.jsonl"),
+        "transcript_store": os.path.join(dirs["transcribe"], "transcription.npz"),
+        "diarization_json": os.path.join(dirs["diarize"], "diarization.json"),
+        "diarization_store": os.path.join(dirs["diarize"], "diarization.npz"),
+        "diarized_txt": os.path.join(dirs["merge"], "diarized_transcript.txt"),
+        "summary_txt": os.path.join(dirs["summarize"], "final_summary.txt"),
+    }
+    return keys, dirs, paths
+
+
+def export_artifacts(paths, output_dir):
+    """Copy the finished artifacts of one run into output_dir."""
+    os.makedirs(output_dir, exist_ok=True)
+    for path in paths.values():
+        if file_ready(path):
+            shutil.copy2(path, os.path.join(output_dir, os.path.basename(path)))
+
+
 # ---------- STEP 1: Clean Audio ----------
-def step_clean_audio(input_path, cleaned_audio):
+def step_clean_audio(input_path, cleaned_audio, streaming=True):
     try:
         if not file_ready(cleaned_audio):
             print("🎧 Cleaning audio...")
-            clean_audio(input_path, cleaned_audio)  # assumed defined elsewhere
+            # streaming keeps peak memory bounded on long recordings (same output)
+            clean_audio(input_path, cleaned_audio, streaming=streaming)
         else:
             print("✅ Using existing cleaned audio.")
         return True
@@ -43,16 +136,36 @@ def step_clean_audio(input_path, cleaned_audio):
 
 
 # ---------- STEP 2: Transcription ----------
-def step_transcription(cleaned_audio, transcript_txt_path, transcript_json_path):
+def step_transcription(
+    cleaned_audio, transcript_txt_path, transcript_json_path, transcript_jsonl_path=None,
+    transcript_store_path=None, **model_options,
+):
     try:
         if not file_ready(transcript_json_path):
             print("📝 Generating transcription...")
-            transcript_result = modelCall(cleaned_audio)  # assumed defined elsewhere
+            # model_options (model_size, device, compute_type, cpu_threads) select the
+            # shared model from milestone_2.model_registry
+            if transcript_jsonl_path and model_options.get("workers", 1) <= 1:
+                # segments are appended to the JSONL as they are decoded, so a
+                # crashed run resumes from the last saved segment
+                options = {k: v for k, v in model_options.items() if k not in ("workers", "shard_minutes")}
+                segments = list(transcribe_to_jsonl(cleaned_audio, transcript_jsonl_path, **options))
+                transcript_result = {
+                    "duration": round(sf.info(cleaned_audio).duration, 2),
+                    "text": " ".join(seg["text"] for seg in segments),
+                    "segments": segments,
+                }
+                print(f"✅ Transcription completed — {len(segments)} segments processed.")
+            else:
+                transcript_result = modelCall(cleaned_audio, **model_options)
 
             with open(transcript_txt_path, "w", encoding="utf-8") as f:
                 f.write(transcript_result.get("text", ""))
 
-            with open(transcript_json_path, "w", encoding="utf-8") as out_file:
+            # written under a temporary name so a crash never leaves a half-written
+            # transcription.json that looks finished
+            tmp_path = f"{transcript_json_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as out_file:
                 json.dump(
                     {
                         "duration": transcript_result.get("duration"),
@@ -62,6 +175,13 @@ def step_transcription(cleaned_audio, transcript_txt_path, transcript_json_path)
                     ensure_ascii=False,
                     indent=4,
                 )
+            os.replace(tmp_path, transcript_json_path)
+            if transcript_store_path:
+                segments = transcript_result.get("segments", [])
+                write_segment_store(
+                    transcript_store_path, segments, transcript_result.get("duration"),
+                    fields=transcript_fields(segments),
+                )
         else:
             print("✅ Using existing transcription file.")
             transcript_result = load_json(
@@ -80,6 +200,10 @@ def step_transcription(cleaned_audio, transcript_txt_path, transcript_json_path)
             print("❌ Invalid transcription JSON format: 'segments' must be a list.")
             return False
 
+        # columnar copy for merge and search (built once for older cache entries)
+        if transcript_store_path and not file_ready(transcript_store_path):
+            json_to_store(transcript_json_path, transcript_store_path)
+
         return True
     except Exception as e:
         print(f"❌ Transcription step failed: {e}")
@@ -87,21 +211,23 @@ def step_transcription(cleaned_audio, transcript_txt_path, transcript_json_path)
 
 
 # ---------- STEP 3: Diarization ----------
-def step_diarization(cleaned_audio, diarization_json_path):
+def step_diarization(cleaned_audio, diarization_json_path, diarization_store_path=None,
+                     backend="pyannote", num_speakers=None):
     try:
         if not file_ready(diarization_json_path):
-            print("🗣️ Performing diarization...")
-            api_key = os.getenv("PYANNOTE_API_KEY")
-            if not api_key:
-                print("❌ Missing PYANNOTE_API_KEY in environment.")
-                return False
-
-            job_id = get_job_id(cleaned_audio, api_key)
-            if not job_id:
-                print("❌ Failed to create diarization job (no job id returned).")
-                return False
-
-            diarization_result = get_diarization_result(job_id, api_key)
+            if backend == "local":
+                # offline MFCC + clustering engine (see milestone_4/local_diarization.py)
+                print("🗣️ Performing diarization (local)...")
+                diarization_result = diarize_local(cleaned_audio, n_speakers=num_speakers)
+            else:
+                print("🗣️ Performing diarization...")
+                api_key = os.getenv("PYANNOTE_API_KEY")
+                if not api_key:
+                    print("❌ Missing PYANNOTE_API_KEY in environment (or set DIARIZE_BACKEND=local).")
+                    return False
+
+                # unique media key per job + backoff polling (see milestone_4/async_diarization.py)
+                diarization_result = diarize_file(cleaned_audio, api_key)
 
             if diarization_result is None:
                 print("❌ Diarization returned no result (None). Check logs above for HTTP/JSON errors.")
@@ -117,6 +243,9 @@ def step_diarization(cleaned_audio, diarization_json_path):
             print("❌ Invalid diarization JSON format: expected a list.")
             return False
 
+        if diarization_store_path and not file_ready(diarization_store_path):
+            write_segment_store(diarization_store_path, diarization_result, fields=("speaker",))
+
         return True
     except Exception as e:
         print(f"❌ Diarization step failed: {e}")
@@ -124,22 +253,32 @@ def step_diarization(cleaned_audio, diarization_json_path):
 
 
 # ---------- STEP 4: Merge ----------
-def step_merge_transcripts(transcript_json_path, diarization_json_path, diarization_txt_path):
+def step_merge_transcripts(
+    transcript_json_path, diarization_json_path, diarization_txt_path,
+    transcript_store_path=None, diarization_store_path=None, fill_nearest=True,
+):
     try:
-        transcript_result = load_json(transcript_json_path, default={"segments": []})
-        diarization_result = load_json(diarization_json_path, default=[])
+        if transcript_store_path and diarization_store_path:
+            # memory-mapped columnar stores; the JSON is only parsed if a store is missing
+            transcript_segments = open_segment_store(transcript_store_path, transcript_json_path).to_segments()
+            diarize_df = open_segment_store(diarization_store_path, diarization_json_path).to_dataframe()
+        else:
+            transcript_result = load_json(transcript_json_path, default={"segments": []})
+            diarization_result = load_json(diarization_json_path, default=[])
 
-        if not isinstance(transcript_result.get("segments", []), list) or not isinstance(diarization_result, list):
-            
-            print("❌ Invalid format for merging.")
-            return False
+            if not isinstance(transcript_result.get("segments", []), list) or not isinstance(diarization_result, list):
+
+                print("❌ Invalid format for merging.")
+                return False
 
-        diarize_df = pd.DataFrame(diarization_result)
+            transcript_segments = transcript_result.get("segments", [])
+            diarize_df = pd.DataFrame(diarization_result)
 
         if not file_ready(diarization_txt_path):
             print("🔗 Merging diarization with transcription...")
             merged_ok = merge_transcriptions(
-                diarization_txt_path, transcript_result["segments"], diarize_df
+                diarization_txt_path, transcript_segments, diarize_df,
+                fill_nearest=fill_nearest,
             )
             if not merged_ok:
                 print("❌ Error merging diarization with transcription.")
@@ -155,11 +294,11 @@ def step_merge_transcripts(transcript_json_path, diarization_json_path, diarizat
 
 
 # ---------- STEP 5: Summarization ----------
-def step_summarization(diarization_txt_path, summary_txt_path):
+def step_summarization(diarization_txt_path, summary_txt_path, **summary_options):
     try:
         if not file_ready(summary_txt_path):
             print("🧠 Summarizing final transcript...")
-            final_summary = summarize_large_text(diarization_txt_path)
+            final_summary = summarize_large_text(diarization_txt_path, **summary_options)
             with open(summary_txt_path, "w", encoding="utf-8") as f:
                 f.write(final_summary)
         else:
@@ -170,47 +309,140 @@ def step_summarization(diarization_txt_path, summary_txt_path):
         return False
 
 
-# ---------- MAIN ----------
-def main():
-    OUTPUT_DIR = "processed_audio"
-    os.makedirs(OUTPUT_DIR, exist_ok=True)
-
-    input_path = input("Enter path to your audio file: ").strip()
-    if not os.path.exists(input_path) or os.path.getsize(input_path) == 0:
-        print("❌ File not found or empty.")
-        sys.exit(1)
-
-    cleaned_audio = os.path.join(OUTPUT_DIR, "file_cleaned.wav")
-    transcript_txt_path = os.path.join(OUTPUT_DIR, "transcript.txt")
-    transcript_json_path = os.path.join(OUTPUT_DIR, "transcription.json")
-    diarization_txt_path = os.path.join(OUTPUT_DIR, "diarized_transcript.txt")
-    diarization_json_path = os.path.join(OUTPUT_DIR, "diarization.json")
-    summary_txt_path = os.path.join(OUTPUT_DIR, "final_summary.txt")
-
-    steps = [
-        ("Audio Cleaning", step_clean_audio, (input_path, cleaned_audio)),
+# ---------- PIPELINE GRAPH ----------
+def _tracked(cache_step, key, func, output_path, metrics=None):
+    """
+    Wrap a step so its cache entry is marked complete when it succeeds and,
+    when metrics is given, its time/CPU/memory and cache hit are recorded.
+    """
+    def run(*args, **kwargs):
+        if metrics is None:
+            ok = func(*args, **kwargs)
+        else:
+            # the step will skip its work (file_ready) if the output already exists
+            with metrics.measure(cache_step, cache_hit=file_ready(output_path)) as record:
+                ok = func(*args, **kwargs)
+                record["ok"] = bool(ok)
+        if ok:
+            commit_artifact(cache_step, key)
+            if cache_step == "clean" and metrics is not None:
+                metrics.audio_duration = round(sf.info(output_path).duration, 2)
+        return ok
+    return run
+
+
+def build_pipeline(input_path, keys, paths, metrics=None):
+    """
+    Steps for pipeline.scheduler.run_dag: (name, func, args, kwargs, deps).
+
+    Transcription and diarization both only need the cleaned audio, so they
+    run at the same time; merging waits for both. Pass a
+    pipeline.metrics.PipelineMetrics to record per-step performance.
+    """
+    return [
+        (
+            "Audio Cleaning",
+            _tracked("clean", keys["clean"], step_clean_audio, paths["cleaned_audio"], metrics),
+            (input_path, paths["cleaned_audio"]),
+            {},
+            [],
+        ),
         (
             "Transcription",
-            step_transcription,
-            (cleaned_audio, transcript_txt_path, transcript_json_path),
+            _tracked("transcribe", keys["transcribe"], step_transcription, paths["transcript_json"], metrics),
+            (
+                paths["cleaned_audio"], paths["transcript_txt"], paths["transcript_json"],
+                paths["transcript_jsonl"], paths["transcript_store"],
+            ),
+            TRANSCRIBE_PARAMS,
+            ["Audio Cleaning"],
+        ),
+        (
+            "Diarization",
+            _tracked("diarize", keys["diarize"], step_diarization, paths["diarization_json"], metrics),
+            (paths["cleaned_audio"], paths["diarization_json"], paths["diarization_store"]),
+            DIARIZE_PARAMS,
+            ["Audio Cleaning"],
         ),
-        ("Diarization", step_diarization, (cleaned_audio, diarization_json_path)),
         (
             "Merging",
-            step_merge_transcripts,
-            (transcript_json_path, diarization_json_path, diarization_txt_path),
+            _tracked("merge", keys["merge"], step_merge_transcripts, paths["diarized_txt"], metrics),
+            (
+                paths["transcript_json"], paths["diarization_json"], paths["diarized_txt"],
+                paths["transcript_store"], paths["diarization_store"],
+            ),
+            MERGE_PARAMS,
+            ["Transcription", "Diarization"],
+        ),
+        (
+            "Summarization",
+            _tracked("summarize", keys["summarize"], step_summarization, paths["summary_txt"], metrics),
+            (paths["diarized_txt"], paths["summary_txt"]),
+            SUMMARY_PARAMS,
+            ["Merging"],
         ),
-        ("Summarization", step_summarization, (diarization_txt_path, summary_txt_path)),
     ]
 
-    for name, func, args in steps:
-        print(f"\n🔹 Running step: {name}")
-        ok = func(*args)
+
+def write_run_report(metrics, run_dir):
+    """Save the run report as JSON (and Prometheus text if PIPELINE_PROM_FILE is set)."""
+    metrics.write_json(os.path.join(run_dir, "run_report.json"))
+    prom_path = os.getenv("PIPELINE_PROM_FILE")
+    if prom_path:
+        metrics.write_prometheus(prom_path)
+
+
+# ---------- RUN ONE FILE ----------
+OUTPUT_DIR = "processed_audio"
+
+
+def run_directory(input_path, keys, output_dir=OUTPUT_DIR):
+    """Output directory of one input: <output_dir>/<stem>_<first 8 chars of the clean key>."""
+    base_name = os.path.splitext(os.path.basename(input_path))[0]
+    return os.path.join(output_dir, f"{base_name}_{keys['clean'][:8]}")
+
+
+def process_file(input_path, output_dir=OUTPUT_DIR):
+    """
+    Run the whole pipeline on one recording and export its artifacts.
+
+    Returns (ok, run_dir). Never exits the process, so callers (batch.py,
+    the dashboard) can go on with other files when one fails.
+    """
+    keys, dirs, paths = plan_artifacts(input_path)
+    run_dir = run_directory(input_path, keys, output_dir)
+
+    try:
+        metrics = PipelineMetrics(input_path)
+        ok, _ = run_dag(build_pipeline(input_path, keys, paths, metrics))
+        metrics.finish(ok)
+        write_run_report(metrics, run_dir)
         if not ok:
-            print(f"🚫 {name} failed. Stopping pipeline.")
-            sys.exit(1)
+            return False, run_dir
+
+        evict_cache(keep=dirs.values())
+        export_artifacts(paths, run_dir)
+        return True, run_dir
+    finally:
+        # other workers on the same recording wait for these entries until now
+        release_artifacts(dirs.values())
+
+
+# ---------- MAIN ----------
+def main():
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    input_path = input("Enter path to your audio file: ").strip()
+    if not os.path.exists(input_path) or os.path.getsize(input_path) == 0:
+        print("❌ File not found or empty.")
+        sys.exit(1)
+
+    ok, run_dir = process_file(input_path, OUTPUT_DIR)
+    if not ok:
+        print("🚫 Pipeline failed. Stopping.")
+        sys.exit(1)
 
-    print(f"\n✅ All processing complete! Files saved to: {OUTPUT_DIR}")
+    print(f"\n✅ All processing complete! Files saved to: {run_dir}")
 
 
 if __name__ == "__main__":
@@ -1,17 +1,27 @@
 import os
+import math
 import time
+import tempfile
 import librosa
 import numpy as np
 import soundfile as sf
 import sounddevice as sd
 import noisereduce as nr
+import soxr
+import audioread
 from pydub import AudioSegment, effects
 
 # --- Configuration ---
 SAMPLE_RATE = 16000  # Standard sample rate for speech recognition
 CHANNELS = 1         # Mono audio
 
-def clean_audio(input_path, output_path):
+# --- Streaming mode ---
+NR_CHUNK_FRAMES = 600000   # same chunk size noisereduce uses internally
+NR_PADDING_FRAMES = 30000  # context on each side of a chunk (noisereduce default)
+DECODE_BLOCK_FRAMES = 65536
+NORMALIZE_HEADROOM_DB = 0.1  # pydub effects.normalize default
+
+def clean_audio(input_path, output_path, streaming=False, chunk_frames=NR_CHUNK_FRAMES):
     """
     Cleans audio for ASR:
     - Resamples to 16kHz
@@ -19,7 +29,13 @@ def clean_audio(input_path, output_path):
     - Reduces noise
     - Normalizes volume
     Saves cleaned audio to output_path.
+
+    With streaming=True the file is processed block by block (see
+    clean_audio_streaming) so peak memory no longer grows with its length.
     """
+    if streaming:
+        return clean_audio_streaming(input_path, output_path, chunk_frames=chunk_frames)
+
     print(f"Cleaning '{input_path}'...")
 
     # Load audio using librosa (handles resampling automatically)
@@ -51,6 +67,143 @@ def clean_audio(input_path, output_path):
     print(f"Saved cleaned audio to '{output_path}'")
 
 
+def _decode_blocks(input_path, block_frames=DECODE_BLOCK_FRAMES):
+    """
+    Yield (mono float32 block, sample_rate) from input_path without loading the
+    whole file. Uses soundfile where it can, otherwise audioread (ffmpeg), as
+    librosa.load does.
+    """
+    try:
+        with sf.SoundFile(input_path) as f:
+            sr = f.samplerate
+            for block in f.blocks(blocksize=block_frames, dtype="float32", always_2d=True):
+                yield block.mean(axis=1), sr
+        return
+    except sf.LibsndfileError:
+        pass
+
+    with audioread.audio_open(input_path) as f:
+        sr, n_channels = f.samplerate, f.channels
+        for buf in f:
+            block = np.frombuffer(buf, dtype="<i2").astype(np.float32) / 32768.0
+            yield block.reshape(-1, n_channels).mean(axis=1), sr
+
+
+def _resampled_blocks(input_path):
+    """Mono blocks at SAMPLE_RATE, resampled incrementally with soxr (HQ, like librosa)."""
+    stream, n_in, n_out = None, 0, 0
+    for block, sr in _decode_blocks(input_path):
+        if sr == SAMPLE_RATE:
+            n_in += len(block)
+            n_out += len(block)
+            yield block
+            continue
+        if stream is None:
+            stream = soxr.ResampleStream(sr, SAMPLE_RATE, 1, dtype="float32", quality="HQ")
+            in_rate = sr
+        n_in += len(block)
+        out = stream.resample_chunk(block, last=False)
+        n_out += len(out)
+        yield out
+
+    if stream is not None:
+        out = stream.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+        # librosa.resample fixes the length to ceil(n * ratio)
+        expected = int(math.ceil(n_in * SAMPLE_RATE / in_rate))
+        out = out[:max(expected - n_out, 0)]
+        n_out += len(out)
+        if n_out < expected:
+            out = np.concatenate([out, np.zeros(expected - n_out, dtype=np.float32)])
+        yield out
+
+
+def _denoised_blocks(blocks, chunk_frames=NR_CHUNK_FRAMES, padding=NR_PADDING_FRAMES):
+    """
+    Noise-reduce a stream of samples in overlapping blocks.
+
+    Each chunk of chunk_frames samples is filtered together with `padding`
+    samples of context on both sides and only its middle is kept — the same
+    chunk/padding scheme noisereduce applies internally to a full array — so
+    the output matches a whole-file nr.reduce_noise while holding at most one
+    padded chunk in memory.
+    """
+    def denoise(padded, keep):
+        try:
+            out = nr.reduce_noise(y=padded, sr=SAMPLE_RATE, chunk_size=None, padding=0)
+        except Exception as e:
+            print(f"Noise reduction failed: {e}")
+            out = padded
+        return out[padding:padding + keep].astype(np.float32)
+
+    window = chunk_frames + 2 * padding
+    buf = np.zeros(padding)  # left context of the first chunk is silence
+    total = 0
+
+    for block in blocks:
+        total += len(block)
+        buf = np.concatenate([buf, block.astype(np.float64)])
+        while len(buf) >= window:
+            yield denoise(buf[:window], chunk_frames)
+            buf = buf[chunk_frames:]
+
+    remaining = len(buf) - padding
+    if total <= chunk_frames:
+        # short file: a single chunk padded to its own length
+        if remaining > 0:
+            yield denoise(np.concatenate([buf, np.zeros(padding)]), remaining)
+        return
+
+    while remaining > 0:
+        padded = np.concatenate([buf, np.zeros(max(window - len(buf), 0))])[:window]
+        keep = min(chunk_frames, remaining)
+        yield denoise(padded, keep)
+        buf = buf[chunk_frames:]
+        remaining -= keep
+
+
+def _to_int16(data):
+    return (np.clip(data, -1.0, 1.0) * 32767).astype(np.int16)
+
+
+def clean_audio_streaming(input_path, output_path, chunk_frames=NR_CHUNK_FRAMES):
+    """
+    Block-streaming version of clean_audio with O(block) peak memory.
+
+    Pass 1 decodes, resamples and noise-reduces block by block, writing the
+    result to a temporary float WAV while tracking the peak. Pass 2 reads that
+    file back block by block, applies the same peak normalization as
+    pydub's effects.normalize and writes the 16-bit output incrementally.
+    """
+    print(f"Cleaning '{input_path}' (streaming)...")
+
+    fd, tmp_path = tempfile.mkstemp(suffix=".wav", dir=os.path.dirname(os.path.abspath(output_path)))
+    os.close(fd)
+    try:
+        # --- Pass 1: decode → resample → denoise, track peak ---
+        peak = 0
+        with sf.SoundFile(tmp_path, "w", samplerate=SAMPLE_RATE, channels=CHANNELS, subtype="FLOAT") as tmp:
+            for block in _denoised_blocks(_resampled_blocks(input_path), chunk_frames=chunk_frames):
+                if len(block):
+                    peak = max(peak, int(np.abs(_to_int16(block).astype(np.int32)).max()))
+                tmp.write(block)
+
+        # --- Pass 2: normalize and write 16-bit PCM ---
+        if peak > 0:
+            target_peak = 32768 * 10 ** (-NORMALIZE_HEADROOM_DB / 20)
+            gain = target_peak / peak
+        else:
+            gain = 1.0  # silence: effects.normalize leaves it unchanged
+
+        with sf.SoundFile(output_path, "w", samplerate=SAMPLE_RATE, channels=CHANNELS, subtype="PCM_16", format="WAV") as out:
+            for block in sf.blocks(tmp_path, blocksize=DECODE_BLOCK_FRAMES, dtype="float32"):
+                scaled = np.floor(_to_int16(block).astype(np.float64) * gain)
+                out.write(np.clip(scaled, -32768, 32767).astype(np.int16))
+    finally:
+        os.remove(tmp_path)
+
+    print(f"Saved cleaned audio to '{output_path}'")
+
+
 def record_live_audio(output_filename):
     """
     Records live audio from the microphone and saves it to a file.
@@ -0,0 +1,99 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from faster_whisper import WhisperModel
+
+# ==== Defaults ====
+DEFAULT_MODEL_SIZE = "small.en"
+DEFAULT_DEVICE = "cpu"
+DEFAULT_COMPUTE_TYPE = os.getenv("WHISPER_COMPUTE_TYPE", "float32")
+DEFAULT_CPU_THREADS = 0  # 0 lets CTranslate2 pick the thread count
+
+# CPU precision modes: int8 weights with int8 or float32 activations, or full float32
+COMPUTE_TYPES = ("int8", "int8_float32", "float32")
+if DEFAULT_COMPUTE_TYPE not in COMPUTE_TYPES:
+    # fail here rather than with an opaque CTranslate2 error in a worker
+    raise ValueError(f"Unknown WHISPER_COMPUTE_TYPE '{DEFAULT_COMPUTE_TYPE}', expected one of {COMPUTE_TYPES}")
+
+# ==== Eviction policy ====
+MAX_LOADED_MODELS = int(os.getenv("WHISPER_MAX_MODELS", "2"))
+IDLE_TIMEOUT = float(os.getenv("WHISPER_IDLE_TIMEOUT", "1800"))  # seconds, <= 0 disables
+
+# key -> {"model": WhisperModel, "last_used": float}
+_models = OrderedDict()
+_lock = threading.RLock()
+
+
+def _evict_idle(now):
+    if IDLE_TIMEOUT <= 0:
+        return
+    for key in [k for k, entry in _models.items() if now - entry["last_used"] > IDLE_TIMEOUT]:
+        print(f"♻️ Unloading idle Whisper model {key}")
+        del _models[key]
+
+
+def _evict_lru():
+    while len(_models) > max(MAX_LOADED_MODELS, 1):
+        key, _ = _models.popitem(last=False)
+        print(f"♻️ Unloading least recently used Whisper model {key}")
+
+
+def get_whisper_model(
+    model_size=DEFAULT_MODEL_SIZE,
+    device=DEFAULT_DEVICE,
+    compute_type=DEFAULT_COMPUTE_TYPE,
+    cpu_threads=DEFAULT_CPU_THREADS,
+):
+    """
+    Return a shared WhisperModel for (model_size, device, compute_type, cpu_threads).
+
+    The model is loaded lazily on first use and reused by later calls in the same
+    process. Models idle for longer than IDLE_TIMEOUT are unloaded, and at most
+    MAX_LOADED_MODELS are kept (least recently used is dropped first).
+    On the CPU, compute_type must be one of COMPUTE_TYPES.
+    """
+    if device == "cpu" and compute_type not in COMPUTE_TYPES:
+        raise ValueError(f"Unknown Whisper compute type '{compute_type}', expected one of {COMPUTE_TYPES}")
+    key = (model_size, device, compute_type, cpu_threads)
+    with _lock:
+        now = time.monotonic()
+        _evict_idle(now)
+
+        entry = _models.get(key)
+        if entry is not None:
+            entry["last_used"] = now
+            _models.move_to_end(key)
+            return entry["model"]
+
+        print(f"⏳ Loading Whisper model '{model_size}' ({device}, {compute_type})...")
+        start = time.perf_counter()
+        model = WhisperModel(
+            model_size,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=cpu_threads,
+        )
+        print(f"✅ Whisper model loaded in {time.perf_counter() - start:.2f}s")
+
+        _models[key] = {"model": model, "last_used": time.monotonic()}
+        _evict_lru()
+        return model
+
+
+def evict_idle_models():
+    """Unload models that have been idle longer than IDLE_TIMEOUT."""
+    with _lock:
+        _evict_idle(time.monotonic())
+
+
+def clear_models():
+    """Unload every cached model (e.g. to free memory between batches)."""
+    with _lock:
+        _models.clear()
+
+
+def loaded_models():
+    """Return the keys of the currently loaded models, least recently used first."""
+    with _lock:
+        return list(_models.keys())
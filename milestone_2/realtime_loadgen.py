@@ -0,0 +1,120 @@
+"""
+Load generator for milestone_2/realtime_server.py.
+
+Replays WAV files as fake meeting clients, each streaming PCM at `speed`× real
+time, and reports per-level throughput and end-to-end latency (time from
+sending the last sample of a window to receiving its text). Use it to find
+how many concurrent meetings one box can keep up with.
+
+    python -m milestone_2.realtime_loadgen meeting.wav --clients 1 2 4 8 16 --speed 1
+"""
+import json
+import time
+import asyncio
+import argparse
+import numpy as np
+import soundfile as sf
+import soxr
+
+SAMPLE_RATE = 16000
+CHUNK_SECONDS = 0.1
+
+
+def load_pcm(path, max_seconds=None):
+    """16 kHz mono int16 PCM bytes for a WAV file."""
+    data, sr = sf.read(path, dtype="float32", always_2d=True)
+    data = data.mean(axis=1)
+    if sr != SAMPLE_RATE:
+        data = soxr.resample(data, sr, SAMPLE_RATE)
+    if max_seconds:
+        data = data[:int(max_seconds * SAMPLE_RATE)]
+    return (np.clip(data, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+async def run_client(host, port, stream_id, pcm, speed):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write((json.dumps({"stream_id": stream_id}) + "\n").encode("utf-8"))
+
+    sent_at = {}  # samples sent so far -> send time
+    latencies, results = [], []
+    chunk_bytes = int(CHUNK_SECONDS * SAMPLE_RATE) * 2
+
+    async def send():
+        start = time.monotonic()
+        for i in range(0, len(pcm), chunk_bytes):
+            # pace the stream at `speed`× real time
+            due = start + (i / 2 / SAMPLE_RATE) / speed
+            await asyncio.sleep(max(due - time.monotonic(), 0))
+            writer.write(pcm[i:i + chunk_bytes])
+            await writer.drain()
+            sent_at[(i + chunk_bytes) // 2] = time.monotonic()
+        writer.write_eof()
+
+    def send_time(sample):
+        # first chunk boundary at or after the window's last sample
+        candidates = [k for k in sent_at if k >= sample]
+        return sent_at[min(candidates)] if candidates else None
+
+    async def receive():
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            message = json.loads(line)
+            t = send_time(message["window_end_sample"])
+            if t is not None:
+                latencies.append(time.monotonic() - t)
+            results.append(message)
+
+    await asyncio.gather(send(), receive())
+    writer.close()
+    return latencies, results
+
+
+async def run_level(host, port, pcm, clients, speed):
+    start = time.monotonic()
+    outcomes = await asyncio.gather(*(
+        run_client(host, port, f"load-{clients}-{i}", pcm, speed) for i in range(clients)
+    ))
+    elapsed = time.monotonic() - start
+    latencies = [l for lat, _ in outcomes for l in lat]
+    windows = sum(len(res) for _, res in outcomes)
+    return {
+        "clients": clients,
+        "audio_seconds": clients * len(pcm) / 2 / SAMPLE_RATE,
+        "elapsed_seconds": elapsed,
+        "windows": windows,
+        "mean_latency_ms": float(np.mean(latencies) * 1000) if latencies else None,
+        "p95_latency_ms": float(np.percentile(latencies, 95) * 1000) if latencies else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("wav")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--clients", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed (1 = real time)")
+    parser.add_argument("--max-seconds", type=float, default=120)
+    parser.add_argument("--max-latency-ms", type=float, default=3000,
+                        help="p95 latency above which a level counts as overloaded")
+    args = parser.parse_args()
+
+    pcm = load_pcm(args.wav, args.max_seconds)
+    print("clients | audio s | wall s | windows | mean ms | p95 ms | keeps up")
+    capacity = 0
+    for clients in args.clients:
+        r = asyncio.run(run_level(args.host, args.port, pcm, clients, args.speed))
+        ok = r["p95_latency_ms"] is not None and r["p95_latency_ms"] <= args.max_latency_ms
+        if ok:
+            capacity = clients
+        print(
+            f"{clients:7d} | {r['audio_seconds']:7.0f} | {r['elapsed_seconds']:6.1f} | {r['windows']:7d} | "
+            f"{r['mean_latency_ms'] or 0:7.0f} | {r['p95_latency_ms'] or 0:6.0f} | {'✅' if ok else '❌'}"
+        )
+    print(f"\n📈 Highest level within {args.max_latency_ms:.0f} ms p95: {capacity} concurrent streams at {args.speed}× speed")
+
+
+if __name__ == "__main__":
+    main()
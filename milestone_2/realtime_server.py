@@ -0,0 +1,263 @@
+"""
+Multi-stream realtime transcription server.
+
+Many clients stream 16 kHz mono int16 PCM over local TCP sockets. Every
+stream has its own ring buffer; windows that fill up from any stream are
+queued, and a single decode worker transcribes them in batches on one shared
+WhisperModel, sending each stream its partial results.
+
+Protocol (one connection per stream):
+    client → server: one JSON header line, e.g. {"stream_id": "room-1"}\\n,
+                     then raw little-endian int16 PCM at 16 kHz mono
+    server → client: JSON lines {"stream_id", "seq", "window_end_sample",
+                     "text", "server_latency_ms"}; after the client stops
+                     sending, the last partial window is decoded zero-padded.
+                     A stream_id that is already connected is refused with
+                     {"stream_id", "error"} and the connection is closed.
+
+Run:
+    python -m milestone_2.realtime_server --port 9000 --batch-size 8
+and drive it with milestone_2/realtime_loadgen.py.
+"""
+import json
+import time
+import asyncio
+import argparse
+import numpy as np
+from milestone_2.model_registry import get_whisper_model, DEFAULT_MODEL_SIZE, DEFAULT_COMPUTE_TYPE
+from milestone_2.streaming import AudioRingBuffer, drop_repeated_prefix
+
+SAMPLE_RATE = 16000
+WINDOW_SECONDS = 3.0
+STRIDE_SECONDS = 3.0     # = window: lossless, non-overlapping windows
+BATCH_SIZE = 8
+BATCH_WAIT_MS = 50       # how long to wait for more windows to fill a batch
+READ_BYTES = 3200        # 0.1 s of int16 audio per socket read
+STATS_INTERVAL = 10.0
+
+
+def _decode_batch_sequential(model, windows):
+    texts = []
+    for window in windows:
+        segments, _ = model.transcribe(window, language="en", beam_size=1)
+        texts.append(" ".join(seg.text.strip() for seg in segments).strip())
+    return texts
+
+
+def decode_batch(model, windows):
+    """
+    Transcribe several short windows in one batched encoder/decoder call.
+
+    Uses faster-whisper's building blocks (feature extractor, encode, CTranslate2
+    generate) so windows from different streams share one forward pass. Falls
+    back to one transcribe() per window if those internals are unavailable.
+    """
+    try:
+        from faster_whisper.audio import pad_or_trim
+        from faster_whisper.tokenizer import Tokenizer
+
+        features = np.stack([
+            pad_or_trim(model.feature_extractor(window)[..., :-1]) for window in windows
+        ])
+        tokenizer = Tokenizer(model.hf_tokenizer, model.model.is_multilingual, task="transcribe", language="en")
+        prompt = model.get_prompt(tokenizer, [], without_timestamps=True)
+        encoder_output = model.encode(features)
+        results = model.model.generate(
+            encoder_output,
+            [prompt] * len(windows),
+            beam_size=1,
+            max_length=model.max_length,
+            suppress_blank=True,
+            suppress_tokens=[-1],
+        )
+        return [tokenizer.decode(r.sequences_ids[0]).strip() for r in results]
+    except (ImportError, AttributeError, TypeError):
+        return _decode_batch_sequential(model, windows)
+
+
+class StreamSession:
+    def __init__(self, stream_id, writer, window, stride):
+        self.stream_id = stream_id
+        self.writer = writer
+        self.buffer = AudioRingBuffer(window, stride, capacity=window * 20)
+        self.window = window
+        self.stride = stride
+        self.seq = 0
+        self.last_words = []
+        self.in_flight = 0                 # windows queued but not answered yet
+        self.drained = asyncio.Event()     # set whenever in_flight drops to 0
+        self.drained.set()
+        self.closed = False
+
+
+class RealtimeServer:
+    def __init__(
+        self,
+        model_size=DEFAULT_MODEL_SIZE,
+        compute_type=DEFAULT_COMPUTE_TYPE,
+        cpu_threads=0,
+        window_seconds=WINDOW_SECONDS,
+        stride_seconds=STRIDE_SECONDS,
+        batch_size=BATCH_SIZE,
+        batch_wait_ms=BATCH_WAIT_MS,
+    ):
+        self.model = get_whisper_model(model_size, "cpu", compute_type, cpu_threads)
+        self.window = int(window_seconds * SAMPLE_RATE)
+        self.stride = int(stride_seconds * SAMPLE_RATE)
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self.sessions = {}
+        self.stats = {"windows": 0, "batches": 0, "latencies": []}
+
+    # ---------- connections ----------
+    async def handle_client(self, reader, writer):
+        header = json.loads((await reader.readline()).decode("utf-8") or "{}")
+        stream_id = str(header.get("stream_id") or f"stream-{id(writer)}")
+        if stream_id in self.sessions:
+            # replies are routed by stream_id: a second connection would hijack the first
+            message = {"stream_id": stream_id, "error": "stream_id is already connected"}
+            writer.write((json.dumps(message) + "\n").encode("utf-8"))
+            await writer.drain()
+            writer.close()
+            print(f"⚠️ Stream '{stream_id}' refused: already connected")
+            return
+        session = StreamSession(stream_id, writer, self.window, self.stride)
+        self.sessions[stream_id] = session
+        print(f"🔌 Stream '{stream_id}' connected ({len(self.sessions)} active)")
+
+        pending = b""
+        try:
+            while True:
+                data = await reader.read(READ_BYTES)
+                if not data:
+                    break
+                data = pending + data
+                usable = len(data) - len(data) % 2
+                pending = data[usable:]
+                samples = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+                session.buffer.write(samples, capture_time=time.monotonic())
+
+                window = np.empty(self.window, dtype=np.float32)
+                captured_at = session.buffer.read_window(window)
+                while captured_at is not None:
+                    await self._submit(session, window, session.seq * self.stride + self.window, captured_at)
+                    window = np.empty(self.window, dtype=np.float32)
+                    captured_at = session.buffer.read_window(window)
+
+            # client finished sending: decode the trailing partial window (zero-padded)
+            # unless all of it was already in the previous window's overlap
+            window = np.empty(self.window, dtype=np.float32)
+            n, captured_at = session.buffer.read_partial_window(window)
+            if n > (self.window - self.stride if session.seq else 0):
+                await self._submit(session, window, session.seq * self.stride + n, captured_at)
+            # answer the remaining windows, then hang up
+            await session.drained.wait()
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            session.closed = True
+            self.sessions.pop(stream_id, None)
+            writer.close()
+            print(f"🔌 Stream '{stream_id}' disconnected ({len(self.sessions)} active)")
+
+    async def _submit(self, session, window, end_sample, captured_at):
+        session.in_flight += 1
+        session.drained.clear()
+        await self.queue.put((session, session.seq, end_sample, window, captured_at))
+        session.seq += 1
+
+    # ---------- batched decoding ----------
+    async def _next_batch(self):
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def decode_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            windows = [item[3] for item in batch]
+            texts = await loop.run_in_executor(None, decode_batch, self.model, windows)
+            now = time.monotonic()
+            self.stats["batches"] += 1
+            self.stats["windows"] += len(batch)
+
+            for (session, seq, end_sample, _, captured_at), text in zip(batch, texts):
+                words = drop_repeated_prefix(session.last_words, text.split())
+                session.last_words = (session.last_words + words)[-10:]
+                latency = now - captured_at
+                self.stats["latencies"].append(latency)
+                session.in_flight -= 1
+                if session.in_flight == 0:
+                    session.drained.set()
+                if session.closed:
+                    continue
+                message = {
+                    "stream_id": session.stream_id,
+                    "seq": seq,
+                    "window_end_sample": end_sample,
+                    "text": " ".join(words),
+                    "server_latency_ms": round(latency * 1000, 1),
+                }
+                try:
+                    session.writer.write((json.dumps(message) + "\n").encode("utf-8"))
+                    await session.writer.drain()
+                except ConnectionError:
+                    session.closed = True
+
+    async def stats_loop(self, interval=STATS_INTERVAL):
+        while True:
+            await asyncio.sleep(interval)
+            windows, batches, latencies = self.stats["windows"], self.stats["batches"], self.stats["latencies"]
+            if batches:
+                print(
+                    f"📊 streams={len(self.sessions)} queue={self.queue.qsize()} "
+                    f"windows/s={windows / interval:.1f} mean_batch={windows / batches:.1f} "
+                    f"p95_latency={np.percentile(latencies, 95) * 1000:.0f}ms"
+                )
+            self.stats = {"windows": 0, "batches": 0, "latencies": []}
+
+    async def serve(self, host="127.0.0.1", port=9000):
+        server = await asyncio.start_server(self.handle_client, host, port)
+        print(f"🎙️ Realtime server listening on {host}:{port} (batch size {self.batch_size})")
+        async with server:
+            await asyncio.gather(server.serve_forever(), self.decode_loop(), self.stats_loop())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--model-size", default=DEFAULT_MODEL_SIZE)
+    parser.add_argument("--compute-type", default=DEFAULT_COMPUTE_TYPE)
+    parser.add_argument("--cpu-threads", type=int, default=0)
+    parser.add_argument("--window", type=float, default=WINDOW_SECONDS)
+    parser.add_argument("--stride", type=float, default=STRIDE_SECONDS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--batch-wait-ms", type=float, default=BATCH_WAIT_MS)
+    args = parser.parse_args()
+
+    async def run():
+        server = RealtimeServer(
+            args.model_size, args.compute_type, args.cpu_threads,
+            args.window, args.stride, args.batch_size, args.batch_wait_ms,
+        )
+        await server.serve(args.host, args.port)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        print("\n🛑 Server stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,37 @@
 import sounddevice as sd
 import numpy as np
-import queue
+import time
 import threading
-from faster_whisper import WhisperModel
+from milestone_2.model_registry import get_whisper_model, DEFAULT_COMPUTE_TYPE
+from milestone_2.streaming import AudioRingBuffer, window_words, drop_repeated_prefix
 
 # ==== Configuration ====
 sample_rate = 16000
-block_duration = 3.0  # seconds per audio block
-chunk_duration = 0.5  # seconds per audio chunk
+block_duration = 3.0   # seconds per transcription window
+stride_duration = 2.0  # seconds between window starts (< block_duration → overlapping windows)
+chunk_duration = 0.5   # seconds per audio chunk
 channels = 1
 
 frames_per_block = int(sample_rate * block_duration)
+frames_per_stride = int(sample_rate * stride_duration)
 frames_per_chunk = int(sample_rate * chunk_duration)
 
-audio_queue = queue.Queue()
-audio_buffer = []
+# Preallocated ring buffer, written directly from the audio callback
+audio_buffer = AudioRingBuffer(frames_per_block, frames_per_stride, capacity=frames_per_block * 10)
 
 # Shared flag for stopping
 running = True
 
 # ==== Whisper Model ====
 model_size = "small.en"
-model = WhisperModel(model_size, device="cpu", compute_type="float32")
+compute_type = DEFAULT_COMPUTE_TYPE  # WHISPER_COMPUTE_TYPE: int8 | int8_float32 | float32
 
 
 # ==== Audio callback ====
-def audio_callback(indata, frames, time, status):
+def audio_callback(indata, frames, time_info, status):
     if status:
         print(status)
-    audio_queue.put(indata.copy())
+    audio_buffer.write(indata[:, 0], capture_time=time.monotonic())
 
 
 # ==== Recorder thread ====
@@ -39,6 +42,7 @@ def recorder():
         channels=channels,
         callback=audio_callback,
         blocksize=frames_per_chunk,
+        dtype="float32",
     ):
         print("🎙️ Recording... Press Ctrl+C to stop.")
         while running:
@@ -48,23 +52,46 @@ def recorder():
 
 # ==== Transcriber (main loop) ====
 def transcriber():
-    global running, audio_buffer
-    while running:
-        try:
-            block = audio_queue.get(timeout=1)
-        except queue.Empty:
-            continue
-
-        audio_buffer.append(block)
-
-        total_frames = sum(len(chunk) for chunk in audio_buffer)
-        if total_frames >= frames_per_block:
-            audio_data = np.concatenate(audio_buffer)[:frames_per_block].flatten().astype(np.float32)
-            audio_buffer = []
-
-            segments, _ = model.transcribe(audio_data, language="en", beam_size=1)
-            for segment in segments:
-                print(segment.text.strip())
+    global running
+    model = get_whisper_model(model_size, device="cpu", compute_type=compute_type)
+
+    window = np.zeros(frames_per_block, dtype=np.float32)  # reused for every window
+    first_window = True
+    last_words = []
+    latencies = []
+
+    try:
+        while running:
+            if not audio_buffer.wait_for_window(timeout=1):
+                continue
+            captured_at = audio_buffer.read_window(window)
+
+            segments, _ = model.transcribe(window, language="en", beam_size=1, word_timestamps=True)
+            words = [w for seg in segments for w in seg.words]
+
+            # Overlapping windows: keep only the words this window is responsible for
+            new_words = [w.word.strip() for w in window_words(words, block_duration, stride_duration, first_window)]
+            new_words = drop_repeated_prefix(last_words, [w for w in new_words if w])
+            first_window = False
+            if not new_words:
+                continue
+
+            latency = time.monotonic() - captured_at
+            latencies.append(latency)
+            last_words = (last_words + new_words)[-10:]
+            print(f"{' '.join(new_words)}  ⏱️ {latency * 1000:.0f} ms")
+    finally:
+        report_latency(latencies)
+
+
+def report_latency(latencies):
+    if latencies:
+        print(
+            f"⏱️ Capture→text latency: mean {np.mean(latencies) * 1000:.0f} ms, "
+            f"p95 {np.percentile(latencies, 95) * 1000:.0f} ms over {len(latencies)} windows"
+        )
+    if audio_buffer.dropped:
+        print(f"⚠️ {audio_buffer.dropped} samples dropped (transcriber fell behind).")
 
 
 # ==== Main ====
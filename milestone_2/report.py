@@ -17,29 +17,28 @@ transform = Compose([
     ReduceToListOfListOfWords()
 ])
 
-# Step 2: Load both transcriptions
-with open("transcription_sm.txt", "r", encoding="utf-8") as f:
-    my_text = f.read().strip()
-
-with open("youtube_transcription.txt", "r", encoding="utf-8") as f:
-    real_text = f.read().strip()
-
-# Step 3: Compute detailed word-level metrics
-word_out = process_words(
-    real_text,
-    my_text,
-    reference_transform=transform,
-    hypothesis_transform=transform
-)
 
-# Step 4: Compute character-level metrics
-char_out = process_characters(real_text, my_text)
+def compute_metrics(real_text, my_text):
+    """Word- and character-level jiwer metrics of a hypothesis against a reference."""
+    # Step 3: Compute detailed word-level metrics
+    word_out = process_words(
+        real_text,
+        my_text,
+        reference_transform=transform,
+        hypothesis_transform=transform
+    )
+
+    # Step 4: Compute character-level metrics
+    char_out = process_characters(real_text, my_text)
+    return word_out, char_out
 
-# Step 5: Compute accuracy
-accuracy = 1.0 - word_out.wer
 
-# Step 6: Create formatted report
-report = f"""
+def format_report(word_out, char_out):
+    # Step 5: Compute accuracy
+    accuracy = 1.0 - word_out.wer
+
+    # Step 6: Create formatted report
+    return f"""
 === Speech-to-Text Evaluation ===
 
 --- Word-Level Metrics ---
@@ -64,10 +63,21 @@ Total Reference Chars:        {char_out.hits + char_out.substitutions + char_out
 
 """
 
-# Step 7: Print and save report
-print(report)
 
-with open("wer_report.txt", "w", encoding="utf-8") as f:
-    f.write(report.strip())
+if __name__ == "__main__":
+    # Step 2: Load both transcriptions
+    with open("transcription_sm.txt", "r", encoding="utf-8") as f:
+        my_text = f.read().strip()
+
+    with open("youtube_transcription.txt", "r", encoding="utf-8") as f:
+        real_text = f.read().strip()
+
+    report = format_report(*compute_metrics(real_text, my_text))
+
+    # Step 7: Print and save report
+    print(report)
+
+    with open("wer_report.txt", "w", encoding="utf-8") as f:
+        f.write(report.strip())
 
-print("\n✅ Report saved as 'wer_report.txt'")
+    print("\n✅ Report saved as 'wer_report.txt'")
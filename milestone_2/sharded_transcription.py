@@ -0,0 +1,158 @@
+import os
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import soundfile as sf
+from milestone_2.model_registry import (
+    get_whisper_model,
+    DEFAULT_MODEL_SIZE,
+    DEFAULT_DEVICE,
+    DEFAULT_COMPUTE_TYPE,
+)
+from milestone_2.transcript_stream import format_words, read_audio
+
+# ==== Sharding ====
+SHARD_MINUTES = 10        # target shard length
+SEARCH_SECONDS = 20       # look this far either side of a target cut for silence
+FRAME_MS = 30             # energy frame used to find silence
+BEAM_SIZE = 5
+
+_worker_model = None
+
+
+def find_shard_boundaries(audio_path, shard_minutes=SHARD_MINUTES, search_seconds=SEARCH_SECONDS, frame_ms=FRAME_MS):
+    """
+    Sample offsets where the file should be cut into ~shard_minutes shards.
+
+    Each cut is moved to the quietest frame (lowest RMS) within search_seconds
+    of its target, so shards split at pauses rather than mid-word. The file is
+    scanned block by block; only one RMS value per frame is kept.
+    Returns [0, cut_1, ..., n_frames].
+    """
+    with sf.SoundFile(audio_path) as f:
+        sr, n_frames = f.samplerate, len(f)
+        frame = max(int(sr * frame_ms / 1000), 1)
+        rms = []
+        for block in f.blocks(blocksize=frame * 1024, dtype="float32", always_2d=True):
+            mono = block.mean(axis=1)
+            usable = len(mono) - len(mono) % frame
+            if usable:
+                rms.append(np.sqrt((mono[:usable].reshape(-1, frame) ** 2).mean(axis=1)))
+            if usable < len(mono):
+                rms.append(np.sqrt([(mono[usable:] ** 2).mean()]))
+    rms = np.concatenate(rms) if rms else np.zeros(0)
+
+    shard_frames = int(shard_minutes * 60 * sr)
+    search = int(search_seconds * sr) // frame
+    bounds = [0]
+    target = shard_frames
+    while target < n_frames - shard_frames // 4:  # don't leave a tiny last shard
+        centre = target // frame
+        lo, hi = max(centre - search, bounds[-1] // frame + 1), min(centre + search + 1, len(rms))
+        if lo >= hi:
+            cut = target
+        else:
+            cut = (lo + int(np.argmin(rms[lo:hi]))) * frame + frame // 2
+        bounds.append(cut)
+        target = cut + shard_frames
+    bounds.append(n_frames)
+    return bounds
+
+
+def _init_worker(model_size, device, compute_type, cpu_threads):
+    """Each worker process loads its own model once."""
+    global _worker_model
+    _worker_model = get_whisper_model(model_size, device, compute_type, cpu_threads)
+
+
+def _transcribe_shard(audio_path, index, start, end, word_timestamps=False):
+    """
+    Transcribe samples [start, end) of audio_path; timestamps are made global.
+    The shard is resampled to 16 kHz first (see read_audio), so inputs at any
+    rate give the same text as the unsharded path.
+    """
+    audio = read_audio(audio_path, start, end - start)
+    offset = start / sf.info(audio_path).samplerate
+    segments, _ = _worker_model.transcribe(audio, beam_size=BEAM_SIZE, word_timestamps=word_timestamps)
+    results = []
+    for seg in segments:
+        result = {"start": seg.start + offset, "end": seg.end + offset, "text": seg.text.strip()}
+        if word_timestamps:
+            result["words"] = format_words(seg.words, offset)
+        results.append(result)
+    return index, results
+
+
+def transcribe_sharded(
+    audio_path,
+    workers=None,
+    shard_minutes=SHARD_MINUTES,
+    model_size=DEFAULT_MODEL_SIZE,
+    device=DEFAULT_DEVICE,
+    compute_type=DEFAULT_COMPUTE_TYPE,
+    cpu_threads=0,
+    word_timestamps=False,
+):
+    """
+    Transcribe a long recording as parallel shards.
+
+    The audio (any rate; clean_audio writes 16 kHz mono) is cut at silences into
+    ~shard_minutes shards that are transcribed in a process pool, one model per
+    worker. Segments are stitched back with global timestamps and renumbered,
+    giving the same {"duration", "text", "segments"} result as modelCall.
+    cpu_threads is per worker (0 splits the machine's cores between workers).
+    """
+    workers = workers or os.cpu_count() or 1
+    bounds = find_shard_boundaries(audio_path, shard_minutes)
+    shards = list(zip(bounds[:-1], bounds[1:]))
+    workers = min(workers, len(shards))
+    if not cpu_threads:
+        cpu_threads = max((os.cpu_count() or 1) // workers, 1)
+
+    with sf.SoundFile(audio_path) as f:
+        duration = len(f) / f.samplerate
+
+    print(f"🧩 Split into {len(shards)} shards, transcribing with {workers} workers ({cpu_threads} threads each)...")
+    start_time = time.perf_counter()
+
+    results = [None] * len(shards)
+    # spawn: CTranslate2 models must not be inherited across fork
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(model_size, device, compute_type, cpu_threads),
+    ) as pool:
+        futures = [
+            pool.submit(_transcribe_shard, audio_path, i, start, end, word_timestamps)
+            for i, (start, end) in enumerate(shards)
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            index, segments = future.result()
+            results[index] = segments
+            print(f"✅ Shard {index + 1}/{len(shards)} done ({done}/{len(shards)})")
+
+    formatted_segments = []
+    for shard_segments in results:
+        for seg in shard_segments:
+            formatted = {
+                "id": f"seg_{len(formatted_segments):03d}",
+                "start": round(seg["start"], 2),
+                "end": round(seg["end"], 2),
+                "text": seg["text"],
+            }
+            if "words" in seg:
+                formatted["words"] = seg["words"]
+            formatted_segments.append(formatted)
+
+    elapsed = time.perf_counter() - start_time
+    print(f"\n✅ Sharded transcription completed — {len(formatted_segments)} segments in {elapsed:.1f}s "
+          f"(RTF {elapsed / duration if duration else 0:.3f}).")
+
+    return {
+        "duration": round(duration, 2),
+        "text": " ".join(seg["text"] for seg in formatted_segments).strip(),
+        "segments": formatted_segments,
+    }
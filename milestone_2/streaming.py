@@ -0,0 +1,143 @@
+import re
+import time
+import threading
+from collections import deque
+import numpy as np
+
+
+class AudioRingBuffer:
+    """
+    Preallocated float32 ring buffer for streaming audio.
+
+    Writers append sample blocks (e.g. straight from a sounddevice callback);
+    the reader copies fixed-size windows into a caller-owned array and advances
+    by `stride` samples, so consecutive windows overlap by window - stride and
+    no audio is dropped between windows. Nothing is allocated per block.
+    If the reader falls behind by more than the capacity, the oldest samples
+    are overwritten and counted in `dropped`.
+    """
+
+    def __init__(self, window, stride, capacity=None):
+        if not 0 < stride <= window:
+            raise ValueError("stride must be in (0, window]")
+        self.window = window
+        self.stride = stride
+        self.capacity = capacity or window * 4
+        self._data = np.zeros(self.capacity, dtype=np.float32)
+        self._read = 0      # absolute sample index of the next window start
+        self._written = 0   # absolute number of samples written
+        self.dropped = 0
+        self._capture_times = deque()  # (absolute end sample, capture time) per block
+        self._cond = threading.Condition()
+
+    def write(self, samples, capture_time=None):
+        """Append samples (1-D); capture_time defaults to now (time.monotonic)."""
+        n = len(samples)
+        if n == 0:
+            return
+        with self._cond:
+            if n > self.capacity:
+                samples = samples[-self.capacity:]
+                self.dropped += n - self.capacity
+                self._written += n - self.capacity
+                n = self.capacity
+            pos = self._written % self.capacity
+            first = min(n, self.capacity - pos)
+            self._data[pos:pos + first] = samples[:first]
+            self._data[:n - first] = samples[first:]
+            self._written += n
+
+            overflow = self._written - self._read - self.capacity
+            if overflow > 0:
+                self.dropped += overflow
+                self._read += overflow
+
+            self._capture_times.append((self._written, capture_time or time.monotonic()))
+            self._cond.notify_all()
+
+    def available(self):
+        with self._cond:
+            return self._written - self._read
+
+    def wait_for_window(self, timeout=None):
+        """Block until a full window is buffered; returns False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._written - self._read >= self.window, timeout)
+
+    def read_window(self, out):
+        """
+        Copy the next window into `out` (float32, length window) and advance by
+        stride. Returns the capture time of the newest sample in the window, or
+        None if a full window is not buffered yet.
+        """
+        with self._cond:
+            if self._written - self._read < self.window:
+                return None
+            pos = self._read % self.capacity
+            first = min(self.window, self.capacity - pos)
+            out[:first] = self._data[pos:pos + first]
+            out[first:self.window] = self._data[:self.window - first]
+
+            window_end = self._read + self.window
+            captured = None
+            for end, t in self._capture_times:
+                if end >= window_end:
+                    captured = t
+                    break
+            self._read += self.stride
+            while self._capture_times and self._capture_times[0][0] <= self._read:
+                self._capture_times.popleft()
+            return captured
+
+    def read_partial_window(self, out):
+        """
+        Copy whatever is buffered (less than a full window, e.g. the end of a
+        stream) into `out`, zero-padded to the window length, and mark it read.
+        Returns (samples copied, capture time of the newest sample or None).
+        """
+        with self._cond:
+            n = min(self._written - self._read, self.window)
+            pos = self._read % self.capacity
+            first = min(n, self.capacity - pos)
+            out[:first] = self._data[pos:pos + first]
+            out[first:n] = self._data[:n - first]
+            out[n:self.window] = 0.0
+            captured = self._capture_times[-1][1] if n and self._capture_times else None
+            self._read += n
+            self._capture_times.clear()
+            return n, captured
+
+
+def window_words(words, window_seconds, stride_seconds, first_window):
+    """
+    Pick the words a window is responsible for, so overlapping windows don't
+    repeat each other.
+
+    Consecutive windows overlap by window - stride seconds. Each window emits
+    the words starting in a stride-long slice centred in its overlap region,
+    so every word is decoded with context on both sides; the first window also
+    emits everything before that slice. words are faster-whisper Word objects
+    (or anything with .start and .word) with times relative to the window.
+    """
+    lead = (window_seconds - stride_seconds) / 2
+    lo = 0.0 if first_window else lead
+    hi = lead + stride_seconds
+    return [w for w in words if lo <= w.start < hi]
+
+
+def _norm(word):
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def drop_repeated_prefix(previous_tail, words, max_overlap=6):
+    """
+    Remove leading words of `words` that repeat the end of `previous_tail`
+    (plain strings, compared case- and punctuation-insensitively). Catches a
+    boundary word that both windows placed on their own side of the cut.
+    """
+    prev = [_norm(w) for w in previous_tail[-max_overlap:]]
+    new = [_norm(w) for w in words[:max_overlap]]
+    for k in range(min(len(prev), len(new)), 0, -1):
+        if prev[-k:] == new[:k]:
+            return words[k:]
+    return words
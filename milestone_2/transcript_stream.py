@@ -0,0 +1,133 @@
+import os
+import json
+import soxr
+import soundfile as sf
+from milestone_2.model_registry import (
+    get_whisper_model,
+    DEFAULT_MODEL_SIZE,
+    DEFAULT_DEVICE,
+    DEFAULT_COMPUTE_TYPE,
+    DEFAULT_CPU_THREADS,
+)
+
+BEAM_SIZE = 5
+WHISPER_SAMPLE_RATE = 16000  # faster-whisper takes any numpy array as 16 kHz audio
+
+
+def read_audio(audio_path, start=0, frames=-1):
+    """
+    Mono float32 samples [start, start + frames) of audio_path (counted in the
+    file's own sample rate), resampled to WHISPER_SAMPLE_RATE so they can be
+    passed to model.transcribe whatever rate the file has.
+    """
+    with sf.SoundFile(audio_path) as f:
+        sr = f.samplerate
+        f.seek(min(start, len(f)))
+        audio = f.read(frames, dtype="float32", always_2d=True).mean(axis=1)
+    if sr != WHISPER_SAMPLE_RATE and len(audio):
+        audio = soxr.resample(audio, sr, WHISPER_SAMPLE_RATE, quality="HQ")
+    return audio
+
+
+def stream_segments(
+    audio_path,
+    model_size=DEFAULT_MODEL_SIZE,
+    device=DEFAULT_DEVICE,
+    compute_type=DEFAULT_COMPUTE_TYPE,
+    cpu_threads=DEFAULT_CPU_THREADS,
+    start_seconds=0.0,
+    first_index=0,
+    word_timestamps=False,
+):
+    """
+    Yield transcript segments ({"id", "start", "end", "text"}) as faster-whisper
+    decodes them. With word_timestamps each segment also carries
+    "words": [{"start", "end", "word"}] (used to split segments by speaker).
+
+    With start_seconds > 0 only the audio from that point on is transcribed
+    (the file is sliced and resampled with read_audio, as in
+    sharded_transcription) and timestamps stay global; ids continue from first_index.
+    """
+    model = get_whisper_model(model_size, device, compute_type, cpu_threads)
+
+    audio = audio_path
+    if start_seconds > 0:
+        audio = read_audio(audio_path, int(start_seconds * sf.info(audio_path).samplerate))
+        if not len(audio):
+            return
+
+    segments, info = model.transcribe(audio, beam_size=BEAM_SIZE, word_timestamps=word_timestamps)
+    print("Detected language '%s' with probability %f" % (info.language, info.language_probability))
+
+    for i, seg in enumerate(segments, first_index):
+        segment = {
+            "id": f"seg_{i:03d}",
+            "start": round(seg.start + start_seconds, 2),
+            "end": round(seg.end + start_seconds, 2),
+            "text": seg.text.strip(),
+        }
+        if word_timestamps:
+            segment["words"] = format_words(seg.words, start_seconds)
+        yield segment
+
+
+def format_words(words, offset=0.0):
+    """faster-whisper Word objects as {"start", "end", "word"} dicts with global timestamps."""
+    return [
+        {"start": round(w.start + offset, 2), "end": round(w.end + offset, 2), "word": w.word}
+        for w in words or []
+    ]
+
+
+def read_transcript_jsonl(path):
+    """
+    Segments saved so far in a transcript JSONL file (one segment per line).
+
+    Safe to call while the file is still being written: a trailing line
+    without its newline (a write in progress, or a crash mid-write) is ignored.
+    """
+    if not os.path.exists(path):
+        return []
+    segments = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            if line.strip():
+                segments.append(json.loads(line))
+    return segments
+
+
+def _truncate_partial_line(path):
+    """Drop a half-written last line so new segments start on a clean line."""
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+
+def transcribe_to_jsonl(audio_path, jsonl_path, **model_options):
+    """
+    Transcribe audio_path, appending every segment to jsonl_path as soon as it
+    is decoded, and yield all segments in order.
+
+    If jsonl_path already holds segments from an interrupted run, those are
+    yielded first and transcription resumes from the end of the last saved
+    segment. Each line is flushed when written, so readers
+    (read_transcript_jsonl) see the transcript grow.
+    """
+    saved = read_transcript_jsonl(jsonl_path)
+    start_seconds = saved[-1]["end"] if saved else 0.0
+    if os.path.exists(jsonl_path):
+        _truncate_partial_line(jsonl_path)
+    if saved:
+        print(f"↩️ Resuming transcription at {start_seconds:.2f}s ({len(saved)} segments already saved).")
+    yield from saved
+
+    with open(jsonl_path, "a", encoding="utf-8") as f:
+        for segment in stream_segments(
+            audio_path, start_seconds=start_seconds, first_index=len(saved), **model_options
+        ):
+            f.write(json.dumps(segment, ensure_ascii=False) + "\n")
+            f.flush()
+            yield segment
@@ -1,7 +1,14 @@
-from faster_whisper import WhisperModel
 import yt_dlp
 import soundfile as sf
 from tqdm import tqdm
+from milestone_2.model_registry import (
+    DEFAULT_MODEL_SIZE,
+    DEFAULT_DEVICE,
+    DEFAULT_COMPUTE_TYPE,
+    DEFAULT_CPU_THREADS,
+)
+from milestone_2.sharded_transcription import transcribe_sharded, SHARD_MINUTES
+from milestone_2.transcript_stream import stream_segments
 
 
 def download_youtube_wav(url, output_path):
@@ -19,35 +26,46 @@ def download_youtube_wav(url, output_path):
         ydl.download([url])
         print(f"✅ Audio saved as {output_path}")
 
-def modelCall(audio_path):
-    model_size = "small.en"
-    model = WhisperModel(model_size, device="cpu", compute_type="float32")
-
-    segments, info = model.transcribe(audio_path, beam_size=5)
-    print("Detected language '%s' with probability %f" % (info.language, info.language_probability))
-
+def modelCall(
+    audio_path,
+    model_size=DEFAULT_MODEL_SIZE,
+    device=DEFAULT_DEVICE,
+    compute_type=DEFAULT_COMPUTE_TYPE,
+    cpu_threads=DEFAULT_CPU_THREADS,
+    workers=1,
+    shard_minutes=SHARD_MINUTES,
+    word_timestamps=False,
+):
+    # workers > 1: cut at silences and transcribe shards in a process pool
+    if workers > 1:
+        return transcribe_sharded(
+            audio_path,
+            workers=workers,
+            shard_minutes=shard_minutes,
+            model_size=model_size,
+            device=device,
+            compute_type=compute_type,
+            cpu_threads=cpu_threads,
+            word_timestamps=word_timestamps,
+        )
 
     with sf.SoundFile(audio_path) as f:
         duration = len(f) / f.samplerate
 
-    formatted_segments = []
-    full_text = ""
-    
-    for i, seg in enumerate(tqdm(segments, desc="Transcribing", unit="segment")):
-        segment_id = f"seg_{i:03d}"
-        segment_data = {
-            "id": segment_id,
-            "start": round(seg.start, 2),
-            "end": round(seg.end, 2),
-            "text": seg.text.strip()
-        }
-        formatted_segments.append(segment_data)
-        full_text += seg.text.strip() + " "
+    # Segments come from the shared, lazily loaded model as they are decoded
+    formatted_segments = list(tqdm(
+        stream_segments(
+            audio_path, model_size, device, compute_type, cpu_threads, word_timestamps=word_timestamps
+        ),
+        desc="Transcribing",
+        unit="segment",
+    ))
+    full_text = " ".join(seg["text"] for seg in formatted_segments)
 
     # Build final structure
     transcription_data = {
         "duration": round(duration, 2),
-        "text": full_text.strip(),
+        "text": full_text,
         "segments": formatted_segments,
     }
     
@@ -0,0 +1,186 @@
+import os
+import time
+import asyncio
+import aiohttp
+from milestone_4.dairization import PYANNOTE_API_URL, extract_diarization
+from milestone_4.getJobId import unique_object_key
+
+# ==== Polling policy ====
+POLL_INITIAL_INTERVAL = 1.0   # seconds before the first status check
+POLL_MAX_INTERVAL = 15.0      # cap for the exponential backoff
+POLL_BACKOFF = 1.5            # interval multiplier while the job is running
+POLL_TIMEOUT = 30 * 60        # give up on a job after this many seconds
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class DiarizationError(Exception):
+    pass
+
+
+async def _file_sender(path, chunk_bytes=UPLOAD_CHUNK_BYTES):
+    """Stream a file in chunks so uploads don't load the whole WAV into memory."""
+    loop = asyncio.get_running_loop()
+    with open(path, "rb") as f:
+        while True:
+            chunk = await loop.run_in_executor(None, f.read, chunk_bytes)
+            if not chunk:
+                break
+            yield chunk
+
+
+class AsyncDiarizationClient:
+    """
+    asyncio client for the pyannote.ai diarization API.
+
+    One pooled aiohttp session is shared by every request, each job uploads
+    under its own media key, and job status is polled with exponential backoff
+    (honouring Retry-After when the server sends it). Use as:
+
+        async with AsyncDiarizationClient(api_key) as client:
+            results = await client.diarize_many(paths)
+    """
+
+    def __init__(
+        self,
+        api_key,
+        base_url=PYANNOTE_API_URL,
+        max_connections=20,
+        max_jobs_in_flight=8,
+        request_timeout=60,
+        poll_initial_interval=POLL_INITIAL_INTERVAL,
+        poll_max_interval=POLL_MAX_INTERVAL,
+        poll_backoff=POLL_BACKOFF,
+        poll_timeout=POLL_TIMEOUT,
+    ):
+        if not api_key:
+            raise ValueError("Missing API key. Set PYANNOTE_API_KEY as an environment variable.")
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.request_timeout = request_timeout
+        self.poll_initial_interval = poll_initial_interval
+        self.poll_max_interval = poll_max_interval
+        self.poll_backoff = poll_backoff
+        self.poll_timeout = poll_timeout
+        self._jobs_in_flight = asyncio.Semaphore(max_jobs_in_flight)
+        self._auth = {"Authorization": f"Bearer {api_key}"}
+        self._session = None
+
+    async def __aenter__(self):
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=self.max_connections),
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=30, sock_read=self.request_timeout),
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._session.close()
+        self._session = None
+
+    # ---------- API calls ----------
+    async def _post_json(self, path, payload):
+        async with self._session.post(f"{self.base_url}{path}", json=payload, headers=self._auth) as response:
+            if response.status not in (200, 201, 202):
+                raise DiarizationError(f"POST {path} returned HTTP {response.status}: {await response.text()}")
+            return await response.json()
+
+    async def create_job(self, input_path, object_key=None):
+        """Upload input_path under a unique media key and start a diarization job."""
+        object_key = object_key or unique_object_key(input_path)
+        media_url = f"media://{object_key}"
+
+        data = await self._post_json("/media/input", {"url": media_url})
+        presigned_url = data.get("url") or data.get("presignedUrl") or data.get("presigned_url")
+        if not presigned_url:
+            raise DiarizationError("Missing presigned URL in media/input response")
+
+        # The presigned URL carries its own auth, so the API key is not sent to it
+        headers = {"Content-Length": str(os.path.getsize(input_path))}
+        async with self._session.put(presigned_url, data=_file_sender(input_path), headers=headers) as upload:
+            if upload.status not in (200, 201, 204):
+                raise DiarizationError(f"Upload returned HTTP {upload.status}: {await upload.text()}")
+
+        resp_json = await self._post_json("/diarize", {"url": media_url})
+        job_id = resp_json.get("jobId") or resp_json.get("job_id") or resp_json.get("id")
+        if not job_id:
+            raise DiarizationError("No job id found in diarize response")
+        print(f"🚀 Diarization job {job_id} started for '{input_path}' (key {object_key})")
+        return job_id
+
+    async def wait_for_result(self, job_id):
+        """Poll /jobs/{job_id} with exponential backoff until it finishes."""
+        interval = self.poll_initial_interval
+        deadline = time.monotonic() + self.poll_timeout
+        checks = 0
+
+        while True:
+            await asyncio.sleep(interval)
+            checks += 1
+            retry_after = None
+            try:
+                async with self._session.get(f"{self.base_url}/jobs/{job_id}", headers=self._auth) as response:
+                    retry_after = response.headers.get("Retry-After")
+                    if response.status == 200:
+                        data = await response.json()
+                    else:
+                        print(f"❌ HTTP {response.status} when polling job {job_id}: {await response.text()}")
+                        data = {}
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"❌ Network error while checking job {job_id} (check {checks}): {e}")
+                data = {}
+
+            status = data.get("status")
+            if status == "succeeded":
+                diarization = extract_diarization(data)
+                if diarization is None:
+                    raise DiarizationError(f"Job {job_id} succeeded but returned no diarization")
+                print(f"✅ Job {job_id} completed after {checks} checks.")
+                return diarization
+            if status in ("failed", "canceled"):
+                raise DiarizationError(f"Job {job_id} finished with status: {status}")
+
+            if time.monotonic() >= deadline:
+                raise DiarizationError(f"Timed out after {self.poll_timeout}s waiting for job {job_id}")
+
+            try:
+                interval = float(retry_after)
+            except (TypeError, ValueError):
+                interval = min(interval * self.poll_backoff, self.poll_max_interval)
+            interval = min(interval, max(deadline - time.monotonic(), 0.0))
+
+    async def diarize(self, input_path):
+        """Upload, start and wait for one job; returns the [{start, end, speaker}] list."""
+        async with self._jobs_in_flight:
+            job_id = await self.create_job(input_path)
+            return await self.wait_for_result(job_id)
+
+    async def diarize_many(self, input_paths):
+        """
+        Diarize many files concurrently (at most max_jobs_in_flight at a time).
+
+        Returns one entry per path, in order: the diarization list, or None if
+        that job failed (the error is printed).
+        """
+        async def one(path):
+            try:
+                return await self.diarize(path)
+            except Exception as e:
+                print(f"⚠️ Diarization failed for '{path}': {e}")
+                return None
+
+        return await asyncio.gather(*(one(path) for path in input_paths))
+
+
+def diarize_files(input_paths, api_key, **client_options):
+    """Blocking wrapper: diarize a list of files concurrently and return their results."""
+    async def run():
+        async with AsyncDiarizationClient(api_key, **client_options) as client:
+            return await client.diarize_many(input_paths)
+
+    return asyncio.run(run())
+
+
+def diarize_file(input_path, api_key, **client_options):
+    """Blocking wrapper for a single file; returns the diarization list or None."""
+    return diarize_files([input_path], api_key, **client_options)[0]
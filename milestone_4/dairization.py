@@ -1,7 +1,20 @@
+import os
+import json
 import time
 import requests
 
-def get_diarization_result(job_id, api_key, poll_interval=10, max_checks=60):
+PYANNOTE_API_URL = os.getenv("PYANNOTE_API_URL", "https://api.pyannote.ai/v1")
+
+
+def extract_diarization(data):
+    """Pull the speaker segments out of a finished job's JSON (key names vary)."""
+    output = data.get("output")
+    if isinstance(output, dict):
+        return output.get("diarization") or output.get("segments") or output.get("result")
+    return output
+
+
+def get_diarization_result(job_id, api_key, poll_interval=10, max_checks=60, base_url=PYANNOTE_API_URL):
     """
     Poll the pyannote jobs endpoint until the job finishes.
 
@@ -16,7 +29,7 @@ def get_diarization_result(job_id, api_key, poll_interval=10, max_checks=60):
         headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
         for attempt in range(1, max_checks + 1):
             try:
-                response = requests.get(f"https://api.pyannote.ai/v1/jobs/{job_id}", headers=headers, timeout=30)
+                response = requests.get(f"{base_url}/jobs/{job_id}", headers=headers, timeout=30)
             except requests.exceptions.RequestException as e:
                 print(f"❌ Network error while checking job status (attempt {attempt}): {e}")
                 time.sleep(poll_interval)
@@ -47,12 +60,7 @@ def get_diarization_result(job_id, api_key, poll_interval=10, max_checks=60):
 
             if status in ["succeeded", "failed", "canceled"]:
                 if status == "succeeded":
-                    output = data.get("output")
-                    diarization = None
-                    if isinstance(output, dict):
-                        diarization = output.get("diarization") or output.get("segments") or output.get("result")
-                    else:
-                        diarization = data.get("output")
+                    diarization = extract_diarization(data)
 
                     if diarization is None:
                         print("⚠️ Job succeeded but no 'diarization' field found in output. Dumping output for inspection:")
@@ -1,11 +1,22 @@
+import os
+import uuid
 import requests
 import json
+from milestone_4.dairization import PYANNOTE_API_URL
 
-def get_job_id(input_path, api_key):
+
+def unique_object_key(input_path):
+    """Per-job media key, so concurrent uploads never overwrite each other."""
+    stem = os.path.splitext(os.path.basename(input_path))[0]
+    safe_stem = "".join(c if c.isalnum() or c in "-_" else "-" for c in stem)[:40]
+    return f"{safe_stem or 'meeting'}-{uuid.uuid4().hex}"
+
+
+def get_job_id(input_path, api_key, object_key=None, base_url=PYANNOTE_API_URL):
     try:
         # === Configuration ===
 
-        object_key = "myMeeting"        # Unique identifier for your file
+        object_key = object_key or unique_object_key(input_path)  # Unique identifier for your file
 
         if not api_key:
             raise ValueError("Missing API key. Set PYANNOTE_API_KEY as an environment variable.")
@@ -13,7 +24,7 @@ def get_job_id(input_path, api_key):
         # === Step 1: Request a pre-signed PUT URL ===
         try:
             response = requests.post(
-                "https://api.pyannote.ai/v1/media/input",
+                f"{base_url}/media/input",
                 json={"url": f"media://{object_key}"},
                 headers={
                     "Authorization": f"Bearer {api_key}",
@@ -55,7 +66,7 @@ def get_job_id(input_path, api_key):
         try:
             print("🚀 Starting diarization job...")
             diarize_response = requests.post(
-                "https://api.pyannote.ai/v1/diarize",
+                f"{base_url}/diarize",
                 json={"url": f"media://{object_key}"},
                 headers={
                     "Authorization": f"Bearer {api_key}",
@@ -0,0 +1,215 @@
+"""
+Offline speaker diarization on the CPU, no API key or upload needed.
+
+    turns = diarize_local("cleaned.wav")               # number of speakers estimated
+    turns = diarize_local("cleaned.wav", n_speakers=3)
+
+The audio is cut into overlapping windows (WINDOW_SECONDS every HOP_SECONDS);
+each speech window is described by its mean MFCCs (a classic speaker cue), the
+windows are grouped by agglomerative clustering, and consecutive windows with
+the same label become a turn. Returns the same [{"start", "end", "speaker"}]
+list as the pyannote.ai backend, so merge_transcriptions consumes either.
+
+Much coarser than pyannote's neural embeddings (no overlap handling, turn
+edges are accurate to about HOP_SECONDS), but it runs in seconds per hour of
+audio and never leaves the machine.
+"""
+import numpy as np
+import soundfile as sf
+
+# ==== Features ====
+SAMPLE_RATE = 16000      # clean_audio output rate; other rates are resampled
+N_MFCC = 20
+N_FFT = 512              # 32 ms frames
+HOP_LENGTH = 160         # 10 ms
+WINDOW_SECONDS = 1.5     # one embedding per window
+HOP_SECONDS = 0.75
+SPEECH_DB = 15.0         # frames this far above the noise floor count as speech (less if noisy)
+MIN_SPEECH_FRACTION = 0.5
+BLOCK_SECONDS = 60       # audio is read and featurized block by block
+
+# ==== Clustering ====
+MAX_SPEAKERS = 8
+MAX_CLUSTER_WINDOWS = 2000   # larger meetings: cluster a sample, assign the rest to the nearest centroid
+MIN_SILHOUETTE = 0.25        # below this no split is convincing: one speaker
+MIN_SPEAKER_WINDOWS = 10     # an estimated speaker needs about this many speech windows (~7.5 s)
+SILHOUETTE_MARGIN = 0.03     # prefer fewer speakers unless more are clearly better
+SMOOTH_WINDOWS = 5           # majority filter over neighbouring windows
+
+
+def _blocks_16k(f, block_seconds):
+    """Mono float32 blocks of the open SoundFile f at SAMPLE_RATE, resampled as one stream."""
+    import soxr
+
+    stream = None
+    if f.samplerate != SAMPLE_RATE:
+        stream = soxr.ResampleStream(f.samplerate, SAMPLE_RATE, 1, dtype="float32", quality="HQ")
+    for block in f.blocks(blocksize=int(block_seconds * f.samplerate), dtype="float32", always_2d=True):
+        mono = block.mean(axis=1)
+        yield mono if stream is None else stream.resample_chunk(mono)
+    if stream is not None:
+        yield stream.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+
+
+def _frame_features(audio_path, block_seconds=BLOCK_SECONDS):
+    """
+    MFCCs (without c0) and log energy of every 10 ms frame, computed block by
+    block so a long file is never held in memory at once. The audio is
+    resampled to 16 kHz before it is cut into frames, and the samples of a
+    block's last incomplete frame are carried into the next block, so the
+    frames are exactly those of the whole signal at any input rate.
+    """
+    import librosa
+
+    mfccs, energies = [], []
+    pending = np.zeros(0, dtype=np.float32)
+    with sf.SoundFile(audio_path) as f:
+        for samples in _blocks_16k(f, block_seconds):
+            pending = np.concatenate([pending, samples])
+            if len(pending) < N_FFT:
+                continue
+            n_frames = (len(pending) - N_FFT) // HOP_LENGTH + 1
+            chunk = pending[:(n_frames - 1) * HOP_LENGTH + N_FFT]
+            mel = librosa.feature.melspectrogram(
+                y=chunk, sr=SAMPLE_RATE, n_fft=N_FFT, hop_length=HOP_LENGTH, center=False
+            )
+            # no top_db: clipping relative to the block's loudest frame would
+            # make a frame's features depend on where the block edges fall
+            mfcc = librosa.feature.mfcc(S=librosa.power_to_db(mel, top_db=None), n_mfcc=N_MFCC + 1)
+            rms = librosa.feature.rms(y=chunk, frame_length=N_FFT, hop_length=HOP_LENGTH, center=False)[0]
+            mfccs.append(mfcc[1:].T)
+            energies.append(20 * np.log10(np.maximum(rms, 1e-10)))
+            pending = pending[n_frames * HOP_LENGTH:]
+    if not mfccs:
+        return np.zeros((0, N_MFCC)), np.zeros(0)
+    return np.concatenate(mfccs), np.concatenate(energies)
+
+
+def window_embeddings(audio_path, window_seconds=WINDOW_SECONDS, hop_seconds=HOP_SECONDS):
+    """
+    One feature vector per window (its mean MFCCs, standardized over the
+    recording), the window start times and a speech mask.
+    """
+    mfcc, energy = _frame_features(audio_path)
+    frames_per_second = SAMPLE_RATE / HOP_LENGTH
+    win, hop = int(window_seconds * frames_per_second), int(hop_seconds * frames_per_second)
+    n_windows = max((len(mfcc) - win) // hop + 1, 0)
+    if n_windows == 0:
+        return np.zeros((0, N_MFCC)), np.zeros(0), np.zeros(0, dtype=bool)
+
+    # noise floor from the quietest frames; speech frames stand clearly above it.
+    # Noisy recordings have less headroom, so the gate is at most halfway
+    # between the floor and the loud frames
+    floor, loud = np.percentile(energy, [10, 95])
+    speech_frames = energy > floor + min(SPEECH_DB, (loud - floor) / 2)
+    mfcc = mfcc - mfcc[speech_frames].mean(axis=0) if speech_frames.any() else mfcc  # cepstral mean normalization
+
+    # window sums from prefix sums: no per-window Python loop over frames
+    cum = np.concatenate([np.zeros((1, N_MFCC)), np.cumsum(mfcc, axis=0)])
+    cum_speech = np.concatenate([[0], np.cumsum(speech_frames)])
+    starts = np.arange(n_windows) * hop
+    features = (cum[starts + win] - cum[starts]) / win
+    speech = (cum_speech[starts + win] - cum_speech[starts]) / win >= MIN_SPEECH_FRACTION
+
+    if speech.any():
+        mu, sigma = features[speech].mean(axis=0), features[speech].std(axis=0) + 1e-8
+        features = (features - mu) / sigma
+    return features, starts / frames_per_second, speech
+
+
+def cluster_windows(features, n_speakers=None, max_speakers=MAX_SPEAKERS, seed=0):
+    """
+    Speaker label per window (Ward agglomerative clustering).
+
+    With n_speakers=None the count is estimated from silhouette scores for 2
+    to max_speakers clusters (at most one per MIN_SPEAKER_WINDOWS windows):
+    the smallest count within SILHOUETTE_MARGIN of the best score, or 1 if no
+    split reaches MIN_SILHOUETTE. A given n_speakers is capped at one fewer
+    than the number of windows.
+    Long recordings are clustered on a sample of MAX_CLUSTER_WINDOWS windows;
+    the rest go to the nearest cluster centroid.
+    """
+    from sklearn.cluster import AgglomerativeClustering
+    from sklearn.metrics import silhouette_score
+
+    n = len(features)
+    if n < 2 or n_speakers == 1:
+        return np.zeros(n, dtype=np.int64)
+
+    rng = np.random.default_rng(seed)
+    sample = np.sort(rng.choice(n, MAX_CLUSTER_WINDOWS, replace=False)) if n > MAX_CLUSTER_WINDOWS else np.arange(n)
+    X = features[sample]
+
+    if n_speakers:
+        # a given count is used as is (no scoring), capped so no window is a cluster of its own
+        k = min(n_speakers, len(X) - 1)
+        if k < 2:
+            return np.zeros(n, dtype=np.int64)
+        best_labels = AgglomerativeClustering(n_clusters=k, linkage="ward").fit_predict(X)
+    else:
+        # too few windows per speaker make any silhouette look convincing
+        most = min(max_speakers, len(X) // MIN_SPEAKER_WINDOWS, len(X) - 1)
+        runs = []
+        for k in range(2, most + 1):
+            labels = AgglomerativeClustering(n_clusters=k, linkage="ward").fit_predict(X)
+            runs.append((silhouette_score(X, labels), labels))
+        top = max((score for score, _ in runs), default=-1.0)
+        if top < MIN_SILHOUETTE:
+            return np.zeros(n, dtype=np.int64)
+        # the fewest speakers whose score is within SILHOUETTE_MARGIN of the best
+        best_labels = next(labels for score, labels in runs if score >= top - SILHOUETTE_MARGIN)
+
+    centroids = np.stack([X[best_labels == k].mean(axis=0) for k in range(best_labels.max() + 1)])
+    distances = ((features[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2)
+    return np.argmin(distances, axis=1)
+
+
+def _smooth(labels, size=SMOOTH_WINDOWS):
+    """Majority vote over `size` neighbouring windows, removing one-window blips."""
+    if size < 2 or len(labels) < size:
+        return labels
+    n_labels = labels.max() + 1
+    votes = np.zeros((len(labels) + size - 1, n_labels))
+    pad = size // 2
+    votes[np.arange(len(labels)) + pad, labels] = 1
+    counts = np.cumsum(votes, axis=0)
+    counts = np.vstack([np.zeros(n_labels), counts])
+    window_counts = counts[size:size + len(labels)] - counts[:len(labels)]
+    return np.argmax(window_counts, axis=1)
+
+
+def diarize_local(audio_path, n_speakers=None, max_speakers=MAX_SPEAKERS,
+                  window_seconds=WINDOW_SECONDS, hop_seconds=HOP_SECONDS):
+    """
+    Diarize audio_path locally. Returns [{"start", "end", "speaker"}] sorted
+    by start, with speakers named SPEAKER_00, SPEAKER_01, ... in order of
+    first appearance.
+    """
+    features, starts, speech = window_embeddings(audio_path, window_seconds, hop_seconds)
+    if not speech.any():
+        return []
+
+    speech_idx = np.flatnonzero(speech)
+    labels = np.full(len(features), -1, dtype=np.int64)
+    labels[speech_idx] = _smooth(cluster_windows(features[speech_idx], n_speakers, max_speakers))
+
+    # each window stands for the hop-long slice around its centre
+    centre = starts + window_seconds / 2
+    slice_start = np.maximum(centre - hop_seconds / 2, 0.0)
+    slice_end = centre + hop_seconds / 2
+
+    # a turn ends where the label changes or speech stops
+    changes = np.flatnonzero(labels[1:] != labels[:-1]) + 1
+    bounds = np.concatenate(([0], changes, [len(labels)]))
+    order = {}
+    turns = []
+    for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+        if labels[a] < 0:
+            continue
+        speaker = order.setdefault(int(labels[a]), len(order))
+        turns.append({
+            "start": round(float(slice_start[a]), 3),
+            "end": round(float(slice_end[b - 1]), 3),
+            "speaker": f"SPEAKER_{speaker:02d}",
+        })
+    return turns
@@ -2,29 +2,240 @@ import numpy as np
 from tqdm import tqdm
 
 
-def merge_transcriptions(diarization_txt_path, transcript_segments, diarize_df):
-    # If True, assign speakers even when there's no direct time overlap
-    fill_nearest = True
+def _speaker_scores(seg_start, seg_end, turn_start, turn_end, fill_nearest):
+    """
+    Summed intersection between every transcript segment and one speaker's turns.
+
+    Equivalent to summing min(turn_end, seg_end) - max(turn_start, seg_start) over
+    the speaker's turns (only the positive ones when fill_nearest is False), but
+    computed with sorted arrays, prefix sums and searchsorted instead of a scan
+    over all turns per segment. Returns (scores, hits) where hits counts the
+    turns with a positive overlap.
+    """
+    starts = np.sort(turn_start)
+    ends = np.sort(turn_end)
+    start_cum = np.concatenate(([0.0], np.cumsum(starts)))
+    end_cum = np.concatenate(([0.0], np.cumsum(ends)))
+    n = len(starts)
+
+    if fill_nearest:
+        # sum min(e, E) = sum of ends below E + E * (#ends >= E)
+        k_end = np.searchsorted(ends, seg_end, side="left")
+        sum_min_end = end_cum[k_end] + seg_end * (n - k_end)
+        # sum max(s, S) = S * (#starts <= S) + sum of starts above S
+        k_start = np.searchsorted(starts, seg_start, side="right")
+        sum_max_start = seg_start * k_start + (start_cum[n] - start_cum[k_start])
+        scores = sum_min_end - sum_max_start
+        hits = np.full(len(seg_start), n)
+        return scores, hits
+
+    # Overlapping turns are {s < E} minus {e <= S} (for S < E every turn ending
+    # at or before S also starts before E).
+    n_start_below_end = np.searchsorted(starts, seg_end, side="left")   # s < E
+    n_end_below_end = np.searchsorted(ends, seg_end, side="left")       # e < E
+    n_start_upto_start = np.searchsorted(starts, seg_start, side="right")  # s <= S
+    n_end_upto_start = np.searchsorted(ends, seg_start, side="right")      # e <= S
+    n_start_upto_start = np.minimum(n_start_upto_start, n_start_below_end)
+
+    # turns with s < E: sum min(e, E) - sum max(s, S)
+    sum_min_end = end_cum[n_end_below_end] + seg_end * (n_start_below_end - n_end_below_end)
+    sum_max_start = seg_start * n_start_upto_start + (
+        start_cum[n_start_below_end] - start_cum[n_start_upto_start]
+    )
+    # minus turns with e <= S, each contributing e - S
+    before = end_cum[n_end_upto_start] - seg_start * n_end_upto_start
+
+    scores = sum_min_end - sum_max_start - before
+    hits = n_start_below_end - n_end_upto_start
+    return scores, hits
+
+
+def _best_speakers(seg_start, seg_end, diarize_df, fill_nearest=True):
+    """
+    Vectorized speaker vote for intervals [seg_start, seg_end).
+
+    Returns (speakers, codes): the speaker labels and, per interval, the index
+    of its speaker in them (-1 for "Unknown").
+    """
+    n_segs = len(seg_start)
+    turns = diarize_df[["start", "end", "speaker"]].dropna(subset=["speaker"])
+    if not fill_nearest:
+        # zero-length turns can never have a positive intersection
+        turns = turns[turns["end"] > turns["start"]]
+    if len(turns) == 0:
+        return np.array([], dtype=object), np.full(n_segs, -1, dtype=np.int64)
+
+    turn_start = turns["start"].to_numpy(dtype=np.float64)
+    turn_end = turns["end"].to_numpy(dtype=np.float64)
+    speakers, speaker_codes = np.unique(turns["speaker"].to_numpy(), return_inverse=True)
+
+    # one column per speaker, vectorized over all segments
+    scores = np.empty((n_segs, len(speakers)))
+    hits = np.empty((n_segs, len(speakers)), dtype=np.int64)
+    for k in range(len(speakers)):
+        mask = speaker_codes == k
+        scores[:, k], hits[:, k] = _speaker_scores(
+            seg_start, seg_end, turn_start[mask], turn_end[mask], fill_nearest
+        )
+
+    if not fill_nearest:
+        # speakers without an overlapping turn take no part in the vote
+        scores[hits == 0] = -np.inf
+
+    codes = np.argmax(scores, axis=1)
+    if not fill_nearest:
+        no_hit = (hits.sum(axis=1) == 0) | (seg_end <= seg_start)
+        codes[no_hit] = -1
+    return speakers, codes
+
+
+def assign_speakers(transcript_segments, diarize_df, fill_nearest=True):
+    """
+    Return the speaker label for each transcript segment.
+
+    The speaker is the one whose turns have the largest summed intersection with
+    the segment (same rule as the original per-segment pandas loop). When
+    fill_nearest is False only turns that actually overlap the segment count,
+    and segments without any overlap get "Unknown". diarize_df is not modified.
+    """
+    n_segs = len(transcript_segments)
+    if n_segs == 0:
+        return []
+
+    seg_start = np.fromiter((seg["start"] for seg in transcript_segments), dtype=np.float64, count=n_segs)
+    seg_end = np.fromiter((seg["end"] for seg in transcript_segments), dtype=np.float64, count=n_segs)
+
+    speakers, codes = _best_speakers(seg_start, seg_end, diarize_df, fill_nearest)
+    labels = np.append(speakers.astype(object), "Unknown")  # code -1 -> "Unknown"
+    return labels[codes].tolist()
+
+
+def flatten_words(transcript_segments):
+    """
+    All words of a transcript as arrays: (start, end, text, segment index).
+
+    Segments transcribed without word timestamps count as one word spanning
+    the whole segment.
+    """
+    starts, ends, texts, owners = [], [], [], []
+    for i, seg in enumerate(transcript_segments):
+        words = seg.get("words") or [{"start": seg["start"], "end": seg["end"], "word": seg["text"]}]
+        starts.extend(w["start"] for w in words)
+        ends.extend(w["end"] for w in words)
+        texts.extend(w["word"] for w in words)
+        owners.extend([i] * len(words))
+    return (
+        np.asarray(starts, dtype=np.float64),
+        np.asarray(ends, dtype=np.float64),
+        texts,
+        np.asarray(owners, dtype=np.int64),
+    )
+
+
+def _word_speakers(word_start, word_end, diarize_df, fill_nearest=True):
+    """
+    Speaker of every word: the speaker with the most overlap with it. Words
+    that overlap no turn get the nearest turn's speaker when fill_nearest is
+    True (found with searchsorted on turns sorted by start and by end), else
+    "Unknown". Returns (speakers, codes) like _best_speakers.
+
+    Unlike the segment vote, turns far from a word don't count: summed over a
+    whole meeting, their negative "intersections" would outweigh the turn
+    the word is actually in.
+    """
+    word_end = np.maximum(word_end, word_start + 1e-3)  # zero-length words still overlap their turn
+    turns = diarize_df[["start", "end", "speaker"]].dropna(subset=["speaker"])
+    speakers, turn_codes = np.unique(turns["speaker"].to_numpy(), return_inverse=True)
+    codes = np.full(len(word_start), -1, dtype=np.int64)
+    if len(turns) == 0:
+        return speakers, codes
+
+    overlap_speakers, overlap_codes = _best_speakers(word_start, word_end, diarize_df, fill_nearest=False)
+    hit = overlap_codes >= 0
+    if hit.any():
+        codes[hit] = np.searchsorted(speakers, overlap_speakers)[overlap_codes[hit]]
+
+    missing = np.flatnonzero(~hit)
+    if fill_nearest and len(missing):
+        turn_start = turns["start"].to_numpy(dtype=np.float64)
+        turn_end = turns["end"].to_numpy(dtype=np.float64)
+        by_start, by_end = np.argsort(turn_start), np.argsort(turn_end)
+        n = len(turns)
+        S, E = word_start[missing], word_end[missing]
+        after = np.searchsorted(turn_start[by_start], E, side="left")      # first turn starting at/after E
+        before = np.searchsorted(turn_end[by_end], S, side="right") - 1    # last turn ending at/before S
+        after_turn = by_start[np.minimum(after, n - 1)]
+        before_turn = by_end[np.maximum(before, 0)]
+        gap_after = np.where(after < n, turn_start[after_turn] - E, np.inf)
+        gap_before = np.where(before >= 0, S - turn_end[before_turn], np.inf)
+        nearest = np.where(gap_before <= gap_after, before_turn, after_turn)
+        codes[missing] = turn_codes[nearest]
+
+    return speakers, codes
+
+
+def split_at_speaker_changes(word_start, word_end, word_text, word_segment, diarize_df, fill_nearest=True):
+    """
+    Give every word its own speaker and cut the transcript where the speaker
+    (or the Whisper segment) changes.
+
+    Speakers are looked up for all word intervals at once (_word_speakers) and
+    the cut points are found with array comparisons, so the only per-word
+    Python work is joining the text.
+    Returns [{"start", "end", "text", "speaker", "segment"}] in order.
+    """
+    if len(word_start) == 0:
+        return []
+    speakers, codes = _word_speakers(word_start, word_end, diarize_df, fill_nearest)
+    labels = np.append(speakers.astype(object), "Unknown")
+
+    cuts = np.flatnonzero((codes[1:] != codes[:-1]) | (word_segment[1:] != word_segment[:-1])) + 1
+    bounds = np.concatenate(([0], cuts, [len(codes)]))
+    return [
+        {
+            "start": float(word_start[a]),
+            "end": float(word_end[b - 1]),
+            "text": "".join(word_text[a:b]).strip(),
+            "speaker": labels[codes[a]],
+            "segment": int(word_segment[a]),
+        }
+        for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist())
+    ]
+
+
+def assign_word_speakers(transcript_segments, diarize_df, fill_nearest=True):
+    """Speaker-homogeneous pieces of transcript_segments (see split_at_speaker_changes)."""
+    return split_at_speaker_changes(*flatten_words(transcript_segments), diarize_df, fill_nearest)
+
+
+def speaker_pieces(transcript_segments, diarize_df, fill_nearest=True):
+    """
+    Speaker-attributed pieces of a transcript: split at speaker changes when
+    the transcript has word timestamps, otherwise one piece per segment with
+    the segment-level speaker (assign_speakers).
+    """
+    if any(seg.get("words") for seg in transcript_segments):
+        return assign_word_speakers(transcript_segments, diarize_df, fill_nearest)
+    speakers = assign_speakers(transcript_segments, diarize_df, fill_nearest=fill_nearest)
+    return [
+        {"start": seg["start"], "end": seg["end"], "text": seg["text"].strip(), "speaker": speaker, "segment": i}
+        for i, (seg, speaker) in enumerate(zip(transcript_segments, speakers))
+    ]
+
+
+def merge_transcriptions(diarization_txt_path, transcript_segments, diarize_df, fill_nearest=True):
+    # If fill_nearest is True, assign speakers even when there's no direct time overlap.
+    # With word timestamps segments are split where the speaker changes;
+    # without them every segment gets one speaker, as before.
+    pieces = speaker_pieces(transcript_segments, diarize_df, fill_nearest=fill_nearest)
 
     with open(diarization_txt_path, "w", encoding="utf-8") as f:
-        for seg in tqdm(transcript_segments, desc="🔗 Merging speakers with transcript", unit="segment"):
-            # assign speaker to segment (if any)
-            diarize_df['intersection'] = np.minimum(diarize_df['end'], seg['end']) - np.maximum(diarize_df['start'], seg['start'])
-            diarize_df['union'] = np.maximum(diarize_df['end'], seg['end']) - np.minimum(diarize_df['start'], seg['start'])
-            # remove no hit, otherwise we look for closest (even negative intersection...)
-            if not fill_nearest:
-                dia_tmp = diarize_df[diarize_df['intersection'] > 0]
-            else:
-                dia_tmp = diarize_df
-            if len(dia_tmp) > 0:
-                # sum over speakers
-                speaker = dia_tmp.groupby("speaker")["intersection"].sum().sort_values(ascending=False).index[0]
-            else:
-                speaker = "Unknown"
-
-            seg["speaker"] = speaker
-
-            f.write(f"[{speaker}] : {seg['text'].strip()}\n")
+        previous = -1
+        for piece in tqdm(pieces, desc="🔗 Merging speakers with transcript", unit="segment"):
+            if piece["segment"] != previous:  # a split segment keeps its first speaker
+                transcript_segments[piece["segment"]]["speaker"] = piece["speaker"]
+                previous = piece["segment"]
 
-    return True
+            f.write(f"[{piece['speaker']}] : {piece['text']}\n")
 
+    return True
@@ -0,0 +1,169 @@
+"""
+Incremental (rolling) summarization for live meetings.
+
+Transcript segments are fed in as they arrive. Text is cut into sentences and
+chunks with the same rules as summarize_large_text (split_into_sentences +
+split_into_chunks' overlap logic), and every chunk is summarized exactly once,
+as soon as it is complete. Refreshing the rolling summary therefore only
+costs the newly completed chunks plus, optionally, one pass over the chunk
+that is still filling up — never the whole meeting.
+
+    rolling = RollingSummarizer()
+    for line in live_lines:
+        rolling.add_segment(line)
+        print(rolling.refresh())
+    final_summary = rolling.finish()   # same text as summarize_large_text
+    final_summary = rolling.finish(hierarchical=True)   # ... as summarize_large_text(hierarchical=True)
+"""
+import time
+from milestone_4.summarizer import (
+    DEFAULT_MODEL_NAME,
+    _ChunkBuilder,
+    get_summarizer,
+    reduce_summaries,
+    split_into_sentences,
+    summarize_chunks,
+)
+
+MIN_PARTIAL_WORDS = 60  # don't summarize the open chunk before it has this many words
+
+
+class RollingSummarizer:
+    """
+    Keeps one summary per completed chunk plus an optional summary of the
+    chunk still being filled. summary() joins them like summarize_large_text.
+    """
+
+    def __init__(
+        self,
+        max_chunk_words=500,
+        overlap_words=80,
+        min_summary_words=100,
+        max_summary_words=150,
+        model_name=DEFAULT_MODEL_NAME,
+        device=-1,
+        summarizer=None,
+        segment_separator="\n",
+        cache=None,
+    ):
+        self.min_summary_words = min_summary_words
+        self.max_summary_words = max_summary_words
+        self.model_name = model_name
+        self.device = device
+        self.segment_separator = segment_separator
+        self._summarizer = summarizer
+        self.cache = cache  # optional ChunkSummaryCache for completed chunks
+
+        self._chunks = _ChunkBuilder(max_chunk_words, overlap_words)
+        self._tail = ""              # text after the last confirmed sentence boundary
+        self._ready = []             # completed chunks waiting to be summarized
+        self.chunk_summaries = []    # one per completed chunk, in order
+        self._partial = ("", "")     # (open chunk text, its summary)
+        self.stats = {"chunks": 0, "partial_refreshes": 0, "inference_seconds": 0.0}
+
+    # ---------- input ----------
+    def add_segment(self, text):
+        """
+        Append one transcript segment (e.g. "[SPEAKER_00] : text"). Only
+        sentences whose end is confirmed by the start of the next one are
+        chunked; the unfinished sentence waits for more text.
+        """
+        text = text.strip()
+        if not text:
+            return
+        self._tail = f"{self._tail}{self.segment_separator}{text}" if self._tail else text
+        sentences = split_into_sentences(self._tail)
+        if len(sentences) < 2:
+            return
+        self._tail = sentences[-1]
+        for sent in sentences[:-1]:
+            chunk = self._chunks.add(sent)
+            if chunk is not None:
+                self._ready.append(chunk)
+
+    # ---------- summarization ----------
+    def _get_summarizer(self):
+        if self._summarizer is None:
+            self._summarizer, _ = get_summarizer(self.model_name, self.device)
+        return self._summarizer
+
+    def _summarize(self, chunks, min_words, max_words, cache=None):
+        start = time.perf_counter()
+        summaries = summarize_chunks(
+            self._get_summarizer(), chunks, min_words, max_words,
+            cache=cache, model_name=self.model_name, device=self.device,
+        )
+        self.stats["inference_seconds"] += time.perf_counter() - start
+        return summaries
+
+    def _summarize_ready(self):
+        if self._ready:
+            self.chunk_summaries.extend(
+                self._summarize(self._ready, self.min_summary_words, self.max_summary_words, self.cache)
+            )
+            self.stats["chunks"] += len(self._ready)
+            self._ready = []
+
+    def _open_chunk(self):
+        return " ".join(s for s in (self._chunks.pending(), self._tail) if s)
+
+    def refresh(self, include_partial=True):
+        """
+        Summarize newly completed chunks and return the rolling summary.
+
+        With include_partial, the open chunk (at most ~max_chunk_words words) is
+        summarized too once it has MIN_PARTIAL_WORDS words; it is re-summarized
+        only when its text changed since the last refresh.
+        """
+        self._summarize_ready()
+
+        if include_partial:
+            text = self._open_chunk()
+            n_words = len(text.split())
+            if n_words < MIN_PARTIAL_WORDS:
+                self._partial = ("", "")
+            elif text != self._partial[0]:
+                # a short open chunk can't yield min_summary_words words
+                min_words = min(self.min_summary_words, n_words // 2)
+                max_words = max(min_words + 1, min(self.max_summary_words, n_words))
+                summary = self._summarize([text], min_words, max_words)[0]
+                self._partial = (text, summary)
+                self.stats["partial_refreshes"] += 1
+        return self.summary(include_partial)
+
+    def summary(self, include_partial=True):
+        """Current rolling summary, without running the model."""
+        parts = list(self.chunk_summaries)
+        if include_partial and self._partial[1]:
+            parts.append(self._partial[1])
+        return "\n\n".join(parts)
+
+    def finish(self, hierarchical=False, target_words=300, fan_out=4, max_depth=4):
+        """
+        Close the meeting: the unfinished sentence and the open chunk are
+        summarized as regular chunks. Returns the final summary, which matches
+        summarize_large_text on the full transcript with the same options: with
+        hierarchical, the chunk summaries are reduced (reduce_summaries) to
+        about target_words words, as main.py's pipeline does.
+        """
+        if self._tail:
+            chunk = self._chunks.add(self._tail)
+            if chunk is not None:
+                self._ready.append(chunk)
+            self._tail = ""
+        if self._chunks.sentences:
+            self._ready.append(self._chunks.pending())
+            self._chunks.sentences, self._chunks.word_count = [], 0
+        self._partial = ("", "")
+        self._summarize_ready()
+        if not hierarchical:
+            return self.summary(include_partial=False)
+
+        start = time.perf_counter()
+        final_summary, _ = reduce_summaries(
+            self._get_summarizer(), self.chunk_summaries, target_words, fan_out, max_depth,
+            min_summary_words=self.min_summary_words, max_summary_words=self.max_summary_words,
+            cache=self.cache, model_name=self.model_name, device=self.device,
+        )
+        self.stats["inference_seconds"] += time.perf_counter() - start
+        return final_summary
@@ -0,0 +1,156 @@
+"""
+Local stub of the pyannote.ai endpoints used by this project.
+
+Mimics POST /v1/media/input, PUT of the presigned upload URL, POST /v1/diarize
+and GET /v1/jobs/{id}. Jobs "run" for a configurable time and then return
+synthetic speaker turns covering the uploaded audio, so the diarization clients
+(sync and async) can be tested and benchmarked without network access or an
+API key.
+
+Run stand-alone:
+    python -m milestone_4.stub_pyannote --port 8765 --job-seconds 5
+then point the clients at it:
+    PYANNOTE_API_URL=http://127.0.0.1:8765/v1
+"""
+import io
+import time
+import uuid
+import wave
+import random
+import argparse
+import asyncio
+import threading
+from aiohttp import web
+
+
+def synthetic_turns(duration, n_speakers=2, seed=0):
+    """Alternating speaker turns of 2–12 s covering [0, duration]."""
+    rng = random.Random(seed)
+    turns, t, speaker = [], 0.0, 0
+    while t < duration:
+        end = min(duration, t + rng.uniform(2.0, 12.0))
+        turns.append({"start": round(t, 3), "end": round(end, 3), "speaker": f"SPEAKER_{speaker:02d}"})
+        t = end + rng.uniform(0.0, 0.5)
+        speaker = (speaker + rng.randint(1, max(n_speakers - 1, 1))) % n_speakers
+    return turns
+
+
+def _audio_duration(data):
+    """Duration of an uploaded WAV (falls back to 16 kHz 16-bit mono for raw bytes)."""
+    try:
+        with wave.open(io.BytesIO(data)) as w:
+            return w.getnframes() / w.getframerate()
+    except (wave.Error, EOFError):
+        return len(data) / (16000 * 2)
+
+
+def create_app(job_seconds=5.0, seconds_per_audio_minute=0.0, n_speakers=2, retry_after=None):
+    """
+    Build the stub aiohttp app.
+
+    A job succeeds job_seconds + seconds_per_audio_minute * audio minutes after
+    it is created. If retry_after is set, it is sent as a Retry-After header on
+    status responses of running jobs.
+    """
+    media = {}  # object key -> uploaded bytes
+    jobs = {}   # job id -> {"ready_at", "duration", "polls"}
+    stats = {"uploads": 0, "jobs": 0, "polls": 0}
+
+    async def media_input(request):
+        body = await request.json()
+        key = body["url"].split("media://", 1)[-1]
+        base = f"{request.scheme}://{request.host}"
+        return web.json_response({"url": f"{base}/upload/{key}"})
+
+    async def upload(request):
+        key = request.match_info["key"]
+        media[key] = await request.read()
+        stats["uploads"] += 1
+        return web.Response(status=200)
+
+    async def diarize(request):
+        body = await request.json()
+        key = body["url"].split("media://", 1)[-1]
+        if key not in media:
+            return web.json_response({"error": f"unknown media {key}"}, status=404)
+        duration = _audio_duration(media.pop(key))
+        job_id = str(uuid.uuid4())
+        jobs[job_id] = {
+            "ready_at": time.monotonic() + job_seconds + seconds_per_audio_minute * duration / 60,
+            "duration": duration,
+            "polls": 0,
+        }
+        stats["jobs"] += 1
+        return web.json_response({"jobId": job_id, "status": "created"})
+
+    async def job_status(request):
+        job = jobs.get(request.match_info["job_id"])
+        if job is None:
+            return web.json_response({"error": "not found"}, status=404)
+        job["polls"] += 1
+        stats["polls"] += 1
+        if time.monotonic() < job["ready_at"]:
+            headers = {"Retry-After": str(retry_after)} if retry_after is not None else None
+            return web.json_response({"status": "running"}, headers=headers)
+        turns = synthetic_turns(job["duration"], n_speakers=n_speakers)
+        return web.json_response({"status": "succeeded", "output": {"diarization": turns}})
+
+    app = web.Application(client_max_size=1024 ** 3)
+    app["stats"] = stats
+    app.router.add_post("/v1/media/input", media_input)
+    app.router.add_put("/upload/{key}", upload)
+    app.router.add_post("/v1/diarize", diarize)
+    app.router.add_get("/v1/jobs/{job_id}", job_status)
+    return app
+
+
+def start_stub_server(port=0, **app_options):
+    """
+    Start the stub in a background thread.
+
+    Returns (base_url, stats, stop) — base_url ends in /v1 and can be passed as
+    base_url= to the diarization clients; call stop() to shut it down.
+    """
+    loop = asyncio.new_event_loop()
+    app = create_app(**app_options)
+    runner = web.AppRunner(app)
+    started = threading.Event()
+    holder = {}
+
+    def serve():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(runner.setup())
+        site = web.TCPSite(runner, "127.0.0.1", port)
+        loop.run_until_complete(site.start())
+        holder["port"] = site._server.sockets[0].getsockname()[1]
+        started.set()
+        loop.run_forever()
+        loop.run_until_complete(runner.cleanup())
+        loop.close()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    started.wait()
+
+    def stop():
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+
+    return f"http://127.0.0.1:{holder['port']}/v1", app["stats"], stop
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--job-seconds", type=float, default=5.0)
+    parser.add_argument("--seconds-per-audio-minute", type=float, default=0.0)
+    parser.add_argument("--speakers", type=int, default=2)
+    args = parser.parse_args()
+
+    app = create_app(args.job_seconds, args.seconds_per_audio_minute, args.speakers)
+    print(f"🧪 Stub pyannote API on http://127.0.0.1:{args.port}/v1")
+    web.run_app(app, host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,78 @@
+import os
 import re
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from transformers import pipeline
 from tqdm import tqdm
+from milestone_4.summary_cache import ChunkSummaryCache, chunk_key
+
+DEFAULT_MODEL_NAME = "facebook/bart-large-cnn"
+PRECISIONS = ("float32", "dynamic_int8")  # dynamic_int8: int8 Linear weights, CPU only
+
+# ==== Summarizer cache ====
+MAX_LOADED_SUMMARIZERS = int(os.getenv("SUMMARIZER_MAX_MODELS", "1"))
+WARM_UP_TEXT = "The meeting started on time. The team reviewed the agenda and agreed on next steps."
+
+# (model_name, device, precision) -> {"pipeline": ..., "load_seconds": float}
+_summarizers = OrderedDict()
+_summarizers_lock = threading.RLock()
+
+
+def _quantize_dynamic(summarizer):
+    """Swap the model's Linear layers for dynamically quantized int8 ones (CPU)."""
+    import torch
+
+    summarizer.model = torch.quantization.quantize_dynamic(
+        summarizer.model, {torch.nn.Linear}, dtype=torch.qint8
+    )
+    return summarizer
+
+
+def get_summarizer(model_name=DEFAULT_MODEL_NAME, device=-1, warm_up=True, precision="float32"):
+    """
+    Return a cached summarization pipeline for (model_name, device, precision).
+
+    The first call loads the weights and tokenizer (and optionally runs a short
+    warm-up pass); later calls in the same process reuse the loaded pipeline.
+    precision="dynamic_int8" quantizes the Linear layers to int8 after loading
+    (CPU only). Returns (summarizer, load_seconds) where load_seconds is 0.0 on
+    a cache hit.
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown summarizer precision '{precision}', expected one of {PRECISIONS}")
+    if precision == "dynamic_int8" and device != -1:
+        raise ValueError("dynamic_int8 quantization is only supported on CPU (device=-1)")
+
+    key = (model_name, device, precision)
+    with _summarizers_lock:
+        entry = _summarizers.get(key)
+        if entry is not None:
+            _summarizers.move_to_end(key)
+            return entry["pipeline"], 0.0
+
+        print(f"⏳ Loading summarization model '{model_name}' (device={device}, {precision})...")
+        start = time.perf_counter()
+        summarizer = pipeline("summarization", model=model_name, device=device)
+        if precision == "dynamic_int8":
+            summarizer = _quantize_dynamic(summarizer)
+        if warm_up:
+            summarizer(WARM_UP_TEXT, max_length=20, min_length=5, do_sample=False)
+        load_seconds = time.perf_counter() - start
+        print(f"✅ Summarization model loaded in {load_seconds:.2f}s")
+
+        _summarizers[key] = {"pipeline": summarizer, "load_seconds": load_seconds}
+        while len(_summarizers) > max(MAX_LOADED_SUMMARIZERS, 1):
+            old_key, _ = _summarizers.popitem(last=False)
+            print(f"♻️ Unloading summarization model {old_key}")
+        return summarizer, load_seconds
+
+
+def clear_summarizers():
+    """Unload every cached summarization pipeline."""
+    with _summarizers_lock:
+        _summarizers.clear()
 
 
 def split_into_sentences(text):
@@ -12,66 +84,381 @@ def split_into_sentences(text):
     return [s.strip() for s in sentences if s.strip()]
 
 
-def summarize_large_text(
-    transcript_path,
-    max_chunk_words=500,
-    overlap_words=80,
-    min_summary_words=100,
-    max_summary_words=150,
-    model_name="facebook/bart-large-cnn",
-    device=-1  # set to 0 for GPU
-):
-    # --- Load transcript ---
-    with open(transcript_path, "r", encoding="utf-8") as f:
-        text = f.read().strip()
+class _ChunkBuilder:
+    """
+    Sentence-at-a-time chunker behind split_into_chunks: add() returns a chunk
+    as soon as one is complete, so live transcripts can be chunked as they grow.
+    """
 
-    # --- Split into sentences ---
-    sentences = split_into_sentences(text)
-    chunks, temp, word_count = [], [], 0
+    def __init__(self, max_chunk_words=500, overlap_words=80):
+        self.max_chunk_words = max_chunk_words
+        self.overlap_words = overlap_words
+        self.sentences = []
+        self.word_count = 0
 
-    for sent in tqdm(sentences, desc="🧩 Creating chunks", unit="sentence"):
+    def add(self, sent):
         w = len(sent.split())
-        if word_count + w > max_chunk_words and temp:
-            chunks.append(" ".join(temp))
+        if self.word_count + w > self.max_chunk_words and self.sentences:
+            chunk = " ".join(self.sentences)
 
             # ✅ Dynamic overlap using overlap_words
             overlap_count, overlap_sents = 0, []
-            for s in reversed(temp):
+            for s in reversed(self.sentences):
                 overlap_count += len(s.split())
                 overlap_sents.insert(0, s)
-                if overlap_count >= overlap_words:
+                if overlap_count >= self.overlap_words:
                     break
 
             # Start new chunk with overlap + current sentence
-            temp = overlap_sents + [sent]
-            word_count = sum(len(s.split()) for s in temp)
+            self.sentences = overlap_sents + [sent]
+            self.word_count = sum(len(s.split()) for s in self.sentences)
+            return chunk
+
+        self.sentences.append(sent)
+        self.word_count += w
+        return None
+
+    def pending(self):
+        """Text of the chunk still being filled ("" if empty)."""
+        return " ".join(self.sentences)
+
+
+def split_into_chunks(text, max_chunk_words=500, overlap_words=80):
+    """
+    Group sentences into chunks of at most ~max_chunk_words words, starting each
+    new chunk with the last ~overlap_words words of the previous one.
+    """
+    builder = _ChunkBuilder(max_chunk_words, overlap_words)
+    chunks = []
+
+    for sent in tqdm(split_into_sentences(text), desc="🧩 Creating chunks", unit="sentence"):
+        chunk = builder.add(sent)
+        if chunk is not None:
+            chunks.append(chunk)
+
+    if builder.sentences:
+        chunks.append(builder.pending())
+
+    return chunks
+
+
+def _chunk_lengths(summarizer, chunks):
+    """Token length of each chunk (word count if the tokenizer is unavailable)."""
+    tokenizer = getattr(summarizer, "tokenizer", None)
+    if tokenizer is None:
+        return [len(c.split()) for c in chunks]
+    return [len(ids) for ids in tokenizer(chunks, truncation=True)["input_ids"]]
+
+
+def _cache_model(model_name, precision):
+    """Model part of the chunk cache key: quantized summaries differ slightly, so they are kept apart."""
+    return model_name if precision == "float32" else f"{model_name}@{precision}"
+
+
+def summarize_chunks(
+    summarizer,
+    chunks,
+    min_summary_words=100,
+    max_summary_words=150,
+    batch_size=1,
+    cache=None,
+    model_name=DEFAULT_MODEL_NAME,
+    device=-1,
+    precision="float32",
+):
+    """
+    Summarize each chunk and return the summaries in the original chunk order.
+
+    With a ChunkSummaryCache, chunks summarized before with the same model_name,
+    precision and lengths are read from the cache and only the misses are run
+    (and then stored). summarizer may be None when the caller expects every
+    chunk to be cached; on a miss the model is then loaded with get_summarizer
+    (model_name, device, precision).
+
+    With batch_size == 1 chunks are summarized one at a time. With a larger
+    batch_size chunks are sorted by token length so that each batch holds
+    chunks of similar length (padding is only to the longest chunk in the
+    batch), summarized batch by batch, and put back in their original order.
+    """
+    if cache is not None:
+        cache_model = _cache_model(model_name, precision)
+        keys = [chunk_key(c, cache_model, min_summary_words, max_summary_words) for c in chunks]
+        cached = cache.get_many(keys)
+        todo = {k: c for k, c in zip(keys, chunks) if k not in cached}  # also dedupes repeats
+        if todo:
+            if summarizer is None:  # entries evicted since the caller checked the cache
+                summarizer, _ = get_summarizer(model_name, device, precision=precision)
+            fresh = summarize_chunks(
+                summarizer, list(todo.values()), min_summary_words, max_summary_words, batch_size
+            )
+            fresh = dict(zip(todo.keys(), fresh))
+            cache.put_many(fresh)
+            cached.update(fresh)
+        return [cached[k] for k in keys]
+
+    # shared by the sequential and batched paths, so batch_size never changes a
+    # chunk's summary (chunk_key doesn't include these settings)
+    gen_kwargs = {
+        "max_length": max_summary_words,
+        "min_length": min_summary_words,
+        "do_sample": False,
+        "truncation": True,
+    }
+
+    if batch_size <= 1:
+        summaries = []
+        for chunk in tqdm(chunks, desc="🧠 Summarizing chunks", unit="chunk"):
+            result = summarizer(chunk, **gen_kwargs)[0]['summary_text']
+            summaries.append(result.strip())
+        return summaries
+
+    # --- Length buckets: neighbours in sorted order have similar lengths ---
+    lengths = _chunk_lengths(summarizer, chunks)
+    order = sorted(range(len(chunks)), key=lambda i: lengths[i])
+
+    summaries = [None] * len(chunks)
+    with tqdm(total=len(chunks), desc="🧠 Summarizing chunks (batched)", unit="chunk") as bar:
+        for b in range(0, len(order), batch_size):
+            idx = order[b:b + batch_size]
+            results = summarizer(
+                [chunks[i] for i in idx],
+                batch_size=len(idx),
+                **gen_kwargs,
+            )
+            for i, result in zip(idx, results):
+                summaries[i] = result['summary_text'].strip()
+            bar.update(len(idx))
+
+    return summaries
+
+
+def summarize_chunks_parallel(summarizer, chunks, workers=1, **kwargs):
+    """
+    summarize_chunks over a thread pool: chunks are dealt round-robin to
+    `workers` threads sharing one pipeline (PyTorch releases the GIL during
+    inference) and the summaries come back in the original order. kwargs are
+    passed to summarize_chunks. With many workers, consider lowering
+    torch.set_num_threads so the threads don't oversubscribe the CPU.
+    """
+    workers = max(1, min(workers, len(chunks)))
+    if workers == 1:
+        return summarize_chunks(summarizer, chunks, **kwargs)
+
+    slices = [list(range(w, len(chunks), workers)) for w in range(workers)]
+    summaries = [None] * len(chunks)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(summarize_chunks, summarizer, [chunks[i] for i in idx], **kwargs)
+            for idx in slices
+        ]
+        for idx, future in zip(slices, futures):
+            for i, summary in zip(idx, future.result()):
+                summaries[i] = summary
+    return summaries
+
+
+def _run_level(levels, name, summarizer, inputs, map_workers, min_words, max_words, **kwargs):
+    """Summarize one tree level and record its timing in levels."""
+    start = time.perf_counter()
+    outputs = summarize_chunks_parallel(
+        summarizer, inputs, map_workers,
+        min_summary_words=min_words, max_summary_words=max_words, **kwargs,
+    )
+    levels.append({
+        "level": name,
+        "inputs": len(inputs),
+        "outputs": len(outputs),
+        "words": sum(len(o.split()) for o in outputs),
+        "seconds": round(time.perf_counter() - start, 3),
+    })
+    print(f"🌳 Level {name}: {len(inputs)} → {len(outputs)} summaries in {levels[-1]['seconds']:.2f}s")
+    return outputs
+
+
+def reduce_summaries(
+    summarizer,
+    summaries,
+    target_words=300,
+    fan_out=4,
+    max_depth=4,
+    map_workers=1,
+    min_summary_words=100,
+    max_summary_words=150,
+    levels=None,
+    **kwargs,
+):
+    """
+    Reduce step of summarize_hierarchical, on chunk summaries that already
+    exist (e.g. RollingSummarizer's): consecutive groups of fan_out summaries
+    are joined and summarized again, level by level, until the text fits in
+    target_words words, one summary is left, or max_depth levels have run.
+
+    Returns (summary, levels); new levels are appended to `levels` if given.
+    """
+    fan_out = max(fan_out, 2)
+    levels = [] if levels is None else levels
+
+    depth = 0
+    while (
+        depth < max_depth and len(summaries) > 1
+        and sum(len(s.split()) for s in summaries) > target_words
+    ):
+        depth += 1
+        groups = [" ".join(summaries[i:i + fan_out]) for i in range(0, len(summaries), fan_out)]
+        if len(groups) == 1:
+            # last level: aim straight at the target length
+            min_words, max_words = min(min_summary_words, target_words // 2), target_words
         else:
-            temp.append(sent)
-            word_count += w
+            min_words, max_words = min_summary_words, max_summary_words
+        summaries = _run_level(
+            levels, f"reduce-{depth}", summarizer, groups, map_workers, min_words, max_words, **kwargs
+        )
+
+    return "\n\n".join(summaries), levels
+
+
+def summarize_hierarchical(
+    summarizer,
+    chunks,
+    target_words=300,
+    fan_out=4,
+    max_depth=4,
+    map_workers=1,
+    min_summary_words=100,
+    max_summary_words=150,
+    **kwargs,
+):
+    """
+    Map-reduce summarization.
 
-    if temp:
-        chunks.append(" ".join(temp))
+    Map: every chunk is summarized (in a pool of map_workers threads).
+    Reduce: consecutive groups of fan_out summaries are joined and summarized
+    again, level by level, until the text fits in target_words words, one
+    summary is left, or max_depth reduce levels have run (reduce_summaries).
+    Keep fan_out * max_summary_words within the model's input (~700 words for
+    BART). kwargs (batch_size, cache, model_name, device, precision) go to
+    summarize_chunks.
+
+    Returns (summary, levels) where levels lists, per tree level, the number
+    of inputs and outputs, the output word count and the seconds it took.
+    """
+    levels = []
+    summaries = _run_level(
+        levels, "map", summarizer, chunks, map_workers, min_summary_words, max_summary_words, **kwargs
+    )
+    return reduce_summaries(
+        summarizer, summaries, target_words, fan_out, max_depth, map_workers,
+        min_summary_words, max_summary_words, levels=levels, **kwargs,
+    )
+
+
+def summarize_large_text(
+    transcript_path,
+    max_chunk_words=500,
+    overlap_words=80,
+    min_summary_words=100,
+    max_summary_words=150,
+    model_name=DEFAULT_MODEL_NAME,
+    device=-1,  # set to 0 for GPU
+    return_timings=False,
+    batch_size=1,  # > 1 enables length-bucketed batched inference
+    use_cache=True,
+    cache=None,
+    hierarchical=False,  # map-reduce instead of one paragraph per chunk
+    target_words=300,
+    fan_out=4,
+    max_depth=4,
+    map_workers=1,
+    precision="float32",  # or "dynamic_int8"
+):
+    """
+    Summarize a long transcript file chunk by chunk.
+
+    By default the chunk summaries are joined as they are. With hierarchical,
+    they are reduced further with summarize_hierarchical until the summary
+    fits in about target_words words, and the chunks are summarized by
+    map_workers threads.
+
+    Chunk summaries are memoized in a ChunkSummaryCache (the shared default
+    one unless `cache` is given; use_cache=False disables it), so re-running
+    on a mostly unchanged transcript only summarizes the changed chunks.
+
+    Returns the summary text, or (summary, timings) when return_timings is True,
+    where timings holds "load_seconds", "inference_seconds", "cache_hits",
+    "cache_misses" and, in hierarchical mode, per-level timings in "levels".
+    """
+    # --- Load transcript ---
+    with open(transcript_path, "r", encoding="utf-8") as f:
+        text = f.read().strip()
+
+    # --- Split into overlapping chunks ---
+    chunks = split_into_chunks(text, max_chunk_words, overlap_words)
 
     print(f"🧩 Split into {len(chunks)} chunks with {overlap_words}-word overlap.")
 
-    # --- Load summarization model ---
-    summarizer = pipeline("summarization", model=model_name, device=device)
+    if use_cache and cache is None:
+        cache = ChunkSummaryCache()
+
+    # --- Load (or reuse) summarization model; not needed if every chunk is cached ---
+    cache_model = _cache_model(model_name, precision)
+    keys = [chunk_key(c, cache_model, min_summary_words, max_summary_words) for c in chunks]
+    if use_cache and cache.has_all(keys):
+        summarizer, load_seconds = None, 0.0
+    else:
+        summarizer, load_seconds = get_summarizer(model_name, device, precision=precision)
 
     # --- Summarize each chunk with progress bar ---
-    summaries = []
-    for chunk in tqdm(chunks, desc="🧠 Summarizing chunks", unit="chunk"):
-        result = summarizer(
-            chunk,
-            max_length=max_summary_words,
-            min_length=min_summary_words,
-            do_sample=False
-        )[0]['summary_text']
-        summaries.append(result.strip())
-
-    # --- Merge ---
-    final_summary = "\n\n".join(summaries)
+    hits_before, misses_before = (cache.hits, cache.misses) if cache is not None else (0, 0)
+
+    inference_start = time.perf_counter()
+    chunk_options = {
+        "batch_size": batch_size,
+        "cache": cache if use_cache else None,
+        "model_name": model_name,
+        "device": device,
+        "precision": precision,
+    }
+    levels = None
+    if hierarchical:
+        final_summary, levels = summarize_hierarchical(
+            summarizer,
+            chunks,
+            target_words=target_words,
+            fan_out=fan_out,
+            max_depth=max_depth,
+            map_workers=map_workers,
+            min_summary_words=min_summary_words,
+            max_summary_words=max_summary_words,
+            **chunk_options,
+        )
+    else:
+        summaries = summarize_chunks_parallel(
+            summarizer,
+            chunks,
+            map_workers,
+            min_summary_words=min_summary_words,
+            max_summary_words=max_summary_words,
+            **chunk_options,
+        )
+        # --- Merge ---
+        final_summary = "\n\n".join(summaries)
+    inference_seconds = time.perf_counter() - inference_start
+
+    cache_hits = cache_misses = 0
+    if use_cache:
+        cache_hits, cache_misses = cache.hits - hits_before, cache.misses - misses_before
+        print(f"🗃️ Chunk summary cache: {cache_hits} hits, {cache_misses} misses")
 
     print(f"\n✅ text summarization completed. Summary length: {len(final_summary.split())} words.")
+    print(f"⏱️ Model load: {load_seconds:.2f}s | Inference: {inference_seconds:.2f}s")
+    if return_timings:
+        return final_summary, {
+            "load_seconds": load_seconds,
+            "inference_seconds": inference_seconds,
+            "cache_hits": cache_hits,
+            "cache_misses": cache_misses,
+            "levels": levels,
+        }
     return final_summary
 
 
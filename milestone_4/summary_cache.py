@@ -0,0 +1,113 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+from pipeline.artifact_cache import CACHE_DIR
+
+# ==== Configuration ====
+SUMMARY_CACHE_PATH = os.getenv("SUMMARY_CACHE_PATH", os.path.join(CACHE_DIR, "chunk_summaries.sqlite"))
+SUMMARY_CACHE_MAX_ENTRIES = int(os.getenv("SUMMARY_CACHE_MAX_ENTRIES", "50000"))
+
+
+def chunk_key(chunk, model_name, min_summary_words, max_summary_words):
+    """Cache key of one chunk summary: hash of the chunk text and everything that shapes its summary."""
+    payload = json.dumps(
+        {"text": chunk, "model": model_name, "min": min_summary_words, "max": max_summary_words},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ChunkSummaryCache:
+    """
+    Persistent chunk-summary memo in a single SQLite file.
+
+    Entries are keyed by chunk_key(); each lookup refreshes last_used and the
+    least recently used entries are evicted once there are more than
+    max_entries. hits/misses count lookups made through this object.
+    """
+
+    def __init__(self, path=None, max_entries=None):
+        self.path = path or SUMMARY_CACHE_PATH
+        self.max_entries = max_entries if max_entries is not None else SUMMARY_CACHE_MAX_ENTRIES
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS chunk_summaries ("
+                " key TEXT PRIMARY KEY, summary TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON chunk_summaries (last_used)")
+
+    @contextmanager
+    def _connect(self):
+        # short-lived connections: safe to use from the dashboard's worker threads
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:  # commit on success, roll back on error
+                yield conn
+        finally:
+            conn.close()
+
+    def get_many(self, keys):
+        """Cached summaries for keys as {key: summary}; missing keys are left out."""
+        if not keys:
+            return {}
+        found = {}
+        with self._lock, self._connect() as conn:
+            unique = list(dict.fromkeys(keys))
+            for i in range(0, len(unique), 500):  # stay under SQLite's variable limit
+                batch = unique[i:i + 500]
+                marks = ",".join("?" * len(batch))
+                found.update(conn.execute(
+                    f"SELECT key, summary FROM chunk_summaries WHERE key IN ({marks})", batch
+                ).fetchall())
+                conn.execute(
+                    f"UPDATE chunk_summaries SET last_used = ? WHERE key IN ({marks})",
+                    [time.time(), *batch],
+                )
+            self.hits += sum(1 for k in keys if k in found)
+            self.misses += sum(1 for k in keys if k not in found)
+        return found
+
+    def has_all(self, keys):
+        """True if every key is cached (doesn't count as a lookup)."""
+        unique = list(dict.fromkeys(keys))
+        with self._connect() as conn:
+            for i in range(0, len(unique), 500):
+                batch = unique[i:i + 500]
+                marks = ",".join("?" * len(batch))
+                query = f"SELECT COUNT(*) FROM chunk_summaries WHERE key IN ({marks})"
+                if conn.execute(query, batch).fetchone()[0] < len(batch):
+                    return False
+        return True
+
+    def put_many(self, items):
+        """Store {key: summary} and evict least recently used entries over max_entries."""
+        if not items:
+            return
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO chunk_summaries (key, summary, last_used) VALUES (?, ?, ?)",
+                [(k, v, now) for k, v in items.items()],
+            )
+            conn.execute(
+                "DELETE FROM chunk_summaries WHERE key IN ("
+                " SELECT key FROM chunk_summaries ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (max(self.max_entries, 0),),
+            )
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM chunk_summaries").fetchone()[0]
+
+    def clear(self):
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM chunk_summaries")
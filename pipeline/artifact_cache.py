@@ -0,0 +1,208 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# ==== Configuration ====
+CACHE_DIR = os.getenv("PIPELINE_CACHE_DIR", ".pipeline_cache")
+CACHE_MAX_BYTES = int(float(os.getenv("PIPELINE_CACHE_MAX_GB", "5")) * 1024 ** 3)
+
+DONE_MARKER = ".done"  # written once every artifact of an entry is complete
+LOCK_SUFFIX = ".lock"  # <entry>.lock next to each entry: held by the job writing it
+LOCK_POLL_SECONDS = 1.0
+
+_lock = threading.Lock()
+_leases = {}  # entry dir -> open lock file, for the entries this process holds
+
+
+def hash_file(path, block_size=1024 * 1024):
+    """SHA-256 of a file's contents, read in blocks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def step_key(step, upstream, params=None):
+    """
+    Cache key for one pipeline step.
+
+    upstream is the input audio hash (first step) or the key(s) of the steps
+    this one consumes, so a key changes whenever the audio or any parameter
+    along the chain changes.
+    """
+    payload = json.dumps(
+        {"step": step, "upstream": upstream, "params": params or {}},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def entry_path(step, key, cache_dir=None):
+    """Directory of the (step, key) entry, without taking its lease."""
+    return os.path.join(cache_dir or CACHE_DIR, step, key[:2], key)
+
+
+def _try_lock(path):
+    """
+    Take the lease of entry path without waiting: the open lock file, or None
+    if another job (process or thread) holds it. The OS drops the lease when
+    the holder exits, so a crashed job never leaves an entry locked.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    f = open(path + LOCK_SUFFIX, "a+b")
+    try:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    except OSError:
+        f.close()
+        return None
+    return f
+
+
+def _unlock(f):
+    # closing the file releases the lock; the lock file itself stays, since
+    # removing it could let two jobs lock different files for the same entry
+    f.close()
+
+
+def artifact_dir(step, key, cache_dir=None, keep=()):
+    """
+    Take the lease of (step, key) and return the directory of its artifacts.
+
+    The lease is exclusive across processes and threads: if another job is
+    writing the same entry (two batch workers or dashboard jobs on the same
+    audio), this waits until it finishes, and then usually finds the entry
+    done. Release it with release_artifacts() once the run is over.
+
+    An entry without the done marker whose lease is free is left over from
+    an interrupted run, so its files are removed before the step is run
+    again — except the file names in keep, which a step can resume from
+    (e.g. a partial transcript).
+    """
+    path = entry_path(step, key, cache_dir)
+    lease = _try_lock(path)
+    if lease is None:
+        print(f"⏳ Waiting for another job writing the '{step}' artifacts...")
+        while lease is None:
+            time.sleep(LOCK_POLL_SECONDS)
+            lease = _try_lock(path)
+    with _lock:
+        _leases[os.path.abspath(path)] = lease
+
+    if os.path.isdir(path) and not os.path.exists(os.path.join(path, DONE_MARKER)):
+        if keep:
+            for name in os.listdir(path):
+                if name not in keep:
+                    target = os.path.join(path, name)
+                    if os.path.isdir(target):
+                        shutil.rmtree(target, ignore_errors=True)
+                    else:
+                        os.remove(target)
+        else:
+            shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def release_artifacts(paths):
+    """Give up the leases artifact_dir() took on the entry directories in paths."""
+    for path in paths:
+        with _lock:
+            lease = _leases.pop(os.path.abspath(path), None)
+        if lease is not None:
+            _unlock(lease)
+
+
+def is_cached(step, key, cache_dir=None):
+    path = entry_path(step, key, cache_dir)
+    return os.path.exists(os.path.join(path, DONE_MARKER))
+
+
+def commit_artifact(step, key, cache_dir=None):
+    """Mark (step, key) as complete and record it as recently used."""
+    path = entry_path(step, key, cache_dir)
+    with open(os.path.join(path, DONE_MARKER), "w", encoding="utf-8") as f:
+        f.write(str(time.time()))
+
+
+def touch_artifact(step, key, cache_dir=None):
+    """Refresh the last-used time of a cached entry (for LRU eviction)."""
+    marker = os.path.join(entry_path(step, key, cache_dir), DONE_MARKER)
+    if os.path.exists(marker):
+        os.utime(marker, None)
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def _subdirs(path):
+    if not os.path.isdir(path):
+        return []
+    return [os.path.join(path, name) for name in os.listdir(path) if os.path.isdir(os.path.join(path, name))]
+
+
+def evict_cache(max_bytes=None, cache_dir=None, keep=()):
+    """
+    Delete least recently used entries until the cache fits in max_bytes.
+
+    keep is a collection of entry directories that must not be evicted (the
+    artifacts of the run in progress). Entries whose lease another job holds
+    are being written and are never touched; an unfinished entry with a free
+    lease is left over from an interrupted run and goes first.
+    Returns the number of bytes freed.
+    """
+    cache_dir = cache_dir or CACHE_DIR
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    keep = {os.path.abspath(p) for p in keep}
+
+    with _lock:
+        entries = []
+        for step_path in _subdirs(cache_dir):
+            for shard_path in _subdirs(step_path):
+                for path in _subdirs(shard_path):
+                    marker = os.path.join(path, DONE_MARKER)
+                    last_used = os.path.getmtime(marker) if os.path.exists(marker) else 0.0
+                    entries.append((last_used, path, _dir_size(path)))
+
+        total = sum(size for _, _, size in entries)
+        freed = 0
+        for last_used, path, size in sorted(entries):
+            if total <= max_bytes:
+                break
+            if os.path.abspath(path) in keep:
+                continue
+            lease = _try_lock(path)
+            if lease is None:
+                continue  # another job (batch worker, dashboard) is using it
+            try:
+                shutil.rmtree(path, ignore_errors=True)
+            finally:
+                _unlock(lease)
+            total -= size
+            freed += size
+
+    if freed:
+        print(f"♻️ Evicted {freed / 1024 ** 2:.1f} MB from artifact cache '{cache_dir}'")
+    return freed
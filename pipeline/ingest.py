@@ -0,0 +1,83 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+import soundfile as sf
+from pipeline.artifact_cache import (
+    artifact_dir,
+    commit_artifact,
+    entry_path,
+    is_cached,
+    touch_artifact,
+    release_artifacts,
+)
+
+UPLOAD_STEP = "uploads"  # cache namespace of ingested uploads (evicted like any other entry)
+MAX_REMEMBERED = 256     # durations remembered in memory, most recent first
+
+IngestedAudio = namedtuple("IngestedAudio", ["path", "sha256", "duration", "file_name"])
+
+_durations = OrderedDict()  # sha256 -> seconds
+_lock = threading.Lock()
+
+
+def audio_duration(path):
+    """
+    Duration in seconds from the container header (WAV/FLAC/OGG, and MP3 with
+    libsndfile >= 1.1); falls back to audioread (ffmpeg probe) for other formats.
+    Nothing is decoded.
+    """
+    try:
+        return sf.info(path).duration
+    except RuntimeError:  # soundfile's LibsndfileError is a RuntimeError
+        import audioread
+
+        with audioread.audio_open(path) as f:
+            return f.duration
+
+
+def upload_dir(sha256, cache_dir=None):
+    """Cache entry of the stored upload with this SHA-256 (for evict_cache's keep)."""
+    return entry_path(UPLOAD_STEP, sha256, cache_dir)
+
+
+def ingest_upload(data, file_name, cache_dir=None):
+    """
+    Store uploaded audio bytes once, keyed by their SHA-256, and return an
+    IngestedAudio(path, sha256, duration, file_name).
+
+    The original bytes are kept as they are (MP3 stays MP3): clean_audio
+    decodes, downmixes and resamples any supported format itself, so there is
+    no conversion to WAV. Re-ingesting the same content (a rerun, another
+    session, the same file uploaded again) reuses the stored file and its
+    remembered duration.
+    """
+    sha256 = hashlib.sha256(data).hexdigest()
+    ext = os.path.splitext(file_name)[1].lower() or ".wav"
+
+    entry = artifact_dir(UPLOAD_STEP, sha256, cache_dir)
+    try:
+        if is_cached(UPLOAD_STEP, sha256, cache_dir):
+            touch_artifact(UPLOAD_STEP, sha256, cache_dir)
+            stored = [name for name in os.listdir(entry) if name.startswith("input.")]
+            path = os.path.join(entry, stored[0])
+        else:
+            path = os.path.join(entry, f"input{ext}")
+            with open(path, "wb") as f:
+                f.write(data)
+            commit_artifact(UPLOAD_STEP, sha256, cache_dir)
+    finally:
+        release_artifacts([entry])
+
+    with _lock:
+        duration = _durations.get(sha256)
+        if duration is not None:
+            _durations.move_to_end(sha256)
+    if duration is None:
+        duration = audio_duration(path)
+        with _lock:
+            _durations[sha256] = duration
+            while len(_durations) > MAX_REMEMBERED:
+                _durations.popitem(last=False)
+
+    return IngestedAudio(path, sha256, duration, file_name)
@@ -0,0 +1,142 @@
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# ==== Configuration ====
+MAX_CONCURRENT_JOBS = int(os.getenv("PIPELINE_MAX_JOBS", "2"))
+JOB_TTL_SECONDS = float(os.getenv("PIPELINE_JOB_TTL", "3600"))  # finished jobs are kept this long
+
+
+class Job:
+    """
+    State of one background job. The job function updates it through
+    update()/set_output(); readers get consistent copies from snapshot().
+    """
+
+    def __init__(self, job_id, key=None):
+        self.id = job_id
+        self.key = key
+        self.status = "queued"  # queued | running | done | failed
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.message = ""
+        self.outputs = {}
+        self.error = None
+        self._lock = threading.Lock()
+
+    def update(self, **fields):
+        with self._lock:
+            for name, value in fields.items():
+                setattr(self, name, value)
+
+    def set_output(self, name, value):
+        with self._lock:
+            self.outputs[name] = value
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed")
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "id": self.id,
+                "key": self.key,
+                "status": self.status,
+                "created_at": self.created_at,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "message": self.message,
+                "outputs": dict(self.outputs),
+                "error": self.error,
+            }
+
+
+class JobManager:
+    """
+    Runs jobs on a bounded thread pool, so at most max_workers pipelines run
+    at once however many sessions submit work; the rest wait in the queue.
+    Jobs run in the server process and share its loaded models.
+    """
+
+    def __init__(self, max_workers=MAX_CONCURRENT_JOBS, ttl=JOB_TTL_SECONDS):
+        self.max_workers = max(max_workers, 1)
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="pipeline-job")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, func, *args, key=None, **kwargs):
+        """
+        Queue func(job, *args, **kwargs) and return the job id.
+
+        If a job with the same key is still queued or running, its id is
+        returned instead of starting the same work twice.
+        """
+        with self._lock:
+            self._prune()
+            if key is not None:
+                for job in self._jobs.values():
+                    if job.key == key and not job.finished:
+                        return job.id
+            job = Job(uuid.uuid4().hex[:12], key)
+            self._jobs[job.id] = job
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job.id
+
+    def _run(self, job, func, args, kwargs):
+        job.update(status="running", started_at=time.time())
+        try:
+            ok = func(job, *args, **kwargs)
+            job.update(status="done" if ok is not False else "failed")
+        except Exception as e:
+            job.update(status="failed", error=f"{type(e).__name__}: {e}")
+        finally:
+            job.update(finished_at=time.time())
+
+    def get(self, job_id):
+        """Snapshot of a job (plus its queue position while queued), or None if unknown/expired."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = job.snapshot()
+            if snapshot["status"] == "queued":
+                snapshot["queue_position"] = sum(
+                    1 for other in self._jobs.values()
+                    if other.status == "queued" and other.created_at < job.created_at
+                ) + 1
+            return snapshot
+
+    def active_keys(self):
+        """Keys of the jobs still queued or running."""
+        with self._lock:
+            return [job.key for job in self._jobs.values() if not job.finished and job.key is not None]
+
+    def active_count(self):
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.finished)
+
+    def _prune(self):
+        now = time.time()
+        for job_id in [
+            j.id for j in self._jobs.values()
+            if j.finished and j.finished_at and now - j.finished_at > self.ttl
+        ]:
+            del self._jobs[job_id]
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    """Process-wide JobManager shared by every dashboard session."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
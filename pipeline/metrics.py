@@ -0,0 +1,147 @@
+import os
+import json
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+import psutil
+
+RSS_SAMPLE_INTERVAL = 0.05  # seconds between RSS samples while a step runs
+
+
+class _PeakRssSampler:
+    """Background thread that tracks the highest RSS seen while a step runs."""
+
+    def __init__(self, process, interval=RSS_SAMPLE_INTERVAL):
+        self.process = process
+        self.interval = interval
+        self.peak = process.memory_info().rss
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.peak = max(self.peak, self.process.memory_info().rss)
+            except psutil.Error:
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+
+
+class PipelineMetrics:
+    """
+    Per-step performance record for one pipeline run.
+
+    For each step it keeps wall time, process CPU time, peak RSS and whether
+    the step was served from existing artifacts (cache hit). With the input
+    audio duration it also reports the real-time factor (wall / audio seconds).
+    CPU time and RSS are process-wide, so steps that run at the same time
+    (transcription and diarization) share them.
+    """
+
+    def __init__(self, input_path=None, run_id=None):
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self.input_path = input_path
+        self.audio_duration = None
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.ok = None
+        self.steps = []
+        self._process = psutil.Process(os.getpid())
+        self._lock = threading.Lock()
+        self._wall_start = time.perf_counter()
+        self._wall_seconds = None
+
+    @contextmanager
+    def measure(self, step, cache_hit=False):
+        """Time a step; the yielded record can be updated (e.g. record["ok"])."""
+        record = {"step": step, "cache_hit": bool(cache_hit), "ok": None}
+        cpu_start = sum(self._process.cpu_times()[:2])
+        wall_start = time.perf_counter()
+        with _PeakRssSampler(self._process) as sampler:
+            try:
+                yield record
+            finally:
+                record["wall_seconds"] = round(time.perf_counter() - wall_start, 4)
+                record["cpu_seconds"] = round(sum(self._process.cpu_times()[:2]) - cpu_start, 4)
+        record["peak_rss_mb"] = round(sampler.peak / 1024 ** 2, 1)
+        with self._lock:
+            self.steps.append(record)
+
+    def finish(self, ok):
+        self.ok = bool(ok)
+        self._wall_seconds = time.perf_counter() - self._wall_start
+
+    def report(self):
+        """The run as a JSON-serialisable dict."""
+        wall = self._wall_seconds if self._wall_seconds is not None else time.perf_counter() - self._wall_start
+        steps = []
+        for record in self.steps:
+            record = dict(record)
+            record["real_time_factor"] = (
+                round(record["wall_seconds"] / self.audio_duration, 4) if self.audio_duration else None
+            )
+            steps.append(record)
+        return {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "input": self.input_path,
+            "audio_duration_seconds": self.audio_duration,
+            "ok": self.ok,
+            "wall_seconds": round(wall, 4),
+            "real_time_factor": round(wall / self.audio_duration, 4) if self.audio_duration else None,
+            "peak_rss_mb": max((s["peak_rss_mb"] for s in steps), default=None),
+            "steps": steps,
+        }
+
+    def write_json(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=4)
+        print(f"📊 Run report saved to: {path}")
+
+    def write_prometheus(self, path):
+        """Write the run in Prometheus text format (e.g. for node_exporter's textfile collector)."""
+        report = self.report()
+        metrics = [
+            ("pipeline_step_wall_seconds", "Wall-clock time of a pipeline step.", "wall_seconds"),
+            ("pipeline_step_cpu_seconds", "Process CPU time during a pipeline step.", "cpu_seconds"),
+            ("pipeline_step_peak_rss_bytes", "Peak resident memory during a pipeline step.", "peak_rss_mb"),
+            ("pipeline_step_real_time_factor", "Step wall time divided by audio duration.", "real_time_factor"),
+            ("pipeline_step_cache_hit", "1 if the step reused existing artifacts.", "cache_hit"),
+            ("pipeline_step_success", "1 if the step succeeded.", "ok"),
+        ]
+        lines = []
+        for name, help_text, field in metrics:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for step in report["steps"]:
+                value = step.get(field)
+                if value is None:
+                    continue
+                if field == "peak_rss_mb":
+                    value = value * 1024 ** 2
+                lines.append(f'{name}{{step="{step["step"]}"}} {float(value)}')
+
+        lines.append("# HELP pipeline_run_wall_seconds Wall-clock time of the whole run.")
+        lines.append("# TYPE pipeline_run_wall_seconds gauge")
+        lines.append(f"pipeline_run_wall_seconds {report['wall_seconds']}")
+        if report["audio_duration_seconds"] is not None:
+            lines.append("# HELP pipeline_audio_duration_seconds Duration of the input audio.")
+            lines.append("# TYPE pipeline_audio_duration_seconds gauge")
+            lines.append(f"pipeline_audio_duration_seconds {report['audio_duration_seconds']}")
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)  # atomic, so a scraper never sees half a file
+        print(f"📊 Prometheus metrics saved to: {path}")
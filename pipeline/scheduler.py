@@ -0,0 +1,71 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+def run_dag(steps, max_workers=None, on_start=None, on_finish=None):
+    """
+    Run pipeline steps as a dependency graph.
+
+    steps is a list of (name, func, args, kwargs, deps) where deps names the
+    steps that must succeed first and func returns True/False like the step_*
+    functions in main.py. Every step whose dependencies are done is started on
+    a worker thread, so independent steps (e.g. transcription and diarization)
+    overlap. After a failure no new steps are started; running ones finish.
+
+    on_start(name) and on_finish(name, ok, seconds) are called from the calling
+    thread, so they may safely update UI state.
+
+    Returns (ok, results) where results maps each finished step to True/False.
+    """
+    names = [step[0] for step in steps]
+    if len(set(names)) != len(names):
+        raise ValueError("Duplicate step names in pipeline.")
+    for name, _, _, _, deps in steps:
+        missing = [d for d in deps if d not in names]
+        if missing:
+            raise ValueError(f"Step '{name}' depends on unknown step(s): {missing}")
+
+    pending = {step[0]: step for step in steps}
+    results = {}
+    running = {}  # future -> (name, start time)
+    failed = False
+    wall_start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(steps) or 1) as pool:
+        while True:
+            if not failed:
+                for name in list(pending):
+                    _, func, args, kwargs, deps = pending[name]
+                    if all(results.get(d) for d in deps):
+                        del pending[name]
+                        print(f"\n🔹 Running step: {name}")
+                        if on_start:
+                            on_start(name)
+                        future = pool.submit(func, *args, **kwargs)
+                        running[future] = (name, time.perf_counter())
+
+            if not running:
+                break
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, started = running.pop(future)
+                try:
+                    ok = bool(future.result())
+                except Exception as e:
+                    print(f"❌ Step '{name}' raised: {e}")
+                    ok = False
+                seconds = time.perf_counter() - started
+                results[name] = ok
+                print(f"{'✅' if ok else '🚫'} {name} {'finished' if ok else 'failed'} in {seconds:.1f}s")
+                if on_finish:
+                    on_finish(name, ok, seconds)
+                if not ok:
+                    failed = True
+
+    if pending and not failed:
+        print(f"❌ Steps could not be scheduled (dependency cycle?): {list(pending)}")
+
+    print(f"⏱️ Pipeline wall time: {time.perf_counter() - wall_start:.1f}s")
+    ok = not failed and not pending
+    return ok, results
@@ -0,0 +1,267 @@
+"""
+Columnar segment store for transcripts and diarization.
+
+A store is an uncompressed .npz (readable with plain np.load) holding:
+    start, end      float64 per segment
+    speaker         int32 code per segment (-1: none), labels in `speakers`
+    text_id         int32 index per segment into the interned text table
+    text_offsets    int64 byte offsets of each table entry in `text`
+    text            uint8 UTF-8 bytes of all distinct texts, back to back
+    word_offsets    int64 index of each segment's first word (segments with words)
+    word_start, word_end, word_text_id
+                    per-word timings and text ids into the same text table
+    duration        float64 [duration] (NaN if unknown)
+    fields          which of "text" / "speaker" / "words" the segments carry
+
+load_segment_store() memory-maps every column straight from the archive, so
+opening a multi-hour meeting reads a few headers instead of parsing JSON.
+"""
+import os
+import json
+import struct
+import zipfile
+import numpy as np
+
+
+class SegmentStore:
+    """Read-only view of a segment store; columns are (memory-mapped) arrays."""
+
+    def __init__(self, columns):
+        self.start = columns["start"]
+        self.end = columns["end"]
+        self.speaker = columns["speaker"]
+        self.speakers = [str(s) for s in columns["speakers"]]
+        self.text_id = columns["text_id"]
+        self.text_offsets = columns["text_offsets"]
+        self.text_bytes = columns["text"]
+        # stores written before word timings existed have no word columns
+        self.word_offsets = columns.get("word_offsets", np.zeros(len(self.start) + 1, dtype=np.int64))
+        self.word_start = columns.get("word_start", np.zeros(0))
+        self.word_end = columns.get("word_end", np.zeros(0))
+        self.word_text_id = columns.get("word_text_id", np.zeros(0, dtype=np.int32))
+        duration = float(columns["duration"][0])
+        self.duration = None if np.isnan(duration) else duration
+        self.fields = {str(f) for f in columns["fields"]}
+
+    def __len__(self):
+        return len(self.start)
+
+    def text(self, i):
+        t = self.text_id[i]
+        return self.text_bytes[self.text_offsets[t]:self.text_offsets[t + 1]].tobytes().decode("utf-8")
+
+    def _text_table(self):
+        table = self.text_bytes.tobytes()
+        offsets = self.text_offsets.tolist()
+        return [table[a:b].decode("utf-8") for a, b in zip(offsets[:-1], offsets[1:])]
+
+    def texts(self):
+        distinct = self._text_table()
+        return [distinct[t] for t in self.text_id.tolist()]
+
+    def word_arrays(self):
+        """
+        All words as (start, end, text, segment index), the input of
+        milestone_4.merge.split_at_speaker_changes, without building per-segment dicts.
+        Segments stored without words count as one word spanning the segment.
+        """
+        distinct = self._text_table()
+        counts = np.diff(self.word_offsets)
+        if len(counts) and counts.min() > 0:
+            return (
+                np.asarray(self.word_start),
+                np.asarray(self.word_end),
+                [distinct[t] for t in self.word_text_id.tolist()],
+                np.repeat(np.arange(len(self)), counts),
+            )
+        from milestone_4.merge import flatten_words
+
+        return flatten_words(self.to_segments())
+
+    def speaker_labels(self, unknown=None):
+        """Speaker label per segment (unknown where the segment has none)."""
+        labels = np.array(self.speakers + [unknown], dtype=object)
+        return labels[self.speaker].tolist()  # code -1 picks the trailing `unknown`
+
+    def search(self, query):
+        """
+        Indices of the segments whose text contains query (ASCII
+        case-insensitive). Scans the table of distinct texts once.
+        """
+        needle = query.encode("utf-8").lower()
+        if not needle or not len(self):
+            return np.arange(len(self)) if not needle else np.zeros(0, dtype=np.int64)
+        table = self.text_bytes.tobytes().lower()
+        hits = set()
+        pos = table.find(needle)
+        while pos != -1:
+            t = int(np.searchsorted(self.text_offsets, pos, side="right")) - 1
+            if pos + len(needle) <= self.text_offsets[t + 1]:  # not across two texts
+                hits.add(t)
+            pos = table.find(needle, pos + 1)
+        return np.flatnonzero(np.isin(self.text_id, list(hits)))
+
+    def to_dataframe(self):
+        """Diarization turns as the DataFrame merge expects (start, end, speaker)."""
+        import pandas as pd
+
+        return pd.DataFrame({"start": self.start, "end": self.end, "speaker": self.speaker_labels()})
+
+    def to_segments(self):
+        """Segments in the JSON layout: transcript dicts (id, start, end, text) and/or speaker turns."""
+        columns = {"start": self.start.tolist(), "end": self.end.tolist()}
+        if "text" in self.fields:
+            columns["text"] = self.texts()
+        if "speaker" in self.fields:
+            columns["speaker"] = self.speaker_labels()
+        if "words" in self.fields:
+            distinct = self._text_table()
+            starts, ends = self.word_start.tolist(), self.word_end.tolist()
+            text_ids = self.word_text_id.tolist()
+            offsets = self.word_offsets.tolist()
+            columns["words"] = [
+                [{"start": starts[w], "end": ends[w], "word": distinct[text_ids[w]]} for w in range(a, b)]
+                for a, b in zip(offsets[:-1], offsets[1:])
+            ]
+        names = list(columns)
+        segments = [dict(zip(names, values)) for values in zip(*columns.values())]
+        if "words" in self.fields:
+            for seg in segments:
+                if not seg["words"]:
+                    del seg["words"]
+        if "text" in self.fields:
+            segments = [{"id": f"seg_{i:03d}", **seg} for i, seg in enumerate(segments)]
+        return segments
+
+
+# ---------- Write ----------
+def transcript_fields(segments):
+    """Fields of a transcript store: always text, plus words if any segment has word timings."""
+    return ("text", "words") if any("words" in seg for seg in segments) else ("text",)
+
+
+def write_segment_store(path, segments, duration=None, fields=None):
+    """
+    Write segments (dicts with start, end and text and/or speaker) to path.
+    fields ("text", "speaker", "words") defaults to the keys the segments carry.
+    Written under a temporary name and renamed, so readers never see half a store.
+    """
+    n = len(segments)
+    if fields is None:
+        fields = [f for f in ("text", "speaker", "words") if any(f in seg for seg in segments)]
+
+    speakers = sorted({str(seg["speaker"]) for seg in segments if seg.get("speaker") is not None})
+    speaker_code = {label: i for i, label in enumerate(speakers)}
+
+    interned = {}  # text -> id, in first-seen order
+    text_id = np.fromiter(
+        (interned.setdefault(seg.get("text", ""), len(interned)) for seg in segments),
+        dtype=np.int32,
+        count=n,
+    )
+    words = [word for seg in segments for word in seg.get("words") or []]
+    word_counts = [len(seg.get("words") or []) for seg in segments]
+    word_text_id = np.fromiter(
+        (interned.setdefault(word["word"], len(interned)) for word in words), dtype=np.int32, count=len(words)
+    )
+    word_offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(word_counts, out=word_offsets[1:])
+
+    encoded = [text.encode("utf-8") for text in interned]
+    text_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=text_offsets[1:])
+
+    columns = {
+        "start": np.fromiter((seg["start"] for seg in segments), dtype=np.float64, count=n),
+        "end": np.fromiter((seg["end"] for seg in segments), dtype=np.float64, count=n),
+        "speaker": np.fromiter(
+            (speaker_code.get(str(seg.get("speaker")), -1) for seg in segments), dtype=np.int32, count=n
+        ),
+        "speakers": np.array(speakers, dtype=str),
+        "text_id": text_id,
+        "text_offsets": text_offsets,
+        "text": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        "word_offsets": word_offsets,
+        "word_start": np.fromiter((w["start"] for w in words), dtype=np.float64, count=len(words)),
+        "word_end": np.fromiter((w["end"] for w in words), dtype=np.float64, count=len(words)),
+        "word_text_id": word_text_id,
+        "duration": np.array([np.nan if duration is None else duration], dtype=np.float64),
+        "fields": np.array(list(fields), dtype=str),
+    }
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **columns)  # stored, not deflated: members can be memory-mapped
+    os.replace(tmp_path, path)
+
+
+# ---------- Read ----------
+def _mmap_members(path):
+    """Memory-map every .npy member of an uncompressed .npz archive."""
+    arrays = {}
+    with zipfile.ZipFile(path) as zf, open(path, "rb") as f:
+        for info in zf.infolist():
+            if info.compress_type != zipfile.ZIP_STORED:
+                raise ValueError(f"{path}: compressed member {info.filename} cannot be memory-mapped")
+            # the local header's name/extra lengths can differ from the central directory's
+            f.seek(info.header_offset + 26)
+            name_len, extra_len = struct.unpack("<HH", f.read(4))
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if int(np.prod(shape)) == 0:
+                arrays[name] = np.zeros(shape, dtype=dtype)  # mmap can't map zero bytes
+            else:
+                arrays[name] = np.memmap(
+                    path, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                    order="F" if fortran_order else "C",
+                )
+    return arrays
+
+
+def load_segment_store(path):
+    return SegmentStore(_mmap_members(path))
+
+
+# ---------- JSON converters ----------
+def json_to_store(json_path, store_path):
+    """
+    Convert transcription.json ({"duration", "segments"}) or diarization.json
+    (list of turns) to a segment store. Returns the loaded store.
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict) and isinstance(data.get("segments", []), list):
+        segments = data.get("segments", [])
+        write_segment_store(store_path, segments, data.get("duration"), fields=transcript_fields(segments))
+    elif isinstance(data, list):
+        write_segment_store(store_path, data)
+    else:
+        raise ValueError(f"{json_path}: expected a transcript or a list of turns")
+    return load_segment_store(store_path)
+
+
+def store_to_json(store_path, json_path):
+    """Write a segment store back in the JSON layout it was converted from."""
+    store = load_segment_store(store_path)
+    data = store.to_segments()
+    if "text" in store.fields:
+        data = {"duration": store.duration, "segments": data}
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+
+
+def open_segment_store(store_path, json_path=None):
+    """
+    Load store_path; if it doesn't exist yet (artifacts from before the store
+    existed), build it once from json_path.
+    """
+    if os.path.exists(store_path):
+        return load_segment_store(store_path)
+    if json_path and os.path.exists(json_path):
+        return json_to_store(json_path, store_path)
+    raise FileNotFoundError(store_path)